@@ -1,7 +1,35 @@
-from .validation import OdorTimesValidator
-from .utils import read_experiment_keys_file
+import importlib
+import typing
+
+if typing.TYPE_CHECKING:
+    from .utils import read_experiment_keys_file
+    from .validation import BlockTimesValidator, OdorTimesValidator, SpikeSortingValidator
+
+# Each is only imported once first used, so that the command line interface starts without importing them
+_LAZY_IMPORTS = {
+    "BlockTimesValidator": ".validation",
+    "OdorTimesValidator": ".validation",
+    "SpikeSortingValidator": ".validation",
+    "read_experiment_keys_file": ".utils",
+}
 
 __all__ = [
+    "BlockTimesValidator",
     "OdorTimesValidator",
+    "SpikeSortingValidator",
     "read_experiment_keys_file",
 ]
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _LAZY_IMPORTS:
+        message = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(message)
+
+    value = getattr(importlib.import_module(name=_LAZY_IMPORTS[name], package=__name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
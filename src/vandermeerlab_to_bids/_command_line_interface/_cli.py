@@ -1,8 +1,11 @@
+import json
+import os
 import typing
 import pathlib
 import click
 
-from ..manish_2025._odor_sequence_to_nwb import odor_sequence_to_nwb
+# The conversion, validation, and benchmark modules import NeuroConv, PyNWB, and HDMF (which take seconds to import),
+# so each command only imports them once run; `--help`, and any option error, then respond without importing them
 
 
 # vandermeerlab2bids
@@ -63,6 +66,168 @@ def _vandermeerlab_to_bids_convert_cli():
     required=False,
     default=False,
 )
+@click.option(
+    "--jobs",
+    help=(
+        "The number of sessions to convert in parallel, each in its own process; or with --layout per-stream, the "
+        "number of streams of a session written in parallel, with sessions converted one at a time."
+    ),
+    required=False,
+    type=click.IntRange(min=1),
+    default=1,
+)
+@click.option(
+    "--dry-run",
+    help="List which sessions would be converted or skipped, and how much data they involve, without converting.",
+    is_flag=True,
+    required=False,
+    default=False,
+)
+@click.option(
+    "--write-profile",
+    help=(
+        "How to compress and chunk the datasets: 'fast' (LZF, larger chunks), 'balanced' (the defaults of NeuroConv), "
+        "or 'archive' (shuffled, maximum gzip)."
+    ),
+    required=False,
+    type=click.Choice(["fast", "balanced", "archive"], case_sensitive=False),
+    default="balanced",
+)
+@click.option(
+    "--dataset-write-profile",
+    "dataset_write_profiles",
+    help=(
+        "Override the write profile for one category of datasets ('ap', 'nidq', 'units', or 'intervals'), "
+        "such as 'ap=fast'. May be given multiple times."
+    ),
+    required=False,
+    multiple=True,
+    type=str,
+)
+@click.option(
+    "--backend",
+    help="The format of the NWB files: 'hdf5' (a single .nwb file) or 'zarr' (a .nwb.zarr directory).",
+    required=False,
+    type=click.Choice(["hdf5", "zarr"], case_sensitive=False),
+    default="hdf5",
+)
+@click.option(
+    "--compression-workers",
+    help=(
+        "The number of workers compressing the chunks of the raw streams in parallel: processes with the Zarr backend, "
+        "or threads with the HDF5 backend, which then also reads all streams concurrently."
+    ),
+    required=False,
+    type=click.IntRange(min=1),
+    default=1,
+)
+@click.option(
+    "--buffer-gb",
+    help="The amount of each raw stream read and written at a time, in gigabytes.",
+    required=False,
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+)
+@click.option(
+    "--chunk-mb",
+    help="The size of each chunk of the raw streams, in megabytes.",
+    required=False,
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+)
+@click.option(
+    "--stream-iterator-option",
+    "stream_iterator_options",
+    help=(
+        "Override --buffer-gb or --chunk-mb for a single raw stream, such as 'imec0.ap:buffer_gb=2'. "
+        "May be given multiple times."
+    ),
+    required=False,
+    multiple=True,
+    type=str,
+)
+@click.option(
+    "--memory-limit-gb",
+    help=(
+        "Shrink the buffers of the raw streams so that each conversion stays within this many gigabytes of memory; "
+        "'auto' shares 80%% of the memory available between the --jobs."
+    ),
+    required=False,
+    type=str,
+    default=None,
+)
+@click.option(
+    "--layout",
+    help=(
+        "How each raw session is laid out: 'single' (one file) or 'per-stream' (one file per SpikeGLX stream, "
+        "up to --jobs written in parallel, plus a top-level file linking to them). Only for HDF5 files of raw sessions."
+    ),
+    required=False,
+    type=click.Choice(["single", "per-stream"], case_sensitive=False),
+    default="single",
+)
+@click.option(
+    "--manifest",
+    help="Share out the sessions to convert in this manifest, as written by `vandermeerlab2bids plan`.",
+    required=False,
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+)
+@click.option(
+    "--task-index",
+    help=(
+        "Convert only the slice of sessions of this task (counted from 0) of --task-count tasks. "
+        "Taken from SLURM_ARRAY_TASK_ID when run as part of a SLURM job array."
+    ),
+    required=False,
+    type=click.IntRange(min=0),
+    default=None,
+)
+@click.option(
+    "--task-count",
+    help="The number of tasks to share the sessions between, balanced by the size of their source data.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--no-units-cache",
+    help=(
+        "Always parse the spike sorted units of processed sessions from their .mat files, rather than from the copy "
+        "kept (in ~/.vandermeerlab_to_bids/units_cache) by earlier conversions of the same files."
+    ),
+    is_flag=True,
+    required=False,
+    default=False,
+)
+@click.option(
+    "--profile",
+    help=(
+        "Also profile each session, dumping its cProfile statistics (.prof) or tracemalloc snapshot (.tracemalloc) "
+        "to ~/.vandermeerlab_to_bids/records/profiles."
+    ),
+    required=False,
+    type=click.Choice(["cprofile", "tracemalloc"], case_sensitive=False),
+    default=None,
+)
+@click.option(
+    "--output-cache",
+    help=(
+        "A directory in which to keep each file converted, keyed by the content of its inputs, the versions of these "
+        "tools, and the options; sessions found there are linked into place rather than converted again. Keep it on "
+        "the same file system as --outpath, so that it holds hard links rather than copies."
+    ),
+    required=False,
+    type=click.Path(file_okay=False, writable=True),
+    default=None,
+)
+@click.option(
+    "--output-cache-size-gb",
+    help="The size, in GB, beyond which the least recently used files are evicted from the --output-cache.",
+    required=False,
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+)
 def _vandermeerlab_to_bids_convert_nwb_cli(
     datapath: str,
     outpath: str,
@@ -71,13 +236,75 @@ def _vandermeerlab_to_bids_convert_nwb_cli(
     subject: str | None = None,
     session: str | None = None,
     testing: bool = False,
+    jobs: int = 1,
+    dry_run: bool = False,
+    write_profile: typing.Literal["fast", "balanced", "archive"] = "balanced",
+    dataset_write_profiles: tuple[str, ...] = (),
+    backend: typing.Literal["hdf5", "zarr"] = "hdf5",
+    compression_workers: int = 1,
+    buffer_gb: float | None = None,
+    chunk_mb: float | None = None,
+    stream_iterator_options: tuple[str, ...] = (),
+    memory_limit_gb: str | None = None,
+    layout: typing.Literal["single", "per-stream"] = "single",
+    manifest: str | None = None,
+    task_index: int | None = None,
+    task_count: int | None = None,
+    no_units_cache: bool = False,
+    profile: typing.Literal["cprofile", "tracemalloc"] | None = None,
+    output_cache: str | None = None,
+    output_cache_size_gb: float | None = None,
 ) -> None:
     """Convert the given experiment type to NWB format."""
+    from ..manish_2025 import plan_odor_sequence_to_nwb
+
     datapath = pathlib.Path(datapath)
     outpath = pathlib.Path(outpath)
 
+    if task_index is None and task_count is None and "SLURM_ARRAY_TASK_ID" in os.environ:
+        task_index, task_count = _get_slurm_array_task()
+    if (task_index is None) != (task_count is None):
+        message = "--task-index and --task-count must be given together."
+        raise click.BadParameter(message)
+
+    dataset_write_profiles_by_category = _parse_dataset_write_profiles(dataset_write_profiles=dataset_write_profiles)
+
+    iterator_options = {
+        option_name: option_value
+        for option_name, option_value in (("buffer_gb", buffer_gb), ("chunk_mb", chunk_mb))
+        if option_value is not None
+    }
+    iterator_options_by_stream = dict()
+    for stream_iterator_option in stream_iterator_options:
+        stream_name, _, option = stream_iterator_option.rpartition(":")
+        option_name, separator, option_value = option.partition("=")
+        if stream_name == "" or separator == "":
+            message = (
+                f"Invalid --stream-iterator-option '{stream_iterator_option}' - "
+                "must be of the form STREAM:OPTION=VALUE."
+            )
+            raise click.BadParameter(message)
+        iterator_options_by_stream.setdefault(stream_name.strip(), dict())[option_name.strip()] = option_value
+
     match experiment:
         case "OdorSequence":
+            if dry_run:
+                session_plans = plan_odor_sequence_to_nwb(
+                    data_directory=datapath,
+                    nwb_directory=outpath,
+                    subject_id=subject,
+                    session_id=session,
+                    raw_or_processed=stream,
+                    backend=backend,
+                    layout=layout,
+                )
+                _echo_conversion_plan(session_plans=session_plans)
+                return
+
+            # Only a conversion itself needs NeuroConv, so a dry run does not import it
+            from ..manish_2025 import odor_sequence_to_nwb
+            from ..utils import DEFAULT_OUTPUT_CACHE_SIZE_GB
+
             odor_sequence_to_nwb(
                 data_directory=datapath,
                 nwb_directory=outpath,
@@ -85,4 +312,649 @@ def _vandermeerlab_to_bids_convert_nwb_cli(
                 session_id=session,
                 testing=testing,
                 raw_or_processed=stream,
+                number_of_jobs=jobs,
+                write_profile=write_profile,
+                dataset_write_profiles=dataset_write_profiles_by_category or None,
+                backend=backend,
+                number_of_compression_workers=compression_workers,
+                iterator_options=iterator_options or None,
+                stream_iterator_options=iterator_options_by_stream or None,
+                memory_limit_gb=memory_limit_gb,
+                layout=layout,
+                manifest_file_path=manifest,
+                task_index=task_index or 0,
+                task_count=task_count or 1,
+                cache_units=not no_units_cache,
+                profile=profile,
+                output_cache_directory=output_cache,
+                output_cache_size_gb=(
+                    output_cache_size_gb if output_cache_size_gb is not None else DEFAULT_OUTPUT_CACHE_SIZE_GB
+                ),
+            )
+
+
+# vandermeerlab2bids update
+@_vandermeerlab_to_bids_cli.command(name="update")
+@click.option(
+    "--datapath",
+    type=click.Path(writable=False),
+    help="Path to the directory containing all of the data from the experiment.",
+)
+@click.option(
+    "--outpath",
+    help="The directory in which the NWB files were saved.",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--experiment",
+    type=click.Choice(["OdorSequence"], case_sensitive=False),
+    help="The specifier of the experiment to update (e.g., 'OdorSequence').",
+)
+@click.option(
+    "--subject",
+    help="ID of the subject.",
+    required=False,
+    type=str,
+    default=None,
+)
+@click.option(
+    "--session",
+    help="ID of the session.",
+    required=False,
+    type=str,
+    default=None,
+)
+@click.option(
+    "--dry-run",
+    help="List what would be rewritten in each file, without modifying any.",
+    is_flag=True,
+    required=False,
+    default=False,
+)
+@click.option(
+    "--write-profile",
+    help="How to compress and chunk the datasets rewritten, as for `convert nwb`.",
+    required=False,
+    type=click.Choice(["fast", "balanced", "archive"], case_sensitive=False),
+    default="balanced",
+)
+@click.option(
+    "--dataset-write-profile",
+    "dataset_write_profiles",
+    help="Override the write profile for one category of datasets, such as 'intervals=archive', as for `convert nwb`.",
+    required=False,
+    multiple=True,
+    type=str,
+)
+def _vandermeerlab_to_bids_update_cli(
+    datapath: str,
+    outpath: str,
+    experiment: typing.Literal["OdorSequence"],
+    subject: str | None = None,
+    session: str | None = None,
+    dry_run: bool = False,
+    write_profile: typing.Literal["fast", "balanced", "archive"] = "balanced",
+    dataset_write_profiles: tuple[str, ...] = (),
+) -> None:
+    """
+    Update the metadata and trials and epochs tables of processed NWB files in place, without rewriting their units.
+
+    Only what differs from the source data is rewritten. Sessions whose spike sorting has changed, or which were never
+    fully converted, are skipped, to be converted again with `vandermeerlab2bids convert nwb`.
+    """
+    from ..manish_2025 import update_odor_sequence_nwb
+
+    dataset_write_profiles_by_category = _parse_dataset_write_profiles(dataset_write_profiles=dataset_write_profiles)
+
+    match experiment:
+        case "OdorSequence":
+            session_updates = update_odor_sequence_nwb(
+                data_directory=pathlib.Path(datapath).absolute(),
+                nwb_directory=pathlib.Path(outpath).absolute(),
+                subject_id=subject,
+                session_id=session,
+                write_profile=write_profile,
+                dataset_write_profiles=dataset_write_profiles_by_category or None,
+                dry_run=dry_run,
+            )
+
+    for session_update in session_updates:
+        click.echo(
+            f"{session_update.action:<8} sub-{session_update.subject_id:<8} ses-{session_update.session_id:<12} "
+            f"{session_update.reason}"
+        )
+        for changed_path in session_update.changed_paths:
+            click.echo(f"{'':<40}{changed_path}")
+
+    sessions_to_update = [session_update for session_update in session_updates if session_update.action == "update"]
+    click.echo(
+        f"\n{len(sessions_to_update)} session(s) {'to update' if dry_run else 'updated'}, "
+        f"{len(session_updates) - len(sessions_to_update)} skipped."
+    )
+
+
+# vandermeerlab2bids plan
+@_vandermeerlab_to_bids_cli.command(name="plan")
+@click.option(
+    "--datapath",
+    type=click.Path(writable=False),
+    help="Path to the directory containing all of the data from the experiment.",
+)
+@click.option(
+    "--outpath",
+    help="The directory in which the NWB files will be saved.",
+    required=True,
+    type=click.Path(writable=True),
+)
+@click.option(
+    "--experiment",
+    type=click.Choice(["OdorSequence"], case_sensitive=False),
+    help="The specifier of the experiment to convert (e.g., 'OdorSequence').",
+)
+@click.option(
+    "--stream",
+    type=click.Choice(["raw", "processed"], case_sensitive=False),
+    help="The specifier of the data streams to convert (e.g., 'raw' or 'processed').",
+)
+@click.option(
+    "--manifest",
+    help="The file to write the manifest of the planned sessions to (JSON).",
+    required=True,
+    type=click.Path(writable=True, dir_okay=False),
+)
+@click.option(
+    "--backend",
+    help="The format of the NWB files: 'hdf5' (a single .nwb file) or 'zarr' (a .nwb.zarr directory).",
+    required=False,
+    type=click.Choice(["hdf5", "zarr"], case_sensitive=False),
+    default="hdf5",
+)
+@click.option(
+    "--layout",
+    help="How each raw session is laid out: 'single' (one file) or 'per-stream' (one file per SpikeGLX stream).",
+    required=False,
+    type=click.Choice(["single", "per-stream"], case_sensitive=False),
+    default="single",
+)
+@click.option(
+    "--task-count",
+    help="Show how the sessions to convert would be shared between this many tasks of a job array.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=1,
+)
+def _vandermeerlab_to_bids_plan_cli(
+    datapath: str,
+    outpath: str,
+    experiment: typing.Literal["OdorSequence"],
+    stream: typing.Literal["raw", "processed"],
+    manifest: str,
+    backend: typing.Literal["hdf5", "zarr"] = "hdf5",
+    layout: typing.Literal["single", "per-stream"] = "single",
+    task_count: int = 1,
+) -> None:
+    """
+    Enumerate the sessions of an experiment and write a manifest of those to convert.
+
+    Each task of a job array then converts its own slice of the manifest with
+    `vandermeerlab2bids convert nwb --manifest <file> --task-index <i> --task-count <n>`.
+    """
+    from ..manish_2025 import ConversionManifest, plan_odor_sequence_to_nwb, shard_session_plans
+
+    datapath = pathlib.Path(datapath).absolute()
+    outpath = pathlib.Path(outpath).absolute()
+
+    match experiment:
+        case "OdorSequence":
+            session_plans = plan_odor_sequence_to_nwb(
+                data_directory=datapath,
+                nwb_directory=outpath,
+                raw_or_processed=stream,
+                backend=backend,
+                layout=layout,
+            )
+
+    conversion_manifest = ConversionManifest(
+        data_directory=datapath,
+        nwb_directory=outpath,
+        raw_or_processed=stream,
+        backend=backend,
+        layout=layout,
+        session_plans=session_plans,
+    )
+    manifest_file_path = pathlib.Path(manifest)
+    manifest_file_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_file_path.write_text(conversion_manifest.model_dump_json(indent=2))
+
+    _echo_conversion_plan(session_plans=session_plans)
+    if task_count > 1:
+        sessions_to_convert = [session_plan for session_plan in session_plans if session_plan.action == "convert"]
+        click.echo("")
+        for task_index, task_session_plans in enumerate(
+            shard_session_plans(session_plans=sessions_to_convert, task_count=task_count)
+        ):
+            task_bytes = sum(session_plan.input_bytes for session_plan in task_session_plans)
+            click.echo(f"task {task_index:<4} {len(task_session_plans):>4} session(s) {_format_bytes(task_bytes):>10}")
+    click.echo(f"\nManifest written to {manifest_file_path}")
+
+
+# vandermeerlab2bids validate
+@_vandermeerlab_to_bids_cli.command(name="validate")
+@click.option(
+    "--datapath",
+    help="Path to the directory containing all of the data from the experiment.",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--jobs",
+    help="The number of sessions to check in parallel, each in its own process.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=1,
+)
+def _vandermeerlab_to_bids_validate_cli(datapath: str, jobs: int = 1) -> None:
+    """
+    Check the odor times, block times, and spike sorted units of every session before converting them.
+
+    All sessions are checked, and each validator writes a report of any violations to the records directory.
+    Sessions whose files are unchanged since they were last checked are not checked again.
+    """
+    from ..validation import BlockTimesValidator, OdorTimesValidator, SpikeSortingValidator
+
+    datapath = pathlib.Path(datapath)
+
+    number_of_violations = 0
+    for validator_class in (OdorTimesValidator, BlockTimesValidator, SpikeSortingValidator):
+        validator = validator_class(directory=datapath)
+        violations = validator.validate(number_of_jobs=jobs, raise_on_violation=False)
+        number_of_violations += len(violations)
+
+        for violation in violations:
+            click.echo(f"{violation.session:<20} {violation.check:<20} {violation.item}: {violation.message}")
+        click.echo(
+            f"{validator_class.__name__}: {len(violations)} violation(s) in "
+            f"{len(validator.session_input_file_paths)} session(s); report written to {validator.report_file_path}\n"
+        )
+
+    if number_of_violations > 0:
+        message = f"Found {number_of_violations} violation(s) in the source data."
+        raise click.ClickException(message)
+
+
+# vandermeerlab2bids benchmark
+@_vandermeerlab_to_bids_cli.group(name="benchmark")
+def _vandermeerlab_to_bids_benchmark_cli():
+    """Benchmarks of the performance-critical steps of the conversion."""
+    pass
+
+
+# vandermeerlab2bids benchmark keys
+@_vandermeerlab_to_bids_benchmark_cli.command(name="keys")
+@click.option(
+    "--datapath",
+    help="Path to a directory containing experiment keys (`*_keys.m`) files, searched recursively.",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--repeats",
+    help="The number of times to parse each file with each parser.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=10,
+)
+def _vandermeerlab_to_bids_benchmark_keys_cli(datapath: str, repeats: int = 10) -> None:
+    """Compare the experiment keys parser against the original regular expression pipeline."""
+    from ..benchmarks import benchmark_experiment_keys_parsing
+
+    results = benchmark_experiment_keys_parsing(directory=pathlib.Path(datapath), number_of_repeats=repeats)
+    click.echo(json.dumps(results, indent=2))
+
+
+# vandermeerlab2bids benchmark intervals
+@_vandermeerlab_to_bids_benchmark_cli.command(name="intervals")
+@click.option(
+    "--trials",
+    help="The number of trials in a synthetic session; may be given more than once.",
+    required=False,
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=(10_000, 100_000, 1_000_000),
+)
+@click.option(
+    "--max-row-by-row-trials",
+    help="The largest session for which to also time adding the trials one row at a time.",
+    required=False,
+    type=click.IntRange(min=0),
+    default=100_000,
+)
+def _vandermeerlab_to_bids_benchmark_intervals_cli(
+    trials: tuple[int, ...] = (10_000, 100_000, 1_000_000), max_row_by_row_trials: int = 100_000
+) -> None:
+    """Compare vectorized loading of the odor ON/OFF times against adding the trials one row at a time."""
+    from ..benchmarks import benchmark_odor_intervals
+
+    results = benchmark_odor_intervals(numbers_of_trials=trials, maximum_row_by_row_trials=max_row_by_row_trials)
+    click.echo(json.dumps(results, indent=2))
+
+
+# vandermeerlab2bids benchmark units
+@_vandermeerlab_to_bids_benchmark_cli.command(name="units")
+@click.option(
+    "--units",
+    help="The number of units per probe in the synthetic session.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=2_000,
+)
+@click.option(
+    "--spikes",
+    help="The number of spikes per unit in the synthetic session.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=5_000,
+)
+@click.option(
+    "--probes",
+    help="The number of probes (and so `clean_units_imec*.mat` files) in the synthetic session.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=2,
+)
+@click.option(
+    "--mat-version",
+    help="The version of the MATLAB file format in which to write the synthetic session.",
+    required=False,
+    type=click.Choice(["5", "7.3"]),
+    default="5",
+)
+def _vandermeerlab_to_bids_benchmark_units_cli(
+    units: int = 2_000, spikes: int = 5_000, probes: int = 2, mat_version: typing.Literal["5", "7.3"] = "5"
+) -> None:
+    """Compare the peak memory used to load the spike sorted units, with and without lazy loading."""
+    from ..benchmarks import benchmark_spike_sorting_memory
+
+    results = benchmark_spike_sorting_memory(
+        number_of_units_per_probe=units,
+        number_of_spikes_per_unit=spikes,
+        number_of_probes=probes,
+        mat_version=mat_version,
+    )
+    click.echo(json.dumps(results, indent=2))
+
+
+# vandermeerlab2bids benchmark spike-trains
+@_vandermeerlab_to_bids_benchmark_cli.command(name="spike-trains")
+@click.option(
+    "--units",
+    help="The number of units to generate.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=5_000,
+)
+@click.option(
+    "--spikes",
+    help="The number of spikes per unit to generate.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=100_000,
+)
+@click.option(
+    "--chunks",
+    help="The number of consecutive windows in which to also extract the spike trains.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=10,
+)
+def _vandermeerlab_to_bids_benchmark_spike_trains_cli(
+    units: int = 5_000, spikes: int = 100_000, chunks: int = 10
+) -> None:
+    """Compare extracting spike trains from precomputed frames against converting the spike times on every call."""
+    from ..benchmarks import benchmark_spike_train_extraction
+
+    results = benchmark_spike_train_extraction(
+        number_of_units=units, number_of_spikes_per_unit=spikes, number_of_chunks=chunks
+    )
+    click.echo(json.dumps(results, indent=2))
+
+
+# vandermeerlab2bids benchmark write-profiles
+@_vandermeerlab_to_bids_benchmark_cli.command(name="write-profiles")
+@click.option(
+    "--datapath",
+    help="Path to the directory containing all of the data from the experiment.",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--subject",
+    help="ID of the subject.",
+    required=True,
+    type=str,
+)
+@click.option(
+    "--session",
+    help="ID of the session.",
+    required=True,
+    type=str,
+)
+@click.option(
+    "--stream",
+    type=click.Choice(["raw", "processed"], case_sensitive=False),
+    help="The specifier of the data streams to convert (e.g., 'raw' or 'processed').",
+    required=False,
+    default="raw",
+)
+@click.option(
+    "--full",
+    help="Write the full raw streams rather than a stub of each.",
+    is_flag=True,
+    required=False,
+    default=False,
+)
+def _vandermeerlab_to_bids_benchmark_write_profiles_cli(
+    datapath: str,
+    subject: str,
+    session: str,
+    stream: typing.Literal["raw", "processed"] = "raw",
+    full: bool = False,
+) -> None:
+    """Compare the time taken to write a session, and the size of the file written, with each write profile."""
+    from ..benchmarks import benchmark_write_profiles
+
+    results = benchmark_write_profiles(
+        data_directory=pathlib.Path(datapath),
+        subject_id=subject,
+        session_id=session,
+        raw_or_processed=stream,
+        testing=not full,
+    )
+    click.echo(json.dumps(results, indent=2))
+
+
+# vandermeerlab2bids benchmark backends
+@_vandermeerlab_to_bids_benchmark_cli.command(name="backends")
+@click.option(
+    "--datapath",
+    help="Path to the directory containing all of the data from the experiment.",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--subject",
+    help="ID of the subject.",
+    required=True,
+    type=str,
+)
+@click.option(
+    "--session",
+    help="ID of the session.",
+    required=True,
+    type=str,
+)
+@click.option(
+    "--stream",
+    type=click.Choice(["raw", "processed"], case_sensitive=False),
+    help="The specifier of the data streams to convert (e.g., 'raw' or 'processed').",
+    required=False,
+    default="raw",
+)
+@click.option(
+    "--write-profile",
+    help="The write profile with which to write both files.",
+    required=False,
+    type=click.Choice(["fast", "balanced", "archive"], case_sensitive=False),
+    default="balanced",
+)
+@click.option(
+    "--compression-workers",
+    help="The number of processes compressing in parallel for the Zarr backend (by default, one per CPU).",
+    required=False,
+    type=click.IntRange(min=1),
+    default=None,
+)
+@click.option(
+    "--full",
+    help="Write the full raw streams rather than a stub of each.",
+    is_flag=True,
+    required=False,
+    default=False,
+)
+def _vandermeerlab_to_bids_benchmark_backends_cli(
+    datapath: str,
+    subject: str,
+    session: str,
+    stream: typing.Literal["raw", "processed"] = "raw",
+    write_profile: typing.Literal["fast", "balanced", "archive"] = "balanced",
+    compression_workers: int | None = None,
+    full: bool = False,
+) -> None:
+    """Compare the throughput of writing a session with the HDF5 backend against that of the Zarr backend."""
+    from ..benchmarks import benchmark_backends
+
+    results = benchmark_backends(
+        data_directory=pathlib.Path(datapath),
+        subject_id=subject,
+        session_id=session,
+        raw_or_processed=stream,
+        testing=not full,
+        write_profile=write_profile,
+        number_of_compression_workers=compression_workers,
+    )
+    click.echo(json.dumps(results, indent=2))
+
+
+# vandermeerlab2bids benchmark stages
+@_vandermeerlab_to_bids_benchmark_cli.command(name="stages")
+@click.option(
+    "--scale",
+    help="The scale of the synthetic session (see `BENCHMARK_SCALES`); may be given more than once.",
+    required=False,
+    type=click.Choice(["small", "medium", "large"], case_sensitive=False),
+    multiple=True,
+    default=("small", "medium"),
+)
+@click.option(
+    "--repeats",
+    help="The number of times to convert the session at each scale, keeping the fastest time of each stage.",
+    required=False,
+    type=click.IntRange(min=1),
+    default=3,
+)
+@click.option(
+    "--raw-seconds",
+    help="The duration of the synthetic SpikeGLX recording whose conversion is also timed.",
+    required=False,
+    type=click.FloatRange(min=0.0, min_open=True),
+    default=0.5,
+)
+@click.option(
+    "--no-raw",
+    help="Skip timing the conversion of the synthetic SpikeGLX recording.",
+    is_flag=True,
+    required=False,
+    default=False,
+)
+@click.option(
+    "--output",
+    help="Path to the JSON file in which to store the results (by default, under the records directory).",
+    required=False,
+    type=click.Path(dir_okay=False),
+    default=None,
+)
+@click.option(
+    "--baseline",
+    help="Path to the JSON results of an earlier run against which to compare each stage.",
+    required=False,
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+)
+def _vandermeerlab_to_bids_benchmark_stages_cli(
+    scale: tuple[str, ...] = ("small", "medium"),
+    repeats: int = 3,
+    raw_seconds: float = 0.5,
+    no_raw: bool = False,
+    output: str | None = None,
+    baseline: str | None = None,
+) -> None:
+    """Time each stage of the conversion of a synthetic session at several scales, storing the results as JSON."""
+    from ..benchmarks import benchmark_conversion_stages
+
+    results = benchmark_conversion_stages(
+        scales=scale,
+        number_of_repeats=repeats,
+        raw_duration_seconds=None if no_raw else raw_seconds,
+        results_file_path=pathlib.Path(output) if output is not None else None,
+        baseline_file_path=pathlib.Path(baseline) if baseline is not None else None,
+    )
+    click.echo(json.dumps(results, indent=2))
+
+
+def _echo_conversion_plan(session_plans: list) -> None:
+    """Print a table of the planned action for each session, followed by a summary."""
+    for session_plan in session_plans:
+        units = f"{session_plan.number_of_units} units" if session_plan.number_of_units is not None else ""
+        click.echo(
+            f"{session_plan.action:<8} sub-{session_plan.subject_id:<8} ses-{session_plan.session_id:<12} "
+            f"{_format_bytes(session_plan.input_bytes):>10} {units:>12}  {session_plan.reason}"
+        )
+
+    sessions_to_convert = [session_plan for session_plan in session_plans if session_plan.action == "convert"]
+    bytes_to_convert = sum(session_plan.input_bytes for session_plan in sessions_to_convert)
+    click.echo(
+        f"\n{len(sessions_to_convert)} session(s) to convert ({_format_bytes(bytes_to_convert)} of source data), "
+        f"{len(session_plans) - len(sessions_to_convert)} to skip."
+    )
+
+
+def _parse_dataset_write_profiles(dataset_write_profiles: tuple[str, ...]) -> dict[str, str]:
+    """Parse the `--dataset-write-profile` options, each of the form CATEGORY=PROFILE."""
+    dataset_write_profiles_by_category = dict()
+    for dataset_write_profile in dataset_write_profiles:
+        category, separator, profile_name = dataset_write_profile.partition("=")
+        if separator == "":
+            message = (
+                f"Invalid --dataset-write-profile '{dataset_write_profile}' - must be of the form CATEGORY=PROFILE."
             )
+            raise click.BadParameter(message)
+        dataset_write_profiles_by_category[category.strip().lower()] = profile_name.strip().lower()
+    return dataset_write_profiles_by_category
+
+
+def _get_slurm_array_task() -> tuple[int, int]:
+    """Get the index of this task within its SLURM job array, counted from zero, and the number of tasks in it."""
+    task_id = int(os.environ["SLURM_ARRAY_TASK_ID"])
+    task_min = int(os.environ.get("SLURM_ARRAY_TASK_MIN", 0))
+    task_step = int(os.environ.get("SLURM_ARRAY_TASK_STEP", 1))
+    task_count = int(os.environ.get("SLURM_ARRAY_TASK_COUNT", 1))
+    return (task_id - task_min) // task_step, task_count
+
+
+def _format_bytes(number_of_bytes: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if number_of_bytes < 1e3:
+            return f"{number_of_bytes:.1f} {unit}"
+        number_of_bytes /= 1e3
+    return f"{number_of_bytes:.1f} TB"
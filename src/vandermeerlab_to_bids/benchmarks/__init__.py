@@ -0,0 +1,20 @@
+"""Benchmarks of the performance-critical steps of the conversion."""
+
+from ._backends import benchmark_backends
+from ._conversion_stages import BENCHMARK_SCALES, benchmark_conversion_stages
+from ._experiment_keys import benchmark_experiment_keys_parsing
+from ._odor_intervals import benchmark_odor_intervals
+from ._spike_sorting import benchmark_spike_sorting_memory
+from ._spike_trains import benchmark_spike_train_extraction
+from ._write_profiles import benchmark_write_profiles
+
+__all__ = [
+    "BENCHMARK_SCALES",
+    "benchmark_backends",
+    "benchmark_conversion_stages",
+    "benchmark_experiment_keys_parsing",
+    "benchmark_odor_intervals",
+    "benchmark_spike_sorting_memory",
+    "benchmark_spike_train_extraction",
+    "benchmark_write_profiles",
+]
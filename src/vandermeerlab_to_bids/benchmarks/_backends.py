@@ -0,0 +1,79 @@
+"""Benchmark of writing NWB files with the HDF5 and Zarr backends."""
+
+import os
+import pathlib
+import tempfile
+import typing
+import warnings
+
+import hdmf.build.warnings
+import pydantic
+
+from ._write_profiles import _measure_session_write
+from ..manish_2025._conversion_plan import get_session_paths
+
+
+@pydantic.validate_call
+def benchmark_backends(
+    *,
+    data_directory: pydantic.DirectoryPath,
+    subject_id: str,
+    session_id: str,
+    raw_or_processed: typing.Literal["raw", "processed"] = "raw",
+    testing: bool = True,
+    write_profile: typing.Literal["fast", "balanced", "archive"] = "balanced",
+    number_of_compression_workers: pydantic.PositiveInt | None = None,
+) -> dict[str, typing.Any]:
+    """
+    Compare the throughput of writing a session with the HDF5 backend against that of the Zarr backend.
+
+    The Zarr file is written from a single process ('zarr') and, given more than one CPU, again with
+    `number_of_compression_workers` processes (by default, one per CPU) compressing the chunks of the raw streams
+    in parallel ('zarr_parallel').
+    With `testing`, only a stub of each raw stream is written, as in a test conversion.
+
+    Returns
+    -------
+    dict
+        For each backend (and number of workers), the time in seconds to write the file, its size in bytes, the size
+        of the data before compression, and the throughput (in megabytes of data before compression per second).
+    """
+    number_of_compression_workers = number_of_compression_workers or os.cpu_count() or 1
+    results: dict[str, typing.Any] = {
+        "subject_id": subject_id,
+        "session_id": session_id,
+        "raw_or_processed": raw_or_processed,
+        "testing": testing,
+        "write_profile": write_profile,
+        "number_of_compression_workers": number_of_compression_workers,
+    }
+
+    warnings.filterwarnings(
+        action="ignore",
+        message=r".*TimeIntervals/.*_time.*",
+        category=hdmf.build.warnings.DtypeConversionWarning,
+    )
+    with tempfile.TemporaryDirectory(prefix="vandermeerlab_to_bids_benchmark_") as temporary_directory:
+        session_paths = get_session_paths(
+            data_directory=data_directory,
+            subject_id=subject_id,
+            session_id=session_id,
+            nwb_directory=pathlib.Path(temporary_directory),
+            raw_or_processed=raw_or_processed,
+        )
+
+        runs = {"hdf5": ("hdf5", 1, "nwb"), "zarr": ("zarr", 1, "nwb.zarr")}
+        if number_of_compression_workers > 1:
+            runs["zarr_parallel"] = ("zarr", number_of_compression_workers, "nwb.zarr")
+        for name, (backend, number_of_workers, extension) in runs.items():
+            results[name] = _measure_session_write(
+                session_paths=session_paths,
+                raw_or_processed=raw_or_processed,
+                testing=testing,
+                write_profile=write_profile,
+                nwbfile_path=pathlib.Path(temporary_directory) / f"{name}.{extension}",
+                backend=backend,
+                number_of_compression_workers=number_of_workers,
+            )
+
+    return results
@@ -0,0 +1,293 @@
+"""Benchmark of each stage of the conversion of a synthetic session, at several scales."""
+
+import contextlib
+import datetime
+import importlib.metadata
+import json
+import os
+import pathlib
+import platform
+import statistics
+import tempfile
+import time
+import typing
+import warnings
+
+import hdmf.build.warnings
+import neuroconv.tools.nwb_helpers
+import neuroconv.utils
+import pydantic
+
+from ._synthetic import write_synthetic_session
+from ..manish_2025._conversion_plan import get_session_paths
+from ..manish_2025._odor_sequence_to_nwb import _create_session_nwbfile, _remove_nwbfile, _write_nwbfile
+from ..manish_2025.interfaces import OdorIntervalsInterface, SpikeSortedInterface
+from ..utils import apply_write_profiles, enhance_metadata, get_records_directory, read_experiment_keys_file
+from ..utils._experiment_keys import _read_experiment_keys_file_cached
+
+BenchmarkScale = typing.Literal["small", "medium", "large"]
+
+# The size of the synthetic session at each scale; these are fixed so that results remain comparable across releases
+BENCHMARK_SCALES: dict[str, dict[str, int]] = {
+    "small": {"number_of_trials": 1_000, "number_of_units_per_probe": 50, "number_of_spikes_per_unit": 1_000},
+    "medium": {"number_of_trials": 10_000, "number_of_units_per_probe": 500, "number_of_spikes_per_unit": 5_000},
+    "large": {"number_of_trials": 100_000, "number_of_units_per_probe": 2_000, "number_of_spikes_per_unit": 10_000},
+}
+_DISTRIBUTION_NAMES = ("vandermeerlab_to_bids", "neuroconv", "pynwb", "hdmf", "h5py", "numpy", "scipy")
+
+
+@pydantic.validate_call
+def benchmark_conversion_stages(
+    *,
+    scales: tuple[BenchmarkScale, ...] = ("small", "medium"),
+    number_of_repeats: pydantic.PositiveInt = 3,
+    raw_duration_seconds: pydantic.PositiveFloat | None = 0.5,
+    write_profile: typing.Literal["fast", "balanced", "archive"] = "balanced",
+    results_file_path: pathlib.Path | None = None,
+    baseline_file_path: pydantic.FilePath | None = None,
+) -> dict[str, typing.Any]:
+    """
+    Time each stage of the conversion of a synthetic session, at each of several scales.
+
+    For each scale, a synthetic session (see `BENCHMARK_SCALES`) is written to a temporary directory and converted
+    `number_of_repeats` times, timing each stage of the processed conversion in turn: parsing the experiment keys,
+    building the metadata, building the trials table from the odor intervals, extracting the spike sorted units,
+    adding them to the units table, configuring the backend, and writing the HDF5 file.
+    Unless `raw_duration_seconds` is None, a SpikeGLX recording of that duration is also written (once, since it does
+    not depend on the scale) and its conversion timed in the same way.
+
+    Nothing is downloaded; the results, along with the versions of the packages and the platform, are written as JSON
+    to the `results_file_path` (by default, to `~/.vandermeerlab_to_bids/records/benchmarks`).
+
+    Parameters
+    ----------
+    baseline_file_path : file path, optional
+        The results of an earlier run (such as from a previous release) against which to compare each stage.
+
+    Returns
+    -------
+    dict
+        For each scale, the size of the session and the fastest (and median) time in seconds taken by each stage;
+        given a baseline, also the ratio of each fastest time to that of the baseline (above 1 being slower).
+    """
+    timestamp = datetime.datetime.now()
+    results: dict[str, typing.Any] = {
+        "timestamp": timestamp.isoformat(timespec="seconds"),
+        "versions": {name: _get_distribution_version(name=name) for name in _DISTRIBUTION_NAMES},
+        "platform": {
+            "python": platform.python_version(),
+            "system": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "number_of_cpus": os.cpu_count(),
+        },
+        "number_of_repeats": number_of_repeats,
+        "write_profile": write_profile,
+        "scales": dict(),
+    }
+
+    warnings.filterwarnings(
+        action="ignore",
+        message=r".*TimeIntervals/.*_time.*",
+        category=hdmf.build.warnings.DtypeConversionWarning,
+    )
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix="vandermeerlab_to_bids_benchmark_") as temporary_directory:
+            data_directory = pathlib.Path(temporary_directory) / "sourcedata"
+            subject_id, session_id = write_synthetic_session(
+                data_directory=data_directory, raw_duration_seconds=None, **BENCHMARK_SCALES[scale]
+            )
+            session_paths = get_session_paths(
+                data_directory=data_directory,
+                subject_id=subject_id,
+                session_id=session_id,
+                nwb_directory=pathlib.Path(temporary_directory) / "nwb",
+                raw_or_processed="processed",
+            )
+
+            stage_results, output_bytes = _repeat_stages(
+                measure_stages=_measure_processed_stages,
+                number_of_repeats=number_of_repeats,
+                session_paths=session_paths,
+                write_profile=write_profile,
+            )
+            results["scales"][scale] = {
+                **BENCHMARK_SCALES[scale],
+                "source_bytes": _get_total_bytes(paths=session_paths["input_file_paths"]),
+                "output_bytes": output_bytes,
+                "stages": stage_results,
+            }
+
+    if raw_duration_seconds is not None:
+        with tempfile.TemporaryDirectory(prefix="vandermeerlab_to_bids_benchmark_") as temporary_directory:
+            data_directory = pathlib.Path(temporary_directory) / "sourcedata"
+            subject_id, session_id = write_synthetic_session(
+                data_directory=data_directory, raw_duration_seconds=raw_duration_seconds, **BENCHMARK_SCALES["small"]
+            )
+            session_paths = get_session_paths(
+                data_directory=data_directory,
+                subject_id=subject_id,
+                session_id=session_id,
+                nwb_directory=pathlib.Path(temporary_directory) / "nwb",
+                raw_or_processed="raw",
+            )
+
+            stage_results, output_bytes = _repeat_stages(
+                measure_stages=_measure_raw_stages,
+                number_of_repeats=number_of_repeats,
+                session_paths=session_paths,
+                write_profile=write_profile,
+            )
+            results["scales"]["raw"] = {
+                "duration_seconds": raw_duration_seconds,
+                "source_bytes": _get_total_bytes(paths=session_paths["input_file_paths"]),
+                "output_bytes": output_bytes,
+                "stages": stage_results,
+            }
+
+    if baseline_file_path is not None:
+        baseline_results = json.loads(baseline_file_path.read_text())
+        results["baseline"] = {
+            "file_path": str(baseline_file_path),
+            "versions": baseline_results.get("versions", dict()),
+            "ratios": _compare_to_baseline(results=results, baseline_results=baseline_results),
+        }
+
+    if results_file_path is None:
+        results_directory = get_records_directory() / "benchmarks"
+        results_directory.mkdir(exist_ok=True)
+        results_file_path = (
+            results_directory
+            / f"conversion_stages_{results['versions']['vandermeerlab_to_bids']}_{timestamp:%Y%m%d%H%M%S}.json"
+        )
+    results_file_path.parent.mkdir(parents=True, exist_ok=True)
+    results_file_path.write_text(json.dumps(results, indent=2))
+    results["results_file_path"] = str(results_file_path)
+
+    return results
+
+
+def _repeat_stages(
+    *,
+    measure_stages: typing.Callable[..., tuple[dict[str, float], int]],
+    number_of_repeats: int,
+    session_paths: dict[str, typing.Any],
+    write_profile: str,
+) -> tuple[dict[str, dict[str, float]], int]:
+    """Measure every stage `number_of_repeats` times, keeping the fastest and the median time of each."""
+    all_stage_seconds: dict[str, list[float]] = dict()
+    for _ in range(number_of_repeats):
+        stage_seconds, output_bytes = measure_stages(session_paths=session_paths, write_profile=write_profile)
+        for stage, seconds in stage_seconds.items():
+            all_stage_seconds.setdefault(stage, []).append(seconds)
+
+    stage_results = {
+        stage: {"seconds": min(seconds), "median_seconds": statistics.median(seconds)}
+        for stage, seconds in all_stage_seconds.items()
+    }
+    return stage_results, output_bytes
+
+
+def _measure_processed_stages(
+    *, session_paths: dict[str, typing.Any], write_profile: str
+) -> tuple[dict[str, float], int]:
+    """Convert the processed data of a session, one stage at a time, as in `_create_session_nwbfile`."""
+    preprocessed_data_directory = session_paths["preprocessed_data_directory"]
+    nwbfile_path = session_paths["nwbfile_path"]
+    nwbfile_path.parent.mkdir(parents=True, exist_ok=True)
+    stage_seconds: dict[str, float] = dict()
+
+    # Parsed experiment keys are cached in memory, so the cache is cleared for each repeat to time the parsing itself
+    _read_experiment_keys_file_cached.cache_clear()
+    experiment_keys_file_name = f"{preprocessed_data_directory.name.replace('-', '_')}_keys.m"
+    with _time_stage(stage_seconds=stage_seconds, stage="key_parsing"):
+        read_experiment_keys_file(file_path=preprocessed_data_directory / experiment_keys_file_name)
+
+    with _time_stage(stage_seconds=stage_seconds, stage="metadata"):
+        metadata = neuroconv.utils.DeepDict()
+        enhance_metadata(metadata=metadata, preprocessed_data_directory=preprocessed_data_directory)
+
+    with _time_stage(stage_seconds=stage_seconds, stage="intervals"):
+        odor_interface = OdorIntervalsInterface(preprocessed_data_directory=preprocessed_data_directory)
+        nwbfile = odor_interface.create_nwbfile(metadata=metadata)
+
+    with _time_stage(stage_seconds=stage_seconds, stage="sorting_extraction"):
+        spike_sorted_interface = SpikeSortedInterface(preprocessed_data_directory=preprocessed_data_directory)
+
+    with _time_stage(stage_seconds=stage_seconds, stage="units_table"):
+        spike_sorted_interface.add_to_nwbfile(nwbfile=nwbfile)
+
+    with _time_stage(stage_seconds=stage_seconds, stage="backend_configuration"):
+        backend_configuration = neuroconv.tools.nwb_helpers.get_default_backend_configuration(
+            nwbfile=nwbfile, backend="hdf5"
+        )
+        apply_write_profiles(backend_configuration=backend_configuration, write_profile=write_profile)
+
+    with _time_stage(stage_seconds=stage_seconds, stage="hdf5_write"):
+        _write_nwbfile(nwbfile=nwbfile, nwbfile_path=nwbfile_path, backend_configuration=backend_configuration)
+
+    output_bytes = nwbfile_path.stat().st_size
+    _remove_nwbfile(nwbfile_path=nwbfile_path)
+
+    return stage_seconds, output_bytes
+
+
+def _measure_raw_stages(*, session_paths: dict[str, typing.Any], write_profile: str) -> tuple[dict[str, float], int]:
+    """Convert the SpikeGLX recording of a session; its streams are only read as they are written."""
+    nwbfile_path = session_paths["nwbfile_path"]
+    nwbfile_path.parent.mkdir(parents=True, exist_ok=True)
+    stage_seconds: dict[str, float] = dict()
+
+    with _time_stage(stage_seconds=stage_seconds, stage="raw_nwbfile"):
+        nwbfile = _create_session_nwbfile(
+            raw_data_directory=session_paths["raw_data_directory"],
+            preprocessed_data_directory=session_paths["preprocessed_data_directory"],
+            raw_or_processed="raw",
+            write_profile=write_profile,
+        )
+
+    with _time_stage(stage_seconds=stage_seconds, stage="backend_configuration"):
+        backend_configuration = neuroconv.tools.nwb_helpers.get_default_backend_configuration(
+            nwbfile=nwbfile, backend="hdf5"
+        )
+        apply_write_profiles(backend_configuration=backend_configuration, write_profile=write_profile)
+
+    with _time_stage(stage_seconds=stage_seconds, stage="hdf5_write"):
+        _write_nwbfile(nwbfile=nwbfile, nwbfile_path=nwbfile_path, backend_configuration=backend_configuration)
+
+    output_bytes = nwbfile_path.stat().st_size
+    _remove_nwbfile(nwbfile_path=nwbfile_path)
+
+    return stage_seconds, output_bytes
+
+
+@contextlib.contextmanager
+def _time_stage(stage_seconds: dict[str, float], stage: str) -> typing.Iterator[None]:
+    start_time = time.perf_counter()
+    yield
+    stage_seconds[stage] = time.perf_counter() - start_time
+
+
+def _compare_to_baseline(
+    results: dict[str, typing.Any], baseline_results: dict[str, typing.Any]
+) -> dict[str, dict[str, float]]:
+    """The ratio of the fastest time of each stage to that of the baseline, for the scales and stages of both."""
+    ratios = dict()
+    for scale, scale_results in results["scales"].items():
+        baseline_stages = baseline_results.get("scales", dict()).get(scale, dict()).get("stages", dict())
+        ratios[scale] = {
+            stage: stage_results["seconds"] / baseline_stages[stage]["seconds"]
+            for stage, stage_results in scale_results["stages"].items()
+            if stage in baseline_stages and baseline_stages[stage]["seconds"] > 0
+        }
+    return ratios
+
+
+def _get_distribution_version(name: str) -> str | None:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _get_total_bytes(paths: list[pathlib.Path]) -> int:
+    return sum(path.stat().st_size for path in paths if path.is_file())
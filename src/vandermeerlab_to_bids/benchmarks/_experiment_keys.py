@@ -0,0 +1,81 @@
+"""Benchmark of the parsers for the experiment keys (.m) files."""
+
+import time
+
+import pydantic
+
+from ..utils._experiment_keys import (
+    _parse_experiment_keys_with_regex,
+    _read_experiment_keys_file_cached,
+    parse_experiment_keys,
+    read_experiment_keys_file,
+)
+
+
+@pydantic.validate_call
+def benchmark_experiment_keys_parsing(
+    directory: pydantic.DirectoryPath, number_of_repeats: pydantic.PositiveInt = 10
+) -> dict[str, float | int | list[str]]:
+    """
+    Compare the single-pass parser of experiment keys files against the original regular expression pipeline.
+
+    Every `*_keys.m` file found under the `directory` is parsed `number_of_repeats` times by each approach.
+    The cached reader is timed on the same files, as seen by every reader after the first within a conversion.
+
+    Returns
+    -------
+    dict
+        The number of files, the mean time in seconds to parse one file with each approach, and the names of any
+        files on which the two parsers disagree (or which only one of them can parse).
+    """
+    file_paths = sorted(directory.rglob(pattern="*_keys.m"))
+    if not any(file_paths):
+        message = f"No experiment keys files (`*_keys.m`) were found under {directory}."
+        raise ValueError(message)
+
+    contents = {file_path: file_path.read_text() for file_path in file_paths}
+
+    mismatched_files = []
+    for file_path, content in contents.items():
+        try:
+            matches = parse_experiment_keys(content=content) == _parse_experiment_keys_with_regex(content=content)
+        except ValueError:
+            matches = False
+        if not matches:
+            mismatched_files.append(file_path.name)
+
+    comparable_contents = [content for file_path, content in contents.items() if file_path.name not in mismatched_files]
+    regex_seconds = _time_per_call(
+        function=_parse_experiment_keys_with_regex, arguments=comparable_contents, number_of_repeats=number_of_repeats
+    )
+    single_pass_seconds = _time_per_call(
+        function=parse_experiment_keys, arguments=comparable_contents, number_of_repeats=number_of_repeats
+    )
+
+    _read_experiment_keys_file_cached.cache_clear()
+    for file_path in file_paths:
+        read_experiment_keys_file(file_path=file_path)
+    cached_seconds = _time_per_call(
+        function=read_experiment_keys_file, arguments=file_paths, number_of_repeats=number_of_repeats
+    )
+
+    results = {
+        "number_of_files": len(file_paths),
+        "regex_seconds_per_file": regex_seconds,
+        "single_pass_seconds_per_file": single_pass_seconds,
+        "cached_seconds_per_file": cached_seconds,
+        "speedup": regex_seconds / single_pass_seconds if single_pass_seconds > 0 else float("inf"),
+        "mismatched_files": mismatched_files,
+    }
+    return results
+
+
+def _time_per_call(function: callable, arguments: list, number_of_repeats: int) -> float:
+    if not any(arguments):
+        return float("nan")
+
+    start_time = time.perf_counter()
+    for _ in range(number_of_repeats):
+        for argument in arguments:
+            function(argument)
+    return (time.perf_counter() - start_time) / (number_of_repeats * len(arguments))
@@ -0,0 +1,107 @@
+"""Benchmark of loading the odor ON/OFF times into the trials table."""
+
+import pathlib
+import tempfile
+import time
+
+import numpy
+import pydantic
+import pynwb
+import pynwb.testing.mock.file
+
+from ._synthetic import SYNTHETIC_SESSION_ID, write_synthetic_odor_session
+from ..manish_2025.interfaces import OdorIntervalsInterface
+
+
+@pydantic.validate_call
+def benchmark_odor_intervals(
+    numbers_of_trials: tuple[pydantic.PositiveInt, ...] = (10_000, 100_000, 1_000_000),
+    maximum_row_by_row_trials: pydantic.NonNegativeInt = 100_000,
+) -> list[dict[str, float | int | bool | None]]:
+    """
+    Compare the vectorized loading of ON/OFF times into the trials table against adding each trial as its own row.
+
+    For each of the `numbers_of_trials`, a synthetic session is written to a temporary directory with that many
+    trials spread across several odor channels. Adding rows one at a time grows too slow to be practical for the
+    largest sessions, so that approach is only timed up to `maximum_row_by_row_trials`.
+
+    Returns
+    -------
+    list of dict
+        For each number of trials, the time in seconds taken by each approach, the speedup, and whether both
+        approaches produced identical tables (None where the row-by-row approach was not run).
+    """
+    results = []
+    for number_of_trials in numbers_of_trials:
+        with tempfile.TemporaryDirectory(prefix="vandermeerlab_to_bids_benchmark_") as temporary_directory:
+            preprocessed_data_directory = pathlib.Path(temporary_directory) / SYNTHETIC_SESSION_ID
+            write_synthetic_odor_session(
+                preprocessed_data_directory=preprocessed_data_directory, number_of_trials=number_of_trials
+            )
+            interface = OdorIntervalsInterface(preprocessed_data_directory=preprocessed_data_directory)
+
+            nwbfile = pynwb.testing.mock.file.mock_NWBFile()
+            start_time = time.perf_counter()
+            interface.add_to_nwbfile(nwbfile=nwbfile)
+            vectorized_seconds = time.perf_counter() - start_time
+
+            row_by_row_seconds = None
+            tables_match = None
+            if number_of_trials <= maximum_row_by_row_trials:
+                start_time = time.perf_counter()
+                row_by_row_trials = _create_trials_row_by_row(interface=interface)
+                row_by_row_seconds = time.perf_counter() - start_time
+
+                tables_match = _are_tables_equal(
+                    first_table=nwbfile.trials.to_dataframe(), second_table=row_by_row_trials.to_dataframe()
+                )
+
+        results.append(
+            {
+                "number_of_trials": number_of_trials,
+                "vectorized_seconds": vectorized_seconds,
+                "row_by_row_seconds": row_by_row_seconds,
+                "speedup": row_by_row_seconds / vectorized_seconds if row_by_row_seconds is not None else None,
+                "tables_match": tables_match,
+            }
+        )
+
+    return results
+
+
+def _create_trials_row_by_row(interface: OdorIntervalsInterface) -> pynwb.epoch.TimeIntervals:
+    """The original approach of reading each file line by line and adding each trial as its own row."""
+    odor_ids = interface._get_odor_ids()
+
+    trials = pynwb.epoch.TimeIntervals(name="trials", description="The on/off timing of presented odors IDs.")
+    trials.add_column(name="odorant_id", description="The odorant ID that was presented during this trial.")
+
+    all_trials = []
+    for odor_id in odor_ids:
+        channel_key = f"odor{odor_id}_channel" if odor_id != "neutral" else "neutral_odor_channel"
+        channel_name = interface.experiment_keys[channel_key]
+
+        on_channel_file_path = interface.preprocessed_data_directory / f"{channel_name}_ON.txt"
+        off_channel_file_path = interface.preprocessed_data_directory / f"{channel_name}_OFF.txt"
+        with on_channel_file_path.open("r") as on_file_stream, off_channel_file_path.open("r") as off_file_stream:
+            all_trials.extend(
+                [
+                    {"start_time": float(on_time), "stop_time": float(off_time), "odorant_id": odor_id}
+                    for on_time, off_time in zip(on_file_stream, off_file_stream)
+                ]
+            )
+
+    all_trials.sort(key=lambda row: row["start_time"])
+    for row in all_trials:
+        trials.add_row(start_time=row["start_time"], stop_time=row["stop_time"], odorant_id=row["odorant_id"])
+
+    return trials
+
+
+def _are_tables_equal(first_table, second_table) -> bool:
+    """Only the columns common to both tables are compared, since the row-by-row reference omits the odor details."""
+    columns = ["start_time", "stop_time", "odorant_id"]
+    return bool(
+        numpy.array_equal(first_table.index.to_numpy(), second_table.index.to_numpy())
+        and first_table[columns].equals(second_table[columns])
+    )
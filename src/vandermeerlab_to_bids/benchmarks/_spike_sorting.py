@@ -0,0 +1,114 @@
+"""Benchmark of the memory used to load the spike sorted units."""
+
+import concurrent.futures
+import multiprocessing
+import pathlib
+import tempfile
+import time
+import typing
+
+import numpy
+import pydantic
+import pymatreader
+
+from ._synthetic import SYNTHETIC_SESSION_ID, write_synthetic_clean_units_files
+from ..manish_2025.interfaces._spike_sorting_extractor import VanDerMeerSortingExtractor
+from ..utils import get_memory_usage, get_peak_memory_usage
+
+
+@pydantic.validate_call
+def benchmark_spike_sorting_memory(
+    number_of_units_per_probe: pydantic.PositiveInt = 2_000,
+    number_of_spikes_per_unit: pydantic.PositiveInt = 5_000,
+    number_of_probes: pydantic.PositiveInt = 2,
+    mat_version: typing.Literal["5", "7.3"] = "5",
+) -> dict[str, typing.Any]:
+    """
+    Compare the peak memory used to load, and read every spike train from, synthetic `clean_units_imec*.mat` files.
+
+    Three approaches are measured, each in a fresh process so that their peak resident set sizes do not overlap:
+    the original approach of reading every variable of every file before packing the waveforms into a double precision
+    array ('original'), the current default ('eager'), and reading each spike train on demand with single precision
+    waveforms ('lazy').
+
+    Returns
+    -------
+    dict
+        The size of the synthetic files and, for each approach, the time taken and the peak resident set size reached
+        above that of the process before loading (in bytes).
+    """
+    results: dict[str, typing.Any] = {
+        "number_of_units_per_probe": number_of_units_per_probe,
+        "number_of_spikes_per_unit": number_of_spikes_per_unit,
+        "number_of_probes": number_of_probes,
+        "mat_version": mat_version,
+    }
+    with tempfile.TemporaryDirectory(prefix="vandermeerlab_to_bids_benchmark_") as temporary_directory:
+        preprocessed_data_directory = pathlib.Path(temporary_directory) / SYNTHETIC_SESSION_ID
+        write_synthetic_clean_units_files(
+            preprocessed_data_directory=preprocessed_data_directory,
+            number_of_units_per_probe=number_of_units_per_probe,
+            number_of_spikes_per_unit=number_of_spikes_per_unit,
+            number_of_probes=number_of_probes,
+            mat_version=mat_version,
+        )
+        results["source_bytes"] = sum(
+            file_path.stat().st_size for file_path in preprocessed_data_directory.glob(pattern="*.mat")
+        )
+
+        context = multiprocessing.get_context(method="spawn")
+        for mode in ("original", "eager", "lazy"):
+            # A new process per measurement, since the peak resident set size of a process can never decrease
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                future = executor.submit(
+                    _measure_spike_sorting_memory, preprocessed_data_directory=preprocessed_data_directory, mode=mode
+                )
+                results[mode] = future.result()
+
+    return results
+
+
+def _measure_spike_sorting_memory(
+    preprocessed_data_directory: pathlib.Path, mode: typing.Literal["original", "eager", "lazy"]
+) -> dict[str, float | int]:
+    baseline_memory_usage = get_memory_usage()
+
+    start_time = time.perf_counter()
+    if mode == "original":
+        _load_spike_sorting_as_originally(preprocessed_data_directory=preprocessed_data_directory)
+    else:
+        sorting_extractor = VanDerMeerSortingExtractor(
+            preprocessed_data_directory=preprocessed_data_directory, lazy=mode == "lazy"
+        )
+        # Bypass the spike vector which SpikeInterface would otherwise build from all spike trains on the first call
+        for unit_id in sorting_extractor.unit_ids:
+            sorting_extractor.get_unit_spike_train(unit_id=unit_id, use_cache=False)
+    seconds = time.perf_counter() - start_time
+
+    result = {"seconds": seconds, "peak_memory_bytes": get_peak_memory_usage() - baseline_memory_usage}
+    return result
+
+
+def _load_spike_sorting_as_originally(preprocessed_data_directory: pathlib.Path) -> None:
+    """The original approach: every variable of every file is held at once, alongside a padded double array."""
+    spike_sorted_arrays = {
+        file_path: pymatreader.read_mat(filename=file_path)
+        for file_path in preprocessed_data_directory.glob(pattern="clean_units_imec*.mat")
+    }
+
+    all_waveforms = [
+        numpy.asarray(waveforms)
+        for data_per_probe in spike_sorted_arrays.values()
+        for waveforms in data_per_probe["mean_waveforms"]
+    ]
+    waveform_means = numpy.full(
+        shape=(len(all_waveforms), all_waveforms[0].shape[1], max(waveforms.shape[0] for waveforms in all_waveforms)),
+        fill_value=numpy.nan,
+    )
+    for unit_index, waveforms in enumerate(all_waveforms):
+        number_of_channels, number_of_frames = waveforms.shape
+        waveform_means[unit_index, :number_of_frames, :number_of_channels] = waveforms.T
+
+    for data_per_probe in spike_sorted_arrays.values():
+        for spike_train in data_per_probe["spike_train"]:
+            (numpy.array(spike_train) * 30_000.0).astype(int)
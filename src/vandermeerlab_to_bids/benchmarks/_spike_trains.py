@@ -0,0 +1,125 @@
+"""Benchmark of extracting spike trains (in frames) from the spike sorting segment."""
+
+import time
+import typing
+
+import numpy
+import pydantic
+
+from ..manish_2025.interfaces._spike_sorting_extractor import (
+    VanDerMeerSortingSegment,
+    _convert_spike_times_to_frames,
+    _PackedSpikeTrains,
+)
+
+_SAMPLING_FREQUENCY = 30_000.0
+
+
+@pydantic.validate_call
+def benchmark_spike_train_extraction(
+    number_of_units: pydantic.PositiveInt = 5_000,
+    number_of_spikes_per_unit: pydantic.PositiveInt = 100_000,
+    number_of_chunks: pydantic.PositiveInt = 10,
+) -> dict[str, typing.Any]:
+    """
+    Compare extracting spike trains from precomputed, packed frames against converting the spike times on every call.
+
+    Synthetic spike times are generated in memory for `number_of_units` units over one hour. Each approach extracts
+    the full spike train of every unit, then every unit's spike train within each of `number_of_chunks` consecutive
+    windows (as chunked writers do). Note that the default size holds two copies of 500 million spikes (about 8 GB).
+
+    Returns
+    -------
+    dict
+        The time in seconds taken by each approach for each pattern of access, the time taken to precompute the
+        packed frames, and whether both approaches extracted identical frames.
+    """
+    spike_times_by_unit_id = _generate_spike_times(
+        number_of_units=number_of_units, number_of_spikes_per_unit=number_of_spikes_per_unit
+    )
+    unit_ids = numpy.array(list(spike_times_by_unit_id.keys()))
+
+    start_time = time.perf_counter()
+    packed_spike_trains = _PackedSpikeTrains.from_spike_frames(
+        unit_ids=unit_ids,
+        spike_frames_per_unit=[
+            _convert_spike_times_to_frames(spike_times=spike_times, sampling_frequency=_SAMPLING_FREQUENCY)
+            for spike_times in spike_times_by_unit_id.values()
+        ],
+    )
+    precompute_seconds = time.perf_counter() - start_time
+
+    segment = VanDerMeerSortingSegment(spike_frames_by_unit_id=packed_spike_trains)
+    per_call_segment = _PerCallSortingSegment(spike_times_by_unit_id=spike_times_by_unit_id)
+
+    number_of_frames = int(3_600 * _SAMPLING_FREQUENCY)
+    chunk_boundaries = numpy.linspace(start=0, stop=number_of_frames, num=number_of_chunks + 1).astype("int64")
+    frame_ranges = list(zip(chunk_boundaries[:-1], chunk_boundaries[1:]))
+
+    results: dict[str, typing.Any] = {
+        "number_of_units": number_of_units,
+        "number_of_spikes_per_unit": number_of_spikes_per_unit,
+        "number_of_chunks": number_of_chunks,
+        "precompute_seconds": precompute_seconds,
+    }
+    for name, sorting_segment in (("per_call", per_call_segment), ("packed", segment)):
+        start_time = time.perf_counter()
+        for unit_id in unit_ids:
+            sorting_segment.get_unit_spike_train(unit_id=unit_id)
+        results[f"{name}_full_seconds"] = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for start_frame, end_frame in frame_ranges:
+            for unit_id in unit_ids:
+                sorting_segment.get_unit_spike_train(unit_id=unit_id, start_frame=start_frame, end_frame=end_frame)
+        results[f"{name}_chunked_seconds"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    segment.get_all_unit_spike_trains()
+    results["packed_all_units_seconds"] = time.perf_counter() - start_time
+
+    results["speedup_full"] = results["per_call_full_seconds"] / results["packed_full_seconds"]
+    results["speedup_chunked"] = results["per_call_chunked_seconds"] / results["packed_chunked_seconds"]
+    results["frames_match"] = all(
+        numpy.array_equal(
+            segment.get_unit_spike_train(unit_id=unit_id, start_frame=start_frame, end_frame=end_frame),
+            per_call_segment.get_unit_spike_train(unit_id=unit_id, start_frame=start_frame, end_frame=end_frame),
+        )
+        for start_frame, end_frame in [(None, None), *frame_ranges]
+        for unit_id in unit_ids
+    )
+
+    return results
+
+
+def _generate_spike_times(number_of_units: int, number_of_spikes_per_unit: int) -> dict[str, numpy.ndarray]:
+    """Evenly spread, jittered spike times are already sorted, which avoids sorting hundreds of millions of values."""
+    random_number_generator = numpy.random.default_rng(seed=0)
+    interval = 3_600.0 / number_of_spikes_per_unit
+
+    spike_times_by_unit_id = dict()
+    for unit_index in range(number_of_units):
+        spike_times = numpy.arange(number_of_spikes_per_unit, dtype="float64")
+        spike_times += random_number_generator.uniform(size=number_of_spikes_per_unit)
+        spike_times *= interval
+        spike_times_by_unit_id[f"{unit_index:05d}"] = spike_times
+
+    return spike_times_by_unit_id
+
+
+class _PerCallSortingSegment:
+    """The original approach, which copies and converts the spike times on every call before masking them."""
+
+    def __init__(self, spike_times_by_unit_id: dict[str, numpy.ndarray]):
+        self._spike_times_by_unit_id = spike_times_by_unit_id
+
+    def get_unit_spike_train(
+        self, unit_id: str, start_frame: int | None = None, end_frame: int | None = None
+    ) -> numpy.ndarray:
+        times = numpy.array(self._spike_times_by_unit_id[unit_id])
+        frames = (times * _SAMPLING_FREQUENCY).astype(int)
+        if start_frame is not None:
+            frames = frames[frames >= start_frame]
+        if end_frame is not None:
+            frames = frames[frames < end_frame]
+        return frames
@@ -0,0 +1,301 @@
+"""Writers of synthetic source files, shaped like those of the van der Meer Lab, for use in benchmarks."""
+
+import pathlib
+import typing
+
+import h5py
+import numpy
+import scipy.io
+
+SYNTHETIC_SESSION_ID = "M000-2025-01-01"
+_ODOR_LETTERS = ("A", "B", "C", "D")
+_CHANNEL_NAMES = ("Port0", "Port1", "Port2", "Port3", "Port9")
+
+# The 128-byte header which identifies a MATLAB v7.3 file; the HDF5 content follows in the rest of a 512-byte block
+_MATLAB_73_HEADER = b"MATLAB 7.3 MAT-file, Platform: GLNXA64, Created on: Thu Jan  1 00:00:00 2025 HDF5 schema 1.00 ."
+_MATLAB_73_USERBLOCK_SIZE = 512
+
+_AP_SAMPLING_FREQUENCY = 30_000.0
+_NIDQ_SAMPLING_FREQUENCY = 25_000.0
+_NUMBER_OF_AP_CHANNELS = 384
+_SPIKEGLX_FILE_CREATE_TIME = "2025-01-01T12:00:00"
+
+
+def write_synthetic_odor_session(
+    preprocessed_data_directory: pathlib.Path, number_of_trials: int, number_of_probes: int = 2
+) -> None:
+    """
+    Write an experiment keys file and ON/OFF files whose trials are interleaved across all channels.
+
+    The subject is taken from the name of the directory (such as 'M000' for 'M000-2025-01-01').
+    """
+    preprocessed_data_directory.mkdir(parents=True, exist_ok=True)
+
+    probe_lines = []
+    for probe_index in range(number_of_probes):
+        probe_lines.append(f"ExpKeys.probe{probe_index + 1}_ID = 'imec{probe_index}';")
+        probe_lines.append(f"ExpKeys.probe{probe_index + 1}_hemisphere = '{('Left', 'Right')[probe_index % 2]}';")
+        probe_lines.append(f"ExpKeys.probe{probe_index + 1}_location = 'CA1';")
+    odor_lines = []
+    for odor_letter, channel_name in zip(_ODOR_LETTERS, _CHANNEL_NAMES):
+        odor_lines.append(f'ExpKeys.odor{odor_letter} = "1% Odorant{odor_letter}";')
+        odor_lines.append(f"ExpKeys.odor{odor_letter}_channel = '{channel_name}';")
+    session_id = preprocessed_data_directory.name
+    experiment_keys = "\n".join(
+        [
+            "ExpKeys.version = +1;",
+            f"ExpKeys.subject = '{session_id.split('-')[0]}';",
+            "ExpKeys.species = 'mouse';",
+            "ExpKeys.genetics = 'C57BL/6J';",
+            "ExpKeys.sex = 'Male';",
+            "ExpKeys.experimenter = 'Manish';",
+            "ExpKeys.sessiontype = {'OdorSequence', 'recording'};",
+            *probe_lines,
+            *odor_lines,
+            f"ExpKeys.neutral_odor_channel = '{_CHANNEL_NAMES[-1]}';",
+            "ExpKeys.block1_type = 'UE';",
+            "ExpKeys.block1start = +0;",
+            f"ExpKeys.block1end = {3 * number_of_trials};",
+            'ExpKeys.notes = "Block 1: A B C D";',
+        ]
+    )
+    experiment_keys_file_name = f"{session_id.replace('-', '_')}_keys.m"
+    (preprocessed_data_directory / experiment_keys_file_name).write_text(experiment_keys + "\n")
+
+    random_number_generator = numpy.random.default_rng(seed=0)
+    start_times = numpy.arange(number_of_trials) * 3.0 + random_number_generator.uniform(size=number_of_trials)
+    channel_indices = random_number_generator.integers(low=0, high=len(_CHANNEL_NAMES), size=number_of_trials)
+    for channel_index, channel_name in enumerate(_CHANNEL_NAMES):
+        channel_start_times = start_times[channel_indices == channel_index]
+        numpy.savetxt(fname=preprocessed_data_directory / f"{channel_name}_ON.txt", X=channel_start_times, fmt="%.6f")
+        numpy.savetxt(
+            fname=preprocessed_data_directory / f"{channel_name}_OFF.txt", X=channel_start_times + 2.0, fmt="%.6f"
+        )
+
+
+def write_synthetic_clean_units_files(
+    *,
+    preprocessed_data_directory: pathlib.Path,
+    number_of_units_per_probe: int,
+    number_of_spikes_per_unit: int,
+    number_of_probes: int = 2,
+    mat_version: typing.Literal["5", "7.3"] = "5",
+) -> None:
+    """
+    Write one `clean_units_imec<probe>.mat` file per probe.
+
+    Each unit has a sorted spike train over one hour and a mean waveform of 82 frames on 8 to 16 channels.
+    """
+    preprocessed_data_directory.mkdir(parents=True, exist_ok=True)
+
+    random_number_generator = numpy.random.default_rng(seed=0)
+    for probe_index in range(number_of_probes):
+        variables = {
+            "unit_ids": numpy.array(
+                [f"{probe_index}_{unit_index:05d}" for unit_index in range(number_of_units_per_probe)]
+            ),
+            "spike_train": [
+                numpy.sort(random_number_generator.uniform(low=0.0, high=3600.0, size=number_of_spikes_per_unit))
+                for _ in range(number_of_units_per_probe)
+            ],
+            "mean_waveforms": [
+                random_number_generator.normal(size=(int(random_number_generator.integers(low=8, high=17)), 82))
+                for _ in range(number_of_units_per_probe)
+            ],
+            "depths": random_number_generator.uniform(low=0.0, high=3000.0, size=number_of_units_per_probe),
+            "shank_ids": random_number_generator.integers(low=0, high=4, size=number_of_units_per_probe).astype(float),
+            "channel_ids": numpy.array(
+                [f"imec{probe_index}_ch{channel_index:04d}" for channel_index in range(number_of_units_per_probe)]
+            ),
+        }
+
+        file_path = preprocessed_data_directory / f"clean_units_imec{probe_index}.mat"
+        match mat_version:
+            case "5":
+                _write_mat_5_file(file_path=file_path, variables=variables)
+            case "7.3":
+                _write_mat_73_file(file_path=file_path, variables=variables)
+
+
+def write_synthetic_spikeglx_session(
+    raw_data_directory: pathlib.Path, duration_seconds: float = 0.5, number_of_probes: int = 2
+) -> None:
+    """
+    Write a short SpikeGLX recording of random samples: an AP band stream for each probe, and a NIDQ stream.
+
+    The directory is named as SpikeGLX would name it (such as 'M000-2025-01-01_g0'), and each probe is a
+    Neuropixels 2.0 probe of 384 channels (plus the sync channel) in a subdirectory of its own.
+    """
+    raw_data_directory.mkdir(parents=True, exist_ok=True)
+    run_name = raw_data_directory.name
+
+    random_number_generator = numpy.random.default_rng(seed=0)
+    number_of_channels = _NUMBER_OF_AP_CHANNELS + 1
+    for probe_index in range(number_of_probes):
+        probe_directory = raw_data_directory / f"{run_name}_imec{probe_index}"
+        probe_directory.mkdir(exist_ok=True)
+
+        file_stem = f"{run_name}_t0.imec{probe_index}.ap"
+        data = random_number_generator.integers(
+            low=-200, high=200, size=(int(_AP_SAMPLING_FREQUENCY * duration_seconds), number_of_channels), dtype="int16"
+        )
+        data.tofile(probe_directory / f"{file_stem}.bin")
+
+        channels = range(_NUMBER_OF_AP_CHANNELS)
+        _write_spikeglx_meta_file(
+            file_path=probe_directory / f"{file_stem}.meta",
+            fields={
+                "acqApLfSy": f"{_NUMBER_OF_AP_CHANNELS},0,1",
+                "appVersion": "20230815",
+                "fileCreateTime": _SPIKEGLX_FILE_CREATE_TIME,
+                "fileName": probe_directory / f"{file_stem}.bin",
+                "fileSizeBytes": data.nbytes,
+                "fileTimeSecs": duration_seconds,
+                "firstSample": 0,
+                "imAiRangeMax": 0.62,
+                "imAiRangeMin": -0.62,
+                "imDatApi": "3.62",
+                "imDatBsc_sn": 1,
+                "imDatHs_sn": 1,
+                "imDatPrb_dock": 1,
+                "imDatPrb_pn": "NP2000",
+                "imDatPrb_port": probe_index + 1,
+                "imDatPrb_slot": 2,
+                "imDatPrb_sn": f"1{probe_index}",
+                "imDatPrb_type": 21,
+                "imMaxInt": 8192,
+                "imSampRate": _AP_SAMPLING_FREQUENCY,
+                "nSavedChans": number_of_channels,
+                "snsApLfSy": f"{_NUMBER_OF_AP_CHANNELS},0,1",
+                "snsSaveChanSubset": f"0:{_NUMBER_OF_AP_CHANNELS}",
+                "typeThis": "imec",
+                "~imroTbl": f"(21,{_NUMBER_OF_AP_CHANNELS})"
+                + "".join(f"({channel} 1 0 {channel})" for channel in channels),
+                "~snsChanMap": f"({_NUMBER_OF_AP_CHANNELS},{_NUMBER_OF_AP_CHANNELS},1)"
+                + "".join(f"(AP{channel};{channel}:{channel})" for channel in channels)
+                + f"(SY0;{_NUMBER_OF_AP_CHANNELS}:{_NUMBER_OF_AP_CHANNELS})",
+                "~snsGeomMap": "(NP2000,1,0,32)"
+                + "".join(f"(0:{(channel % 2) * 32}:{(channel // 2) * 15}:1)" for channel in channels),
+            },
+        )
+
+    # Eight analog channels (such as the odor port signals) and a word of digital lines
+    file_stem = f"{run_name}_t0.nidq"
+    data = random_number_generator.integers(
+        low=0, high=100, size=(int(_NIDQ_SAMPLING_FREQUENCY * duration_seconds), 9), dtype="int16"
+    )
+    data.tofile(raw_data_directory / f"{file_stem}.bin")
+    _write_spikeglx_meta_file(
+        file_path=raw_data_directory / f"{file_stem}.meta",
+        fields={
+            "appVersion": "20230815",
+            "fileCreateTime": _SPIKEGLX_FILE_CREATE_TIME,
+            "fileName": raw_data_directory / f"{file_stem}.bin",
+            "fileSizeBytes": data.nbytes,
+            "fileTimeSecs": duration_seconds,
+            "firstSample": 0,
+            "nSavedChans": 9,
+            "niAiRangeMax": 5,
+            "niAiRangeMin": -5,
+            "niMAGain": 1,
+            "niMNGain": 200,
+            "niSampRate": _NIDQ_SAMPLING_FREQUENCY,
+            "niXAChans1": "0:7",
+            "niXDBytes1": 1,
+            "niXDChans1": "0:7",
+            "snsMnMaXaDw": "0,0,8,1",
+            "snsSaveChanSubset": "all",
+            "typeThis": "nidq",
+            "~snsChanMap": "(0,0,8,1,1)"
+            + "".join(f"(XA{channel};{channel}:{channel})" for channel in range(8))
+            + "(XD0;8:8)",
+        },
+    )
+
+
+def write_synthetic_session(
+    *,
+    data_directory: pathlib.Path,
+    number_of_trials: int,
+    number_of_units_per_probe: int,
+    number_of_spikes_per_unit: int,
+    number_of_probes: int = 2,
+    mat_version: typing.Literal["5", "7.3"] = "5",
+    raw_duration_seconds: float | None = 0.5,
+) -> tuple[str, str]:
+    """
+    Write every source file of a synthetic session, laid out as in the source data of the lab.
+
+    The preprocessed files are written to `<subject>/preprocessed/<subject>-<session>` and, unless
+    `raw_duration_seconds` is None, the SpikeGLX recording to `<subject>/rawdata/<subject>-<session>_g0`.
+
+    Returns
+    -------
+    tuple of str
+        The subject ID and session ID of the synthetic session, as taken by `get_session_paths`.
+    """
+    subject_id, session_id = SYNTHETIC_SESSION_ID.split("-", maxsplit=1)
+
+    preprocessed_data_directory = data_directory / subject_id / "preprocessed" / SYNTHETIC_SESSION_ID
+    write_synthetic_odor_session(
+        preprocessed_data_directory=preprocessed_data_directory,
+        number_of_trials=number_of_trials,
+        number_of_probes=number_of_probes,
+    )
+    write_synthetic_clean_units_files(
+        preprocessed_data_directory=preprocessed_data_directory,
+        number_of_units_per_probe=number_of_units_per_probe,
+        number_of_spikes_per_unit=number_of_spikes_per_unit,
+        number_of_probes=number_of_probes,
+        mat_version=mat_version,
+    )
+    if raw_duration_seconds is not None:
+        write_synthetic_spikeglx_session(
+            raw_data_directory=data_directory / subject_id / "rawdata" / f"{SYNTHETIC_SESSION_ID}_g0",
+            duration_seconds=raw_duration_seconds,
+            number_of_probes=number_of_probes,
+        )
+
+    return subject_id, session_id
+
+
+def _write_spikeglx_meta_file(file_path: pathlib.Path, fields: dict[str, typing.Any]) -> None:
+    file_path.write_text("".join(f"{key}={value}\n" for key, value in fields.items()))
+
+
+def _write_mat_5_file(file_path: pathlib.Path, variables: dict[str, typing.Any]) -> None:
+    cell_arrays = dict()
+    for name, value in variables.items():
+        if isinstance(value, list):
+            cell_array = numpy.empty(shape=len(value), dtype=object)
+            cell_array[:] = value
+            value = cell_array
+        cell_arrays[name] = value
+
+    scipy.io.savemat(file_name=file_path, mdict=cell_arrays)
+
+
+def _write_mat_73_file(file_path: pathlib.Path, variables: dict[str, typing.Any]) -> None:
+    """MATLAB stores arrays in column-major order, so every array is written transposed, as MATLAB itself would."""
+    with h5py.File(name=file_path, mode="w", userblock_size=_MATLAB_73_USERBLOCK_SIZE) as file:
+        references_group = file.create_group(name="#refs#")
+        for name, value in variables.items():
+            if isinstance(value, list):
+                references = numpy.empty(shape=(1, len(value)), dtype=h5py.ref_dtype)
+                for index, element in enumerate(value):
+                    dataset = references_group.create_dataset(name=f"{name}_{index}", data=numpy.atleast_2d(element).T)
+                    dataset.attrs["MATLAB_class"] = numpy.bytes_("double")
+                    references[0, index] = dataset.ref
+                dataset = file.create_dataset(name=name, data=references)
+                dataset.attrs["MATLAB_class"] = numpy.bytes_("cell")
+            elif value.dtype.kind == "U":
+                characters = numpy.array([[ord(character) for character in string] for string in value], dtype="uint16")
+                dataset = file.create_dataset(name=name, data=characters.T)
+                dataset.attrs["MATLAB_class"] = numpy.bytes_("char")
+            else:
+                dataset = file.create_dataset(name=name, data=numpy.atleast_2d(value))
+                dataset.attrs["MATLAB_class"] = numpy.bytes_("double")
+
+    header = _MATLAB_73_HEADER.ljust(116, b" ") + b"\x00" * 8 + b"\x00\x02IM"
+    with file_path.open(mode="r+b") as file_stream:
+        file_stream.write(header)
@@ -0,0 +1,128 @@
+"""Benchmark of the write profiles, which trade the speed of writing an NWB file against its size."""
+
+import math
+import pathlib
+import tempfile
+import time
+import typing
+import warnings
+
+import hdmf.build.warnings
+import neuroconv.tools.nwb_helpers
+import numpy
+import pydantic
+
+from ..manish_2025._conversion_plan import get_session_paths
+from ..manish_2025._odor_sequence_to_nwb import _create_session_nwbfile, _remove_nwbfile, _write_nwbfile
+from ..utils import WRITE_PROFILES, Backend, apply_write_profiles
+
+
+@pydantic.validate_call
+def benchmark_write_profiles(
+    *,
+    data_directory: pydantic.DirectoryPath,
+    subject_id: str,
+    session_id: str,
+    raw_or_processed: typing.Literal["raw", "processed"],
+    testing: bool = True,
+    write_profiles: tuple[typing.Literal["fast", "balanced", "archive"], ...] = ("fast", "balanced", "archive"),
+) -> dict[str, typing.Any]:
+    """
+    Compare the time taken to write a session, and the size of the file written, with each write profile.
+
+    The NWB file is created anew for each profile, since the raw streams are only read as they are written.
+    With `testing`, only a stub of each raw stream is written, as in a test conversion.
+
+    Returns
+    -------
+    dict
+        For each profile, the time in seconds to write the file, its size in bytes, the size of the data before
+        compression, and the throughput (in megabytes of data before compression per second).
+    """
+    results: dict[str, typing.Any] = {
+        "subject_id": subject_id,
+        "session_id": session_id,
+        "raw_or_processed": raw_or_processed,
+        "testing": testing,
+    }
+
+    warnings.filterwarnings(
+        action="ignore",
+        message=r".*TimeIntervals/.*_time.*",
+        category=hdmf.build.warnings.DtypeConversionWarning,
+    )
+    with tempfile.TemporaryDirectory(prefix="vandermeerlab_to_bids_benchmark_") as temporary_directory:
+        session_paths = get_session_paths(
+            data_directory=data_directory,
+            subject_id=subject_id,
+            session_id=session_id,
+            nwb_directory=pathlib.Path(temporary_directory),
+            raw_or_processed=raw_or_processed,
+        )
+
+        for write_profile in write_profiles:
+            results[write_profile] = _measure_session_write(
+                session_paths=session_paths,
+                raw_or_processed=raw_or_processed,
+                testing=testing,
+                write_profile=write_profile,
+                nwbfile_path=pathlib.Path(temporary_directory) / f"{write_profile}.nwb",
+            )
+
+    return results
+
+
+def _measure_session_write(
+    *,
+    session_paths: dict[str, typing.Any],
+    raw_or_processed: typing.Literal["raw", "processed"],
+    testing: bool,
+    write_profile: str,
+    nwbfile_path: pathlib.Path,
+    backend: Backend = "hdf5",
+    number_of_compression_workers: int = 1,
+) -> dict[str, typing.Any]:
+    """Create the NWB file of a session anew, then time writing it; the file is removed once measured."""
+    nwbfile = _create_session_nwbfile(
+        raw_data_directory=session_paths["raw_data_directory"],
+        preprocessed_data_directory=session_paths["preprocessed_data_directory"],
+        raw_or_processed=raw_or_processed,
+        testing=testing,
+        write_profile=write_profile,
+        backend=backend,
+    )
+    backend_configuration = neuroconv.tools.nwb_helpers.get_default_backend_configuration(
+        nwbfile=nwbfile, backend=backend
+    )
+    apply_write_profiles(backend_configuration=backend_configuration, write_profile=write_profile)
+    data_bytes = sum(
+        math.prod(dataset_configuration.full_shape) * numpy.dtype(dataset_configuration.dtype).itemsize
+        for dataset_configuration in backend_configuration.dataset_configurations.values()
+        if numpy.dtype(dataset_configuration.dtype).kind != "O"
+    )
+
+    start_time = time.perf_counter()
+    _write_nwbfile(
+        nwbfile=nwbfile,
+        nwbfile_path=nwbfile_path,
+        backend_configuration=backend_configuration,
+        number_of_compression_workers=number_of_compression_workers,
+    )
+    seconds = time.perf_counter() - start_time
+
+    if nwbfile_path.is_dir():
+        file_bytes = sum(
+            file_path.stat().st_size for file_path in nwbfile_path.rglob(pattern="*") if file_path.is_file()
+        )
+    else:
+        file_bytes = nwbfile_path.stat().st_size
+    _remove_nwbfile(nwbfile_path=nwbfile_path)
+
+    result = {
+        "profile": WRITE_PROFILES[backend][write_profile].model_dump(),
+        "seconds": seconds,
+        "file_bytes": file_bytes,
+        "data_bytes": data_bytes,
+        "throughput_mb_per_second": data_bytes / 1e6 / seconds,
+    }
+    return result
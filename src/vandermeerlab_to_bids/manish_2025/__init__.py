@@ -1,9 +1,49 @@
 """Exposed outer imports of the data conversion."""
 
-from .interfaces import OdorIntervalsInterface
-from ._odor_sequence_to_nwb import odor_sequence_to_nwb
+import importlib
+import typing
+
+from ._conversion_plan import (
+    ConversionManifest,
+    SessionConversionPlan,
+    plan_odor_sequence_to_nwb,
+    shard_session_plans,
+)
+
+if typing.TYPE_CHECKING:
+    from ._odor_sequence_to_nwb import odor_sequence_to_nwb
+    from ._update_nwb import SessionUpdate, update_odor_sequence_nwb
+    from .interfaces import OdorIntervalsInterface
+
+# These import NeuroConv, PyNWB, and HDMF (which take seconds to import), so are only imported once first used
+_LAZY_IMPORTS = {
+    "OdorIntervalsInterface": ".interfaces",
+    "SessionUpdate": "._update_nwb",
+    "odor_sequence_to_nwb": "._odor_sequence_to_nwb",
+    "update_odor_sequence_nwb": "._update_nwb",
+}
 
 __all__ = [
+    "ConversionManifest",
     "OdorIntervalsInterface",
+    "SessionConversionPlan",
+    "SessionUpdate",
     "odor_sequence_to_nwb",
+    "plan_odor_sequence_to_nwb",
+    "shard_session_plans",
+    "update_odor_sequence_nwb",
 ]
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _LAZY_IMPORTS:
+        message = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(message)
+
+    value = getattr(importlib.import_module(name=_LAZY_IMPORTS[name], package=__name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,249 @@
+"""Planning of batch conversions: which sessions will be converted or skipped, and how much data they involve."""
+
+import datetime
+import pathlib
+import typing
+
+import pydantic
+
+from ..utils import Backend, ConversionLedger, SourceIndex, read_mat_variable_headers
+
+
+class SessionConversionPlan(pydantic.BaseModel):
+    """The planned action for a single session of a batch conversion."""
+
+    subject_id: str
+    session_id: str
+    nwbfile_path: pathlib.Path
+    action: typing.Literal["convert", "skip"]
+    reason: str
+    input_bytes: int = pydantic.Field(description="The total size of the source files read by the conversion.")
+    number_of_units: int | None = pydantic.Field(
+        default=None, description="The number of spike sorted units of a processed session, from the file headers."
+    )
+
+
+class ConversionManifest(pydantic.BaseModel):
+    """
+    The sessions planned for a batch conversion, saved so that the tasks of an array job can share them out.
+
+    Every task reads the same manifest, so all of them agree on which sessions each converts, however many sessions
+    the other tasks have already converted by the time it starts.
+    """
+
+    data_directory: pathlib.Path
+    nwb_directory: pathlib.Path
+    raw_or_processed: typing.Literal["raw", "processed"]
+    backend: Backend = "hdf5"
+    layout: typing.Literal["single", "per-stream"] = "single"
+    created: datetime.datetime = pydantic.Field(default_factory=datetime.datetime.now)
+    session_plans: list[SessionConversionPlan]
+
+
+@pydantic.validate_call
+def plan_odor_sequence_to_nwb(
+    *,
+    data_directory: pathlib.Path,
+    subject_id: str | None = None,
+    session_id: str | None = None,
+    nwb_directory: pathlib.Path,
+    raw_or_processed: typing.Literal["raw", "processed"],
+    skip_if_exists: bool = True,
+    backend: Backend = "hdf5",
+    layout: typing.Literal["single", "per-stream"] = "single",
+) -> list[SessionConversionPlan]:
+    """
+    Plan which sessions of raw or processed OdorSequence data a call to `odor_sequence_to_nwb` would convert.
+
+    Only the file system and the conversion ledger are inspected; no source data is converted and nothing is written.
+    With the "per-stream" `layout`, a session is also converted if any of its stream files has changed or is missing.
+    """
+    source_index = SourceIndex(data_directory=data_directory)
+    if subject_id is not None and session_id is not None:
+        subject_and_session_ids = [(subject_id, session_id)]
+    else:
+        subject_and_session_ids = get_subject_and_session_ids(data_directory=data_directory, source_index=source_index)
+
+    conversion_ledger = ConversionLedger()
+    session_plans = []
+    for subject_id, session_id in subject_and_session_ids:
+        session_paths = get_session_paths(
+            data_directory=data_directory,
+            subject_id=subject_id,
+            session_id=session_id,
+            nwb_directory=nwb_directory,
+            raw_or_processed=raw_or_processed,
+            backend=backend,
+            source_index=source_index,
+        )
+        nwbfile_path = session_paths["nwbfile_path"]
+        input_file_paths = session_paths["input_file_paths"]
+
+        # The top-level file of a session split per stream is recorded as written from the stream files it links to
+        linked_file_paths = []
+        if layout == "per-stream":
+            linked_file_paths = [
+                file_path
+                for file_path in conversion_ledger.get_input_file_paths(nwbfile_path=nwbfile_path)
+                if file_path.suffix == ".nwb"
+            ]
+
+        if not nwbfile_path.exists():
+            action, reason = "convert", "not yet converted"
+        elif not skip_if_exists:
+            action, reason = "convert", "overwriting existing file"
+        elif conversion_ledger.is_complete(
+            nwbfile_path=nwbfile_path, input_file_paths=input_file_paths + linked_file_paths
+        ):
+            action, reason = "skip", "already converted from unchanged inputs"
+        else:
+            action, reason = "convert", "inputs changed or previous write incomplete"
+
+        session_plan = SessionConversionPlan(
+            subject_id=subject_id,
+            session_id=session_id,
+            nwbfile_path=nwbfile_path,
+            action=action,
+            reason=reason,
+            input_bytes=sum(file_path.stat().st_size for file_path in input_file_paths if file_path.exists()),
+            number_of_units=(
+                _count_units(input_file_paths=input_file_paths) if raw_or_processed == "processed" else None
+            ),
+        )
+        session_plans.append(session_plan)
+
+    return session_plans
+
+
+def _count_units(input_file_paths: list[pathlib.Path]) -> int | None:
+    """
+    Count the spike sorted units of a session from the headers of its `clean_units_imec*.mat` files alone.
+
+    Unreadable files leave the count unknown; the `SpikeSortingValidator` reports why.
+    """
+    try:
+        return sum(
+            read_mat_variable_headers(file_path=file_path)["unit_ids"].length
+            for file_path in input_file_paths
+            if file_path.name.startswith("clean_units_imec") and file_path.suffix == ".mat"
+        )
+    except (ValueError, KeyError, OSError):
+        return None
+
+
+def shard_session_plans(
+    *, session_plans: list[SessionConversionPlan], task_count: int
+) -> list[list[SessionConversionPlan]]:
+    """
+    Split the sessions into `task_count` disjoint slices, balanced by the size of their source data.
+
+    Sessions are assigned largest first to the slice with the fewest bytes so far, breaking ties by the order of the
+    sessions and slices, so that the same plans are always split the same way. Each slice keeps the sessions in order.
+    """
+    input_bytes_by_task = [0] * task_count
+    session_plans_by_task: list[list[SessionConversionPlan]] = [[] for _ in range(task_count)]
+    for session_plan in sorted(
+        session_plans,
+        key=lambda session_plan: (-session_plan.input_bytes, session_plan.subject_id, session_plan.session_id),
+    ):
+        task_index = min(range(task_count), key=lambda index: (input_bytes_by_task[index], index))
+        input_bytes_by_task[task_index] += session_plan.input_bytes
+        session_plans_by_task[task_index].append(session_plan)
+
+    return [
+        sorted(task_session_plans, key=lambda session_plan: (session_plan.subject_id, session_plan.session_id))
+        for task_session_plans in session_plans_by_task
+    ]
+
+
+def get_subject_and_session_ids(
+    data_directory: pathlib.Path, source_index: SourceIndex | None = None
+) -> list[tuple[str, str]]:
+    """Find all (subject, session) pairs with a 'preprocessed' directory under the source data directory."""
+    source_index = source_index or SourceIndex(data_directory=data_directory)
+    return source_index.get_subject_and_session_ids()
+
+
+def get_session_paths(
+    *,
+    data_directory: pathlib.Path,
+    subject_id: str,
+    session_id: str,
+    nwb_directory: pathlib.Path,
+    raw_or_processed: typing.Literal["raw", "processed"],
+    backend: Backend = "hdf5",
+    source_index: SourceIndex | None = None,
+) -> dict[str, typing.Any]:
+    """
+    Locate the source directories, source files, and output NWB file of a single session.
+
+    NWB files written with the Zarr backend are directories, named with the `.nwb.zarr` extension.
+    The source files are looked up in the `source_index` of the `data_directory`, which is loaded if not given.
+    """
+    source_index = source_index or SourceIndex(data_directory=data_directory)
+    raw_data_directory = data_directory / subject_id / "rawdata" / f"{subject_id}-{session_id}_g0"
+    preprocessed_data_directory = data_directory / subject_id / "preprocessed" / f"{subject_id}-{session_id}"
+    filename = f"sub-{subject_id}_ses-{session_id}_ecephys.nwb"
+    if backend == "zarr":
+        filename += ".zarr"
+
+    nwbfile_path = (
+        get_bids_data_type_directory(nwb_directory=nwb_directory, raw_or_processed=raw_or_processed)
+        / f"sub-{subject_id}"
+        / f"ses-{session_id.replace("-", "+")}"
+        / filename
+    )
+
+    experiment_keys_file_path = (
+        preprocessed_data_directory / f"{preprocessed_data_directory.name.replace("-", "_")}_keys.m"
+    )
+    input_file_paths = [experiment_keys_file_path]
+    match raw_or_processed:
+        case "raw":
+            input_file_paths += source_index.glob(directory=raw_data_directory, pattern="*.meta", recursive=True)
+            input_file_paths += source_index.glob(directory=raw_data_directory, pattern="*.bin", recursive=True)
+        case "processed":
+            input_file_paths += source_index.glob(directory=preprocessed_data_directory, pattern="*_ON.txt")
+            input_file_paths += source_index.glob(directory=preprocessed_data_directory, pattern="*_OFF.txt")
+            input_file_paths += source_index.glob(
+                directory=preprocessed_data_directory, pattern="clean_units_imec*.mat"
+            )
+
+    session_paths = {
+        "raw_data_directory": raw_data_directory,
+        "preprocessed_data_directory": preprocessed_data_directory,
+        "nwbfile_path": nwbfile_path,
+        "input_file_paths": input_file_paths,
+    }
+    return session_paths
+
+
+def get_bids_data_type_directory(
+    *, nwb_directory: pathlib.Path, raw_or_processed: typing.Literal["raw", "processed"]
+) -> pathlib.Path:
+    """Get the directory under which the NWB files of raw ('sourcedata') or processed ('derivatives') data go."""
+    return nwb_directory / ("sourcedata" if raw_or_processed == "raw" else "derivatives")
+
+
+def get_stream_paths(*, session_paths: dict[str, typing.Any], stream_name: str) -> dict[str, typing.Any]:
+    """
+    Locate the source files and output NWB file of a single SpikeGLX stream of a raw session.
+
+    Each stream file sits beside the top-level file of the session, with the stream as its BIDS 'acq' entity
+    (such as `sub-M540_ses-2024-08-19_acq-imec0ap_ecephys.nwb` for 'imec0.ap'). Its inputs are the experiment keys
+    file and the files of the stream; a SYNC stream (such as 'imec0.ap-SYNC') is read from those of its probe stream.
+    """
+    nwbfile_path = session_paths["nwbfile_path"]
+    acquisition_label = "".join(character for character in stream_name if character.isalnum())
+    stream_nwbfile_path = nwbfile_path.with_name(
+        nwbfile_path.name.replace("_ecephys.nwb", f"_acq-{acquisition_label}_ecephys.nwb")
+    )
+
+    experiment_keys_file_path, *raw_file_paths = session_paths["input_file_paths"]
+    source_stream_name = stream_name.removesuffix("-SYNC")
+    input_file_paths = [experiment_keys_file_path] + [
+        file_path for file_path in raw_file_paths if f".{source_stream_name}." in file_path.name
+    ]
+
+    stream_paths = {"nwbfile_path": stream_nwbfile_path, "input_file_paths": input_file_paths}
+    return stream_paths
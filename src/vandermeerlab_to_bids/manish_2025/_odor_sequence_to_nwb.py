@@ -1,6 +1,14 @@
 """Main code definition for the conversion of a particular session type (raw or processed) to NWB."""
 
+import concurrent.futures
+import contextlib
+import datetime
+import functools
+import multiprocessing
 import pathlib
+import re
+import shutil
+import time
 import typing
 
 import pydantic
@@ -9,9 +17,53 @@ import warnings
 import tqdm
 import hdmf.build.warnings
 import neuroconv.converters
+import pynwb
 
+from ._conversion_plan import (
+    ConversionManifest,
+    SessionConversionPlan,
+    get_bids_data_type_directory,
+    get_session_paths,
+    get_stream_paths,
+    plan_odor_sequence_to_nwb,
+    shard_session_plans,
+)
 from .interfaces import OdorIntervalsInterface, SpikeSortedInterface
-from ..utils import enhance_metadata
+from ..utils import (
+    Backend,
+    ConcurrentNWBHDF5IO,
+    DEFAULT_OUTPUT_CACHE_SIZE_GB,
+    ConversionLedger,
+    DatasetCategory,
+    OutputCache,
+    ProfileMode,
+    SessionInstrumentation,
+    SourceIndex,
+    StageMeasurement,
+    WriteProfile,
+    apply_write_profiles,
+    enhance_metadata,
+    get_automatic_memory_limit_gb,
+    get_buffer_gb_limit,
+    get_home_directory,
+    get_iterator_options,
+    get_output_cache_key,
+    get_partial_nwbfile_path,
+    get_records_directory,
+    summarize_stage_measurements,
+)
+
+IteratorOptions = dict[typing.Literal["buffer_gb", "chunk_mb"], pydantic.PositiveFloat]
+Layout = typing.Literal["single", "per-stream"]
+
+# The sizes used by the data chunk iterators of HDMF when none are given
+_DEFAULT_ITERATOR_OPTIONS = {"buffer_gb": 1.0, "chunk_mb": 10.0}
+
+# Set within each worker process of a parallel batch so that its progress bars do not overwrite those of the others
+_progress_bar_position = 1
+
+# Set within each worker process of a parallel batch so that the source index is only loaded once per worker
+_worker_source_index: SourceIndex | None = None
 
 
 @pydantic.validate_call
@@ -24,49 +76,742 @@ def odor_sequence_to_nwb(
     raw_or_processed: typing.Literal["raw", "processed"],
     testing: bool = False,
     skip_if_exists: bool = True,
+    number_of_jobs: pydantic.PositiveInt = 1,
+    write_profile: typing.Literal["fast", "balanced", "archive"] | WriteProfile = "balanced",
+    dataset_write_profiles: (
+        dict[DatasetCategory, typing.Literal["fast", "balanced", "archive"] | WriteProfile] | None
+    ) = None,
+    backend: Backend = "hdf5",
+    number_of_compression_workers: pydantic.PositiveInt = 1,
+    iterator_options: IteratorOptions | None = None,
+    stream_iterator_options: dict[str, IteratorOptions] | None = None,
+    memory_limit_gb: pydantic.PositiveFloat | typing.Literal["auto"] | None = None,
+    layout: Layout = "single",
+    manifest_file_path: pydantic.FilePath | None = None,
+    task_index: pydantic.NonNegativeInt = 0,
+    task_count: pydantic.PositiveInt = 1,
+    cache_units: bool = True,
+    profile: ProfileMode | None = None,
+    output_cache_directory: pathlib.Path | None = None,
+    output_cache_size_gb: pydantic.PositiveFloat = DEFAULT_OUTPUT_CACHE_SIZE_GB,
+) -> list[StageMeasurement]:
+    """
+    Convert sessions of raw or processed OdorSequence data to NWB.
+
+    If both `subject_id` and `session_id` are specified, only that single session is converted.
+    Otherwise, all sessions found under the `data_directory` are converted.
+
+    With `skip_if_exists`, sessions are skipped only if the conversion ledger confirms they were fully written from
+    inputs that have not changed since; files without a ledger entry (such as those left by an interrupted run) are
+    rewritten. Use `plan_odor_sequence_to_nwb` to list which sessions will be converted without converting them.
+
+    When `number_of_jobs` is greater than one, each session is converted in its own worker process.
+    A failure in one session does not stop the others; all failures are reported once the batch has finished.
+    Sessions are converted from the largest source data to the smallest, so that no large session is left running
+    on its own at the end of a batch, and the time left is estimated from the throughput of earlier conversions.
+
+    The `write_profile` trades the speed of writing against the size of the files: "fast" compresses with LZF in
+    larger chunks, "balanced" keeps the defaults of NeuroConv, and "archive" compresses as much as gzip allows.
+    The `dataset_write_profiles` override it for the SpikeGLX AP ("ap") or NIDQ ("nidq") streams, the units table
+    ("units"), or the trials and epochs tables ("intervals").
+
+    With the "zarr" `backend`, each file is written as an NWB-Zarr directory, and the chunks of the raw streams are
+    compressed and written by `number_of_compression_workers` processes in parallel. With the "hdf5" `backend` and
+    more than one worker, the raw streams are instead read concurrently and their chunks compressed by
+    `number_of_compression_workers` threads, while a single thread writes the file.
+
+    The raw streams are read and written one buffer at a time. The size of those buffers (`buffer_gb`), and of the
+    chunks written (`chunk_mb`), may be set for all streams through `iterator_options`, or for a single stream (such
+    as "imec0.ap" or "nidq") through `stream_iterator_options`; either takes precedence over the `write_profile`.
+    With a `memory_limit_gb`, the buffers of each session are shrunk as needed for its conversion to stay within that
+    limit; "auto" shares 80% of the memory available at the start of the batch between the `number_of_jobs` sessions
+    converted at once.
+
+    With the "per-stream" `layout`, each SpikeGLX stream of a raw session is written to its own NWB file, by its own
+    process, and a small top-level file links to the data of all of them; the files must be kept together. Sessions
+    are then converted one at a time, with up to `number_of_jobs` of their streams written at once. A stream
+    whose file was already written from unchanged inputs is not written again, so a single stream can be redone by
+    removing its file (or re-converting once its inputs change). Only HDF5 files of raw sessions can be split this way.
+
+    To convert a batch across the tasks of an array job (such as on a SLURM cluster), each task is given its
+    `task_index` among the `task_count` tasks, and converts only its slice of the sessions; the slices are balanced by
+    the size of their source data. The sessions are shared out from those to convert in the manifest at
+    `manifest_file_path` (as written by `vandermeerlab2bids plan`), or else from all sessions found.
+
+    With `cache_units`, the spike sorted units of each processed session are kept (in the home directory of these
+    tools) as flat arrays once first read from the `clean_units_imec*.mat` files, and memory-mapped by any later
+    conversion of the same, unchanged, files; so rebuilding processed files (such as after a change of metadata) does
+    not parse the MATLAB files again.
+
+    The wall time, peak memory, and bytes read and written by each stage of each session (such as building the
+    metadata, the trials and units tables, configuring the backend, and writing the file) are appended as lines of
+    JSON to a log under `~/.vandermeerlab_to_bids/records/instrumentation`, and summarized in a table once the batch
+    has finished. With a `profile` ("cprofile" or "tracemalloc"), each session is also profiled, and its cProfile
+    statistics or tracemalloc snapshot dumped under `~/.vandermeerlab_to_bids/records/profiles`.
+
+    With an `output_cache_directory`, each file converted (except those of the "per-stream" `layout`) is also kept in
+    that cache, keyed by the content of its inputs (see `get_output_cache_key`), the versions of these tools and of
+    NeuroConv, PyNWB, and HDMF, and the options which change the file written (including the chunk sizes of raw streams,
+    which a `memory_limit_gb` can shrink). A session whose key is found there is not converted again, but linked
+    (or copied) into place from the cache, so reconverting an unchanged archive (such as into the output tree of a new
+    release) costs only the time to hash its inputs. A cache on the same file system as the output holds hard links to
+    the files converted; the least recently used are evicted once the cache holds more than `output_cache_size_gb`.
+
+    Returns
+    -------
+    list of StageMeasurement
+        The measurements of each stage of each session converted, followed by that of the whole session.
+    """
+    if task_index >= task_count:
+        message = f"The task index ({task_index}) must be less than the number of tasks ({task_count})."
+        raise ValueError(message)
+    if layout == "per-stream" and (raw_or_processed != "raw" or backend != "hdf5"):
+        message = "The 'per-stream' layout only applies to raw sessions written with the 'hdf5' backend."
+        raise ValueError(message)
+
+    if memory_limit_gb == "auto":
+        memory_limit_gb = get_automatic_memory_limit_gb(number_of_processes=number_of_jobs)
+
+    # Each session of the per-stream layout already writes its streams in processes of their own, which the jobs bound
+    number_of_stream_jobs = 1
+    if layout == "per-stream":
+        number_of_stream_jobs, number_of_jobs = number_of_jobs, 1
+
+    session_plans = plan_odor_sequence_to_nwb(
+        data_directory=data_directory,
+        subject_id=subject_id,
+        session_id=session_id,
+        nwb_directory=nwb_directory,
+        raw_or_processed=raw_or_processed,
+        skip_if_exists=skip_if_exists,
+        backend=backend,
+        layout=layout,
+    )
+
+    # Sessions are shared out whether or not they were already converted, so that the slices of the tasks of an array
+    # job do not shift as each of them completes its own
+    sharded_session_plans = session_plans
+    if manifest_file_path is not None:
+        manifest = ConversionManifest.model_validate_json(manifest_file_path.read_text())
+        _check_manifest(
+            manifest=manifest,
+            data_directory=data_directory,
+            nwb_directory=nwb_directory,
+            raw_or_processed=raw_or_processed,
+            backend=backend,
+            layout=layout,
+        )
+        sharded_session_plans = [
+            session_plan for session_plan in manifest.session_plans if session_plan.action == "convert"
+        ]
+    task_subject_and_session_ids = {
+        (session_plan.subject_id, session_plan.session_id)
+        for session_plan in shard_session_plans(session_plans=sharded_session_plans, task_count=task_count)[task_index]
+    }
+
+    # The largest sessions are started first, leaving the smallest to fill in around them at the end of the batch
+    session_plans_to_convert = sorted(
+        [
+            session_plan
+            for session_plan in session_plans
+            if session_plan.action == "convert"
+            and (session_plan.subject_id, session_plan.session_id) in task_subject_and_session_ids
+        ],
+        key=lambda session_plan: session_plan.input_bytes,
+        reverse=True,
+    )
+    number_of_jobs = min(number_of_jobs, max(len(session_plans_to_convert), 1))
+
+    throughput = ConversionLedger().get_throughput(
+        nwb_directory=get_bids_data_type_directory(nwb_directory=nwb_directory, raw_or_processed=raw_or_processed)
+    )
+    if throughput is not None and any(session_plans_to_convert):
+        estimated_seconds = _estimate_batch_seconds(
+            session_plans=session_plans_to_convert, throughput=throughput, number_of_jobs=number_of_jobs
+        )
+        tqdm.tqdm.write(
+            f"Estimated time to convert {len(session_plans_to_convert)} session(s): "
+            f"{datetime.timedelta(seconds=round(estimated_seconds))}, "
+            f"at the {throughput / 1e6:.1f} MB/s per job measured from earlier conversions."
+        )
+
+    session_conversion_kwargs = {
+        "data_directory": data_directory,
+        "nwb_directory": nwb_directory,
+        "raw_or_processed": raw_or_processed,
+        "testing": testing,
+        "write_profile": write_profile,
+        "dataset_write_profiles": dataset_write_profiles,
+        "backend": backend,
+        "number_of_compression_workers": number_of_compression_workers,
+        "iterator_options": iterator_options,
+        "stream_iterator_options": stream_iterator_options,
+        "memory_limit_gb": memory_limit_gb,
+        "layout": layout,
+        "number_of_stream_jobs": number_of_stream_jobs,
+        "skip_if_exists": skip_if_exists,
+        "cache_units": cache_units,
+        "output_cache_directory": output_cache_directory,
+        "output_cache_size_gb": output_cache_size_gb,
+    }
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    instrumentation_directory = get_records_directory() / "instrumentation"
+    instrumentation_directory.mkdir(exist_ok=True)
+    instrumentation_file_path = instrumentation_directory / f"{raw_or_processed}_{timestamp}_task{task_index}.jsonl"
+    profile_directory = get_records_directory() / "profiles" / f"{raw_or_processed}_{timestamp}_task{task_index}"
+    session_conversion_kwargs.update(
+        instrumentation_file_path=instrumentation_file_path, profile=profile, profile_directory=profile_directory
+    )
+
+    # The sessions converted are summarized even if the batch fails part way through
+    measurements: list[StageMeasurement] = []
+    try:
+        if number_of_jobs == 1:
+            source_index = SourceIndex(data_directory=data_directory)
+            with _get_batch_progress_bar(session_plans=session_plans_to_convert) as progress_bar:
+                for session_plan in session_plans_to_convert:
+                    measurements += _convert_session(
+                        subject_id=session_plan.subject_id,
+                        session_id=session_plan.session_id,
+                        source_index=source_index,
+                        **session_conversion_kwargs,
+                    )
+                    progress_bar.update(session_plan.input_bytes)
+        else:
+            _convert_sessions_in_parallel(
+                session_plans=session_plans_to_convert,
+                number_of_jobs=number_of_jobs,
+                session_conversion_kwargs=session_conversion_kwargs,
+                measurements=measurements,
+            )
+    finally:
+        if any(measurements):
+            tqdm.tqdm.write(
+                f"\n{summarize_stage_measurements(measurements=measurements)}\n"
+                f"Measurements of each stage written to {instrumentation_file_path}"
+                + (f"\nProfiles written to {profile_directory}" if profile is not None else "")
+            )
+
+    return measurements
+
+
+def _estimate_batch_seconds(
+    *, session_plans: list[SessionConversionPlan], throughput: float, number_of_jobs: int
+) -> float:
+    """Estimate the time to convert the sessions in order, each on the first of `number_of_jobs` jobs to be free."""
+    seconds_by_job = [0.0] * number_of_jobs
+    for session_plan in session_plans:
+        job_index = seconds_by_job.index(min(seconds_by_job))
+        seconds_by_job[job_index] += session_plan.input_bytes / throughput
+    return max(seconds_by_job)
+
+
+def _get_batch_progress_bar(session_plans: list[SessionConversionPlan]) -> tqdm.tqdm:
+    """Get a progress bar over the source data of the sessions, whose estimate of the time left follows its rate."""
+    return tqdm.tqdm(
+        total=sum(session_plan.input_bytes for session_plan in session_plans),
+        desc=f"Converting {len(session_plans)} session(s)",
+        unit="B",
+        unit_scale=True,
+        unit_divisor=1000,
+        position=0,
+        leave=True,
+    )
+
+
+def _check_manifest(
+    *,
+    manifest: ConversionManifest,
+    data_directory: pathlib.Path,
+    nwb_directory: pathlib.Path,
+    raw_or_processed: typing.Literal["raw", "processed"],
+    backend: Backend,
+    layout: Layout,
 ) -> None:
+    """Ensure a manifest was planned for the same conversion as the one it is used for."""
+    mismatches = [
+        f"{name} is '{value}' but the manifest was planned for '{planned_value}'"
+        for name, value, planned_value in (
+            ("data_directory", data_directory.absolute(), manifest.data_directory.absolute()),
+            ("nwb_directory", nwb_directory.absolute(), manifest.nwb_directory.absolute()),
+            ("raw_or_processed", raw_or_processed, manifest.raw_or_processed),
+            ("backend", backend, manifest.backend),
+            ("layout", layout, manifest.layout),
+        )
+        if value != planned_value
+    ]
+    if any(mismatches):
+        message = "The conversion does not match its manifest: " + "; ".join(mismatches) + "."
+        raise ValueError(message)
+
+
+def _convert_sessions_in_parallel(
+    *,
+    session_plans: list[SessionConversionPlan],
+    number_of_jobs: int,
+    session_conversion_kwargs: dict[str, typing.Any],
+    measurements: list[StageMeasurement],
+) -> None:
+    """
+    Convert each session in a separate worker process, collecting failures rather than stopping at the first.
+
+    The sessions are started in the order given. The measurements of each session converted are appended to the
+    `measurements` as it completes.
+    """
+    # 'spawn' is the only start method available on all platforms, and avoids forking a process holding HDF5 handles
+    context = multiprocessing.get_context(method="spawn")
+
+    # The top-level progress bar occupies the first position; each worker claims one of the following lines
+    progress_bar_positions = context.Queue()
+    for worker_index in range(number_of_jobs):
+        progress_bar_positions.put(worker_index + 1)
+
+    failures: dict[tuple[str, str], Exception] = dict()
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=number_of_jobs,
+        mp_context=context,
+        initializer=_initialize_worker,
+        initargs=(context.RLock(), progress_bar_positions, session_conversion_kwargs["data_directory"]),
+    ) as executor:
+        future_to_session_plan = {
+            executor.submit(
+                _convert_session,
+                subject_id=session_plan.subject_id,
+                session_id=session_plan.session_id,
+                **session_conversion_kwargs,
+            ): session_plan
+            for session_plan in session_plans
+        }
+
+        with _get_batch_progress_bar(session_plans=session_plans) as progress_bar:
+            for future in concurrent.futures.as_completed(future_to_session_plan):
+                session_plan = future_to_session_plan[future]
+                subject_id, session_id = session_plan.subject_id, session_plan.session_id
+                try:
+                    measurements += future.result()
+                except Exception as exception:
+                    failures[(subject_id, session_id)] = exception
+                    tqdm.tqdm.write(f"Conversion of subject '{subject_id}' session '{session_id}' failed: {exception}")
+                progress_bar.update(session_plan.input_bytes)
+
+    if any(failures):
+        failure_summary = "\n".join(
+            f"  sub-{subject_id} ses-{session_id}: {type(exception).__name__}: {exception}"
+            for (subject_id, session_id), exception in failures.items()
+        )
+        message = f"Conversion failed for {len(failures)} of {len(session_plans)} session(s):\n{failure_summary}"
+        raise ValueError(message)
+
+
+def _initialize_worker(
+    lock: typing.Any, progress_bar_positions: typing.Any, data_directory: pathlib.Path | None = None
+) -> None:
+    """
+    Share the terminal lock across workers and claim a line for this worker's progress bars.
+
+    Workers converting sessions of the `data_directory`, if given, also load its source index, for all their sessions.
+    """
+    global _progress_bar_position, _worker_source_index
+
+    tqdm.tqdm.set_lock(lock)
+    _progress_bar_position = progress_bar_positions.get()
+    if data_directory is not None:
+        _worker_source_index = SourceIndex(data_directory=data_directory)
+
+
+def _convert_session(
+    *,
+    data_directory: pathlib.Path,
+    subject_id: str,
+    session_id: str,
+    nwb_directory: pathlib.Path,
+    raw_or_processed: typing.Literal["raw", "processed"],
+    testing: bool = False,
+    write_profile: str | WriteProfile = "balanced",
+    dataset_write_profiles: dict[DatasetCategory, str | WriteProfile] | None = None,
+    backend: Backend = "hdf5",
+    number_of_compression_workers: int = 1,
+    iterator_options: IteratorOptions | None = None,
+    stream_iterator_options: dict[str, IteratorOptions] | None = None,
+    memory_limit_gb: float | None = None,
+    layout: Layout = "single",
+    number_of_stream_jobs: int = 1,
+    skip_if_exists: bool = True,
+    cache_units: bool = False,
+    instrumentation_file_path: pathlib.Path | None = None,
+    profile: ProfileMode | None = None,
+    profile_directory: pathlib.Path | None = None,
+    output_cache_directory: pathlib.Path | None = None,
+    output_cache_size_gb: float = DEFAULT_OUTPUT_CACHE_SIZE_GB,
+    source_index: SourceIndex | None = None,
+) -> list[StageMeasurement]:
     """
     Convert a single session of raw or processed OdorSequence data to NWB.
+
+    The file is first written to a temporary path and only moved into place once complete, then recorded in the
+    conversion ledger so that later batches can skip it for as long as its inputs remain unchanged.
+    With the "per-stream" `layout`, the same applies to the file of each stream, which `skip_if_exists` then skips;
+    up to `number_of_stream_jobs` streams are written at once.
+    Otherwise, a file found in the output cache at the `output_cache_directory`, if given, is reused rather than
+    converted again, and a file converted is kept there.
+
+    The source files are found through the `source_index`, if given (such as that of the whole batch), or else that
+    loaded by the worker process, or else one loaded for the session alone.
+
+    Returns the measurements of each stage of the conversion (see `SessionInstrumentation`), which are also appended
+    to the log at the `instrumentation_file_path`, if given.
     """
-    if subject_id is not None and session_id is not None:
-        subject_and_session_ids = [(subject_id, session_id)]
-    else:
-        subject_and_session_ids = sorted(
-            [
-                (subject_dir.stem, session_dir.stem.removeprefix(f"{subject_dir.stem}-"))
-                for subject_dir in data_directory.iterdir()
-                if subject_dir.is_dir()
-                for session_dir in (subject_dir / "preprocessed").iterdir()
-                if session_dir.is_dir()
-            ]
+    instrumentation = SessionInstrumentation(
+        session=f"sub-{subject_id}_ses-{session_id}",
+        log_file_path=instrumentation_file_path,
+        profile=profile,
+        profile_directory=profile_directory,
+    )
+    with instrumentation:
+        start_time = time.perf_counter()
+        source_index = source_index or _worker_source_index or SourceIndex(data_directory=data_directory)
+        session_paths = get_session_paths(
+            data_directory=data_directory,
+            subject_id=subject_id,
+            session_id=session_id,
+            nwb_directory=nwb_directory,
+            raw_or_processed=raw_or_processed,
+            backend=backend,
+            source_index=source_index,
         )
 
-    for subject_id, session_id in tqdm.tqdm(
-        iterable=subject_and_session_ids, desc="Converting session(s)", unit="sessions", position=0, leave=True
-    ):
-        raw_data_directory = data_directory / subject_id / "rawdata" / f"{subject_id}-{session_id}_g0"
-        preprocessed_data_directory = data_directory / subject_id / "preprocessed" / f"{subject_id}-{session_id}"
-        filename = f"sub-{subject_id}_ses-{session_id}_ecephys.nwb"
-
-        progress_bar_options = {"position": 1, "leave": False}
-        conversion_options = {
-            "stub_test": testing,
-            "iterator_options": {"display_progress": True, "progress_bar_options": progress_bar_options},
-        }
-        nwbfile = None
-        match raw_or_processed:
-            case "raw":
-                nwbfile_path = (
-                    nwb_directory
-                    / "sourcedata"
-                    / f"sub-{subject_id}"
-                    / f"ses-{session_id.replace("-", "+")}"
-                    / filename
+        # Suppress meaningless PyNWB warnings
+        warnings.filterwarnings(
+            action="ignore",
+            message=r".*TimeIntervals/.*_time.*",
+            category=hdmf.build.warnings.DtypeConversionWarning,
+        )
+
+        if layout == "per-stream":
+            _convert_session_per_stream(
+                session_paths=session_paths,
+                testing=testing,
+                write_profile=write_profile,
+                dataset_write_profiles=dataset_write_profiles,
+                number_of_compression_workers=number_of_compression_workers,
+                iterator_options=iterator_options,
+                stream_iterator_options=stream_iterator_options,
+                memory_limit_gb=memory_limit_gb,
+                number_of_jobs=number_of_stream_jobs,
+                skip_if_exists=skip_if_exists,
+                start_time=start_time,
+                instrumentation=instrumentation,
+            )
+        else:
+            nwbfile_path = session_paths["nwbfile_path"]
+
+            output_cache, output_cache_key, is_cached = None, None, False
+            if output_cache_directory is not None:
+                with instrumentation.measure(stage="output_cache"):
+                    output_cache = OutputCache(
+                        cache_directory=output_cache_directory, maximum_size_gb=output_cache_size_gb
+                    )
+                    # A memory limit (resolved from the memory available when 'auto') can shrink the chunks of the raw
+                    # streams, so the chunk sizes resolved from it are part of the key rather than the limit itself;
+                    # the buffer sizes and number of compression workers only change how the file is written
+                    chunk_mb_per_stream = None
+                    if raw_or_processed == "raw":
+                        stream_names = [
+                            result.group(1)
+                            for file_path in session_paths["input_file_paths"]
+                            if (result := re.search(pattern=r"\.(imec\d+\.ap|nidq)\.bin$", string=file_path.name))
+                        ]
+                        chunk_mb_per_stream = {
+                            stream_name: stream_options.get("chunk_mb", _DEFAULT_ITERATOR_OPTIONS["chunk_mb"])
+                            for stream_name, stream_options in _get_raw_stream_iterator_options(
+                                stream_names=sorted(stream_names),
+                                write_profile=write_profile,
+                                backend=backend,
+                                iterator_options=iterator_options,
+                                stream_iterator_options=stream_iterator_options,
+                                memory_limit_gb=memory_limit_gb,
+                                number_of_compression_workers=number_of_compression_workers,
+                            ).items()
+                        }
+                    output_cache_key = get_output_cache_key(
+                        input_file_paths=session_paths["input_file_paths"],
+                        options={
+                            "raw_or_processed": raw_or_processed,
+                            "testing": testing,
+                            "write_profile": write_profile,
+                            "dataset_write_profiles": dataset_write_profiles,
+                            "backend": backend,
+                            "iterator_options": iterator_options,
+                            "stream_iterator_options": stream_iterator_options,
+                            "chunk_mb_per_stream": chunk_mb_per_stream,
+                        },
+                    )
+                    is_cached = output_cache.retrieve(key=output_cache_key, nwbfile_path=nwbfile_path)
+
+            if not is_cached:
+                nwbfile = _create_session_nwbfile(
+                    raw_data_directory=session_paths["raw_data_directory"],
+                    preprocessed_data_directory=session_paths["preprocessed_data_directory"],
+                    raw_or_processed=raw_or_processed,
+                    testing=testing,
+                    write_profile=write_profile,
+                    backend=backend,
+                    iterator_options=iterator_options,
+                    stream_iterator_options=stream_iterator_options,
+                    memory_limit_gb=memory_limit_gb,
+                    number_of_compression_workers=number_of_compression_workers,
+                    source_index=source_index,
+                    units_cache_directory=get_home_directory() / "units_cache" if cache_units else None,
+                    instrumentation=instrumentation,
+                )
+
+                with instrumentation.measure(stage="backend_configuration"):
+                    backend_configuration = neuroconv.tools.nwb_helpers.get_default_backend_configuration(
+                        nwbfile=nwbfile, backend=backend
+                    )
+                    apply_write_profiles(
+                        backend_configuration=backend_configuration,
+                        write_profile=write_profile,
+                        dataset_write_profiles=dataset_write_profiles,
+                    )
+
+                with instrumentation.measure(stage="write"):
+                    _write_nwbfile_atomically(
+                        nwbfile_path=nwbfile_path,
+                        write=functools.partial(
+                            _write_nwbfile,
+                            nwbfile=nwbfile,
+                            backend_configuration=backend_configuration,
+                            number_of_compression_workers=number_of_compression_workers,
+                        ),
+                    )
+
+                if output_cache is not None:
+                    with instrumentation.measure(stage="output_cache"):
+                        output_cache.store(key=output_cache_key, nwbfile_path=nwbfile_path)
+
+            with instrumentation.measure(stage="ledger"):
+                ConversionLedger().record_completion(
+                    nwbfile_path=nwbfile_path,
+                    input_file_paths=session_paths["input_file_paths"],
+                    # Only the time of conversions is used to estimate that of later ones
+                    seconds=None if is_cached else time.perf_counter() - start_time,
                 )
-                if skip_if_exists and nwbfile_path.exists():
-                    continue
 
-                spikeglx_converter = neuroconv.converters.SpikeGLXConverterPipe(folder_path=raw_data_directory)
+    return instrumentation.measurements
+
+
+def _convert_session_per_stream(
+    *,
+    session_paths: dict[str, typing.Any],
+    testing: bool = False,
+    write_profile: str | WriteProfile = "balanced",
+    dataset_write_profiles: dict[DatasetCategory, str | WriteProfile] | None = None,
+    number_of_compression_workers: int = 1,
+    iterator_options: IteratorOptions | None = None,
+    stream_iterator_options: dict[str, IteratorOptions] | None = None,
+    memory_limit_gb: float | None = None,
+    number_of_jobs: int = 1,
+    skip_if_exists: bool = True,
+    start_time: float | None = None,
+    instrumentation: SessionInstrumentation | None = None,
+) -> None:
+    """
+    Write each SpikeGLX stream of a raw session to its own NWB file, each in its own process (up to `number_of_jobs`
+    at once), then write the top-level file of the session, which links to the data of the stream files rather than
+    copying it.
+
+    Each stream is converted by a process of its own, so the `instrumentation` only measures the time taken to convert
+    them all (the 'streams' stage), not the memory or I/O of those processes.
+    """
+    instrumentation = instrumentation or SessionInstrumentation(session=session_paths["raw_data_directory"].name)
+
+    raw_data_directory = session_paths["raw_data_directory"]
+    spikeglx_converter = neuroconv.converters.SpikeGLXConverterPipe(folder_path=raw_data_directory)
+    stream_names = list(spikeglx_converter.data_interface_objects)
+    stream_paths_by_name = {
+        stream_name: get_stream_paths(session_paths=session_paths, stream_name=stream_name)
+        for stream_name in stream_names
+    }
+
+    conversion_ledger = ConversionLedger()
+    stream_names_to_convert = [
+        stream_name
+        for stream_name, stream_paths in stream_paths_by_name.items()
+        if not skip_if_exists or not conversion_ledger.is_complete(**stream_paths)
+    ]
+
+    with instrumentation.measure(stage="streams"):
+        if any(stream_names_to_convert):
+            number_of_jobs = min(number_of_jobs, len(stream_names_to_convert))
+            stream_conversion_kwargs = {
+                "raw_data_directory": raw_data_directory,
+                "preprocessed_data_directory": session_paths["preprocessed_data_directory"],
+                "testing": testing,
+                "write_profile": write_profile,
+                "dataset_write_profiles": dataset_write_profiles,
+                "number_of_compression_workers": number_of_compression_workers,
+                "iterator_options": iterator_options,
+                "stream_iterator_options": stream_iterator_options,
+                # The streams are written at the same time, so share the memory of the session between them
+                "memory_limit_gb": None if memory_limit_gb is None else memory_limit_gb / number_of_jobs,
+            }
+
+            context = multiprocessing.get_context(method="spawn")
+            progress_bar_positions = context.Queue()
+            for worker_index in range(number_of_jobs):
+                progress_bar_positions.put(_progress_bar_position + worker_index)
+
+            failures: dict[str, Exception] = dict()
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=number_of_jobs,
+                mp_context=context,
+                initializer=_initialize_worker,
+                initargs=(context.RLock(), progress_bar_positions),
+            ) as executor:
+                future_to_stream_name = {
+                    executor.submit(
+                        _convert_stream,
+                        stream_name=stream_name,
+                        stream_paths=stream_paths_by_name[stream_name],
+                        **stream_conversion_kwargs,
+                    ): stream_name
+                    for stream_name in stream_names_to_convert
+                }
+                for future in concurrent.futures.as_completed(future_to_stream_name):
+                    try:
+                        future.result()
+                    except Exception as exception:
+                        failures[future_to_stream_name[future]] = exception
+
+            if any(failures):
+                failure_summary = "\n".join(
+                    f"  {stream_name}: {type(exception).__name__}: {exception}"
+                    for stream_name, exception in failures.items()
+                )
+                message = (
+                    f"Conversion failed for {len(failures)} of {len(stream_names_to_convert)} stream(s) of "
+                    f"{raw_data_directory.name}:\n{failure_summary}"
+                )
+                raise ValueError(message)
+
+    with instrumentation.measure(stage="metadata"):
+        metadata = spikeglx_converter.get_metadata()
+        enhance_metadata(
+            metadata=metadata,
+            preprocessed_data_directory=session_paths["preprocessed_data_directory"],
+            spikeglx_converter=spikeglx_converter,
+        )
+    nwbfile_path = session_paths["nwbfile_path"]
+    stream_nwbfile_paths = [stream_paths["nwbfile_path"] for stream_paths in stream_paths_by_name.values()]
+    with instrumentation.measure(stage="write"):
+        _write_nwbfile_atomically(
+            nwbfile_path=nwbfile_path,
+            write=functools.partial(
+                _write_linking_nwbfile, metadata=metadata, stream_nwbfile_paths=stream_nwbfile_paths
+            ),
+        )
+
+    # Rewriting or removing any stream file then also marks the session as incomplete
+    with instrumentation.measure(stage="ledger"):
+        conversion_ledger.record_completion(
+            nwbfile_path=nwbfile_path,
+            input_file_paths=session_paths["input_file_paths"] + stream_nwbfile_paths,
+            seconds=None if start_time is None else time.perf_counter() - start_time,
+        )
+
+
+def _convert_stream(
+    *,
+    stream_name: str,
+    stream_paths: dict[str, typing.Any],
+    raw_data_directory: pathlib.Path,
+    preprocessed_data_directory: pathlib.Path,
+    testing: bool = False,
+    write_profile: str | WriteProfile = "balanced",
+    dataset_write_profiles: dict[DatasetCategory, str | WriteProfile] | None = None,
+    number_of_compression_workers: int = 1,
+    iterator_options: IteratorOptions | None = None,
+    stream_iterator_options: dict[str, IteratorOptions] | None = None,
+    memory_limit_gb: float | None = None,
+) -> None:
+    """Convert a single SpikeGLX stream of a raw session to its own NWB file."""
+    warnings.filterwarnings(
+        action="ignore",
+        message=r".*TimeIntervals/.*_time.*",
+        category=hdmf.build.warnings.DtypeConversionWarning,
+    )
+
+    nwbfile = _create_session_nwbfile(
+        raw_data_directory=raw_data_directory,
+        preprocessed_data_directory=preprocessed_data_directory,
+        raw_or_processed="raw",
+        testing=testing,
+        write_profile=write_profile,
+        iterator_options=iterator_options,
+        stream_iterator_options=stream_iterator_options,
+        memory_limit_gb=memory_limit_gb,
+        number_of_compression_workers=number_of_compression_workers,
+        stream_names=[stream_name],
+    )
+
+    backend_configuration = neuroconv.tools.nwb_helpers.get_default_backend_configuration(
+        nwbfile=nwbfile, backend="hdf5"
+    )
+    apply_write_profiles(
+        backend_configuration=backend_configuration,
+        write_profile=write_profile,
+        dataset_write_profiles=dataset_write_profiles,
+    )
+
+    nwbfile_path = stream_paths["nwbfile_path"]
+    _write_nwbfile_atomically(
+        nwbfile_path=nwbfile_path,
+        write=functools.partial(
+            _write_nwbfile,
+            nwbfile=nwbfile,
+            backend_configuration=backend_configuration,
+            number_of_compression_workers=number_of_compression_workers,
+        ),
+    )
+
+    ConversionLedger().record_completion(**stream_paths)
+
+
+def _create_session_nwbfile(
+    *,
+    raw_data_directory: pathlib.Path,
+    preprocessed_data_directory: pathlib.Path,
+    raw_or_processed: typing.Literal["raw", "processed"],
+    testing: bool = False,
+    write_profile: str | WriteProfile = "balanced",
+    backend: Backend = "hdf5",
+    iterator_options: IteratorOptions | None = None,
+    stream_iterator_options: dict[str, IteratorOptions] | None = None,
+    memory_limit_gb: float | None = None,
+    number_of_compression_workers: int = 1,
+    stream_names: list[str] | None = None,
+    source_index: SourceIndex | None = None,
+    units_cache_directory: pathlib.Path | None = None,
+    instrumentation: SessionInstrumentation | None = None,
+) -> pynwb.NWBFile:
+    """
+    Create the in-memory NWB file of a single session, whose raw streams are read as they are written.
+
+    Only the raw `stream_names` given (such as ["imec0.ap"]) are included, or all streams if None.
+    The spike sorting files of processed sessions are looked up in the `source_index`, if given, and their units
+    cached in the `units_cache_directory`, if given. Each stage is measured by the `instrumentation`, if given.
+    """
+    instrumentation = instrumentation or SessionInstrumentation(session=preprocessed_data_directory.name)
+
+    nwbfile = None
+    match raw_or_processed:
+        case "raw":
+            with instrumentation.measure(stage="metadata"):
+                spikeglx_converter = neuroconv.converters.SpikeGLXConverterPipe(
+                    folder_path=raw_data_directory, streams=stream_names
+                )
 
                 metadata = spikeglx_converter.get_metadata()
                 enhance_metadata(
@@ -75,30 +820,45 @@ def odor_sequence_to_nwb(
                     spikeglx_converter=spikeglx_converter,
                 )
 
-                conversion_options = {
-                    "imec0.ap": conversion_options,
-                    "imec1.ap": conversion_options,
-                    "nidq": conversion_options,
+            converted_stream_names = [
+                stream_name
+                for stream_name in spikeglx_converter.data_interface_objects
+                if stream_name.endswith(".ap") or stream_name == "nidq"
+            ]
+
+            iterator_options_per_stream = _get_raw_stream_iterator_options(
+                stream_names=converted_stream_names,
+                write_profile=write_profile,
+                backend=backend,
+                iterator_options=iterator_options,
+                stream_iterator_options=stream_iterator_options,
+                memory_limit_gb=memory_limit_gb,
+                number_of_compression_workers=number_of_compression_workers,
+            )
+            conversion_options = {
+                stream_name: {
+                    "stub_test": testing,
+                    "iterator_options": {
+                        "display_progress": True,
+                        "progress_bar_options": {
+                            "position": _progress_bar_position,
+                            "leave": False,
+                            "desc": stream_name,
+                        },
+                        **stream_options,
+                    },
                 }
-                conversion_options["imec0.ap"]["iterator_options"]["progress_bar_options"]["desc"] = "imec0.ap"
-                conversion_options["imec0.ap"]["iterator_options"]["progress_bar_options"]["desc"] = "imec1.ap"
-                conversion_options["nidq"]["iterator_options"]["progress_bar_options"]["desc"] = "nidq"
+                for stream_name, stream_options in iterator_options_per_stream.items()
+            }
 
+            # The raw streams are only wrapped in data chunk iterators here; they are read as the file is written
+            with instrumentation.measure(stage="raw_streams"):
                 nwbfile = spikeglx_converter.create_nwbfile(metadata=metadata, conversion_options=conversion_options)
-            case "processed":
-                # spikeglx_converter = neuroconv.converters.SpikeGLXConverterPipe(folder_path=raw_data_directory)
-                #
-                # metadata = spikeglx_converter.get_metadata()
-                nwbfile_path = (
-                    nwb_directory
-                    / "derivatives"
-                    / f"sub-{subject_id}"
-                    / f"ses-{session_id.replace("-", "+")}"
-                    / filename
-                )
-                if skip_if_exists and nwbfile_path.exists():
-                    return
-
+        case "processed":
+            # spikeglx_converter = neuroconv.converters.SpikeGLXConverterPipe(folder_path=raw_data_directory)
+            #
+            # metadata = spikeglx_converter.get_metadata()
+            with instrumentation.measure(stage="metadata"):
                 metadata = neuroconv.utils.DeepDict()
                 enhance_metadata(
                     metadata=metadata,
@@ -106,6 +866,7 @@ def odor_sequence_to_nwb(
                     # spikeglx_converter=spikeglx_converter,
                 )
 
+            with instrumentation.measure(stage="intervals"):
                 odor_interface = OdorIntervalsInterface(preprocessed_data_directory=preprocessed_data_directory)
 
                 try:
@@ -114,25 +875,192 @@ def odor_sequence_to_nwb(
                     message = f"Something went wrong while creating the NWB file from the odor interface: {e}"
                     raise ValueError(message)
 
-                spike_sorted_interface = SpikeSortedInterface(preprocessed_data_directory=preprocessed_data_directory)
+            clean_units_file_paths = None
+            if source_index is not None:
+                clean_units_file_paths = source_index.glob(
+                    directory=preprocessed_data_directory, pattern="clean_units_imec*.mat"
+                )
+            with instrumentation.measure(stage="sorting_extraction"):
+                spike_sorted_interface = SpikeSortedInterface(
+                    preprocessed_data_directory=preprocessed_data_directory,
+                    file_paths=clean_units_file_paths,
+                    cache_directory=units_cache_directory,
+                )
+            with instrumentation.measure(stage="units_table"):
                 spike_sorted_interface.add_to_nwbfile(nwbfile=nwbfile)
 
-        if nwbfile is None:
-            message = "Something went wrong while creating the NWB file."
-            raise ValueError(message)
+    if nwbfile is None:
+        message = "Something went wrong while creating the NWB file."
+        raise ValueError(message)
 
-        # Suppress meaningless PyNWB warnings
-        warnings.filterwarnings(
-            action="ignore",
-            message=r".*TimeIntervals/.*_time.*",
-            category=hdmf.build.warnings.DtypeConversionWarning,
+    return nwbfile
+
+
+def _get_raw_stream_iterator_options(
+    *,
+    stream_names: list[str],
+    write_profile: str | WriteProfile,
+    backend: Backend,
+    iterator_options: IteratorOptions | None = None,
+    stream_iterator_options: dict[str, IteratorOptions] | None = None,
+    memory_limit_gb: float | None = None,
+    number_of_compression_workers: int = 1,
+) -> dict[str, dict[str, float]]:
+    """Resolve the buffer and chunk sizes of each raw stream converted, within the `memory_limit_gb`, if any."""
+    # Buffers are filled one stream at a time, except by parallel Zarr workers, which each fill one, or
+    # when the HDF5 streams are read concurrently, each of which then fills one
+    buffer_gb_limit = None
+    if memory_limit_gb is not None:
+        number_of_processes, number_of_buffers = 1, 1
+        if number_of_compression_workers > 1 and backend == "zarr":
+            number_of_processes = 1 + number_of_compression_workers
+            number_of_buffers = number_of_compression_workers
+        elif number_of_compression_workers > 1:
+            number_of_buffers = len(stream_names)
+        buffer_gb_limit = get_buffer_gb_limit(
+            memory_limit_gb=memory_limit_gb,
+            number_of_processes=number_of_processes,
+            number_of_buffers=number_of_buffers,
         )
 
-        backend_configuration = neuroconv.tools.nwb_helpers.get_default_backend_configuration(
-            nwbfile=nwbfile, backend="hdf5"
+    return {
+        stream_name: _get_stream_iterator_options(
+            stream_name=stream_name,
+            write_profile=write_profile,
+            backend=backend,
+            iterator_options=iterator_options,
+            stream_iterator_options=stream_iterator_options,
+            buffer_gb_limit=buffer_gb_limit,
         )
+        for stream_name in stream_names
+    }
+
+
+def _get_stream_iterator_options(
+    *,
+    stream_name: str,
+    write_profile: str | WriteProfile,
+    backend: Backend,
+    iterator_options: IteratorOptions | None = None,
+    stream_iterator_options: dict[str, IteratorOptions] | None = None,
+    buffer_gb_limit: float | None = None,
+) -> dict[str, float]:
+    """Resolve the buffer and chunk sizes of one raw stream, from the most specific options to the least."""
+    resolved_iterator_options = {
+        **get_iterator_options(write_profile=write_profile, backend=backend),
+        **(iterator_options or dict()),
+        **(stream_iterator_options or dict()).get(stream_name, dict()),
+    }
+    if buffer_gb_limit is None:
+        return resolved_iterator_options
 
-        nwbfile_path.parent.mkdir(parents=True, exist_ok=True)
+    buffer_gb = min(resolved_iterator_options.get("buffer_gb", _DEFAULT_ITERATOR_OPTIONS["buffer_gb"]), buffer_gb_limit)
+    chunk_mb = min(resolved_iterator_options.get("chunk_mb", _DEFAULT_ITERATOR_OPTIONS["chunk_mb"]), buffer_gb * 1e3)
+    return {"buffer_gb": buffer_gb, "chunk_mb": chunk_mb}
+
+
+def _write_nwbfile(
+    *,
+    nwbfile: pynwb.NWBFile,
+    nwbfile_path: pathlib.Path,
+    backend_configuration: neuroconv.tools.nwb_helpers.BackendConfiguration,
+    number_of_compression_workers: int = 1,
+) -> None:
+    """Configure the datasets of the NWB file and write it, compressing the chunks of its raw streams in parallel."""
+    if backend_configuration.backend == "hdf5" and number_of_compression_workers == 1:
         neuroconv.tools.nwb_helpers.configure_and_write_nwbfile(
             nwbfile=nwbfile, nwbfile_path=nwbfile_path, backend_configuration=backend_configuration
         )
+        return
+
+    if backend_configuration.backend == "hdf5":
+        neuroconv.tools.nwb_helpers.configure_backend(nwbfile=nwbfile, backend_configuration=backend_configuration)
+        with ConcurrentNWBHDF5IO(
+            path=nwbfile_path, mode="w", number_of_compression_workers=number_of_compression_workers
+        ) as io:
+            io.write(container=nwbfile, exhaust_dci=False)
+        return
+
+    # Only Zarr outputs need HDMF-Zarr, so HDF5 conversions do not import it
+    import hdmf_zarr
+
+    # NeuroConv does not pass the number of jobs on to HDMF-Zarr, which only uses it for the data chunk iterators
+    # (such as those of the raw streams) left in its queue rather than exhausted one at a time as they are written
+    neuroconv.tools.nwb_helpers.configure_backend(nwbfile=nwbfile, backend_configuration=backend_configuration)
+    with hdmf_zarr.NWBZarrIO(path=nwbfile_path, mode="w") as io:
+        io.write(
+            container=nwbfile,
+            exhaust_dci=number_of_compression_workers == 1,
+            number_of_jobs=number_of_compression_workers,
+            multiprocessing_context="spawn",
+        )
+
+
+def _write_nwbfile_atomically(*, nwbfile_path: pathlib.Path, write: typing.Callable[..., None]) -> None:
+    """Call `write(nwbfile_path=...)` on a temporary path, only moving the file into place once complete."""
+    # Write to a hidden temporary file first so that an interrupted write never leaves a truncated file in place
+    nwbfile_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_nwbfile_path = get_partial_nwbfile_path(nwbfile_path=nwbfile_path)
+    _remove_nwbfile(nwbfile_path=temporary_nwbfile_path)
+    write(nwbfile_path=temporary_nwbfile_path)
+
+    # A directory (as written by Zarr) cannot be replaced by another in a single step
+    if nwbfile_path.is_dir():
+        _remove_nwbfile(nwbfile_path=nwbfile_path)
+    temporary_nwbfile_path.replace(nwbfile_path)
+
+
+def _write_linking_nwbfile(
+    *, nwbfile_path: pathlib.Path, metadata: dict, stream_nwbfile_paths: list[pathlib.Path]
+) -> None:
+    """
+    Write an NWB file holding the acquisitions and events of the stream files through HDF5 external links.
+
+    The links name the stream files relative to the linking file, so they must all stay in the same directory.
+    The streams of the same probe (such as 'imec0.ap' and 'imec0.lf') each hold its device and electrode groups, of
+    which only those of the first stream are linked to.
+
+    The file written is read back, raising a ValueError if any acquisition cannot be read through its link.
+    """
+    nwbfile = neuroconv.tools.nwb_helpers.make_nwbfile_from_metadata(metadata=metadata)
+
+    # Objects read through the same manager as the file is written with are linked to, rather than copied
+    manager = pynwb.get_manager()
+    with contextlib.ExitStack() as stack:
+        for stream_nwbfile_path in stream_nwbfile_paths:
+            stream_io = stack.enter_context(pynwb.NWBHDF5IO(path=stream_nwbfile_path, mode="r", manager=manager))
+            stream_nwbfile = stream_io.read()
+            for device in list(stream_nwbfile.devices.values()):
+                if device.name not in nwbfile.devices:
+                    nwbfile.add_device(device)
+            for electrode_group in list(stream_nwbfile.electrode_groups.values()):
+                if electrode_group.name not in nwbfile.electrode_groups:
+                    nwbfile.add_electrode_group(electrode_group)
+            for time_series in list(stream_nwbfile.acquisition.values()):
+                nwbfile.add_acquisition(time_series)
+            for events_table in list(stream_nwbfile.events.values()):
+                nwbfile.add_events_table(events_table)
+
+        with pynwb.NWBHDF5IO(path=nwbfile_path, mode="w", manager=manager) as io:
+            io.write(nwbfile)
+
+        acquisition_shapes = {name: time_series.data.shape for name, time_series in nwbfile.acquisition.items()}
+
+    with pynwb.NWBHDF5IO(path=nwbfile_path, mode="r") as io:
+        linked_nwbfile = io.read()
+        linked_acquisition_shapes = {
+            name: time_series.data.shape for name, time_series in linked_nwbfile.acquisition.items()
+        }
+    if linked_acquisition_shapes != acquisition_shapes:
+        message = (
+            f"The acquisitions linked to by {nwbfile_path.name} read back as {linked_acquisition_shapes}, "
+            f"rather than as {acquisition_shapes} in the stream files."
+        )
+        raise ValueError(message)
+
+
+def _remove_nwbfile(nwbfile_path: pathlib.Path) -> None:
+    if nwbfile_path.is_dir():
+        shutil.rmtree(path=nwbfile_path)
+    else:
+        nwbfile_path.unlink(missing_ok=True)
@@ -0,0 +1,365 @@
+"""Update of the metadata and interval tables of processed NWB files in place, without rewriting their units."""
+
+import datetime
+import pathlib
+import shutil
+import typing
+import warnings
+
+import h5py
+import hdmf.build.warnings
+import neuroconv
+import numpy
+import pydantic
+
+from ._conversion_plan import get_session_paths, get_subject_and_session_ids
+from ._odor_sequence_to_nwb import _write_nwbfile
+from .interfaces import OdorIntervalsInterface, SpikeSortedInterface
+from ..utils import (
+    ConversionLedger,
+    DatasetCategory,
+    SourceIndex,
+    WriteProfile,
+    apply_write_profiles,
+    enhance_metadata,
+    get_partial_nwbfile_path,
+)
+
+# The members of the root of a file and of '/general' which only describe its writing, not the session
+_IGNORED_ROOT_NAMES = ("file_create_date", "identifier")
+_IGNORED_GENERAL_NAMES = ("source_script",)
+
+# The attributes which differ between any two writes of the same content
+_IGNORED_ATTRIBUTE_NAMES = ("object_id",)
+
+
+class SessionUpdate(pydantic.BaseModel):
+    """The update of the processed NWB file of a single session, or why it was not updated."""
+
+    subject_id: str
+    session_id: str
+    nwbfile_path: pathlib.Path
+    action: typing.Literal["update", "skip"]
+    reason: str
+    changed_paths: list[str] = pydantic.Field(
+        default_factory=list, description="The HDF5 paths of the groups, datasets, and attributes rewritten."
+    )
+
+
+@pydantic.validate_call
+def update_odor_sequence_nwb(
+    *,
+    data_directory: pathlib.Path,
+    subject_id: str | None = None,
+    session_id: str | None = None,
+    nwb_directory: pathlib.Path,
+    write_profile: typing.Literal["fast", "balanced", "archive"] | WriteProfile = "balanced",
+    dataset_write_profiles: (
+        dict[DatasetCategory, typing.Literal["fast", "balanced", "archive"] | WriteProfile] | None
+    ) = None,
+    dry_run: bool = False,
+) -> list[SessionUpdate]:
+    """
+    Update the processed NWB files of OdorSequence sessions in place, rewriting only what has changed.
+
+    If both `subject_id` and `session_id` are specified, only that single session is updated.
+    Otherwise, all sessions found under the `data_directory` with an existing processed (HDF5) file are updated.
+
+    The metadata (such as the subject and experimenter) and the trials and epochs tables are built again from the
+    source data, compared with those stored in the file, and only the groups and datasets which differ are replaced;
+    the descriptions of the units table and its columns are updated in place. The units themselves (such as their
+    spike times and mean waveforms) are never read nor rewritten, so an update takes a fraction of a second however
+    large the session. This suits a change of the experiment keys, of the ON/OFF times, or of the metadata written by
+    these tools; the replaced groups are written with the `write_profile` and `dataset_write_profiles` of
+    `odor_sequence_to_nwb`.
+
+    Sessions are skipped, to be converted again by `odor_sequence_to_nwb` instead, if not yet converted (or not
+    recorded as fully converted by the conversion ledger), if their spike sorting files have changed since, or if the
+    file was written with another version of the NWB schema. An interrupted update leaves its session unrecorded in
+    the ledger, so that it is then converted again in full. The space held by the replaced groups is not reclaimed
+    from the file (`h5repack` does so), though it is small next to that of the units.
+
+    With `dry_run`, the changes are only listed, and no file is modified.
+    """
+    source_index = SourceIndex(data_directory=data_directory)
+    if subject_id is not None and session_id is not None:
+        subject_and_session_ids = [(subject_id, session_id)]
+    else:
+        subject_and_session_ids = get_subject_and_session_ids(data_directory=data_directory, source_index=source_index)
+
+    # Suppress meaningless PyNWB warnings
+    warnings.filterwarnings(
+        action="ignore",
+        message=r".*TimeIntervals/.*_time.*",
+        category=hdmf.build.warnings.DtypeConversionWarning,
+    )
+
+    conversion_ledger = ConversionLedger()
+    session_updates = []
+    for subject_id, session_id in subject_and_session_ids:
+        session_paths = get_session_paths(
+            data_directory=data_directory,
+            subject_id=subject_id,
+            session_id=session_id,
+            nwb_directory=nwb_directory,
+            raw_or_processed="processed",
+            source_index=source_index,
+        )
+        nwbfile_path = session_paths["nwbfile_path"]
+        input_file_paths = session_paths["input_file_paths"]
+
+        changed_input_file_paths = conversion_ledger.get_changed_input_file_paths(
+            nwbfile_path=nwbfile_path, input_file_paths=input_file_paths
+        )
+        reason = None
+        if not nwbfile_path.exists():
+            reason = "not yet converted"
+        elif changed_input_file_paths is None:
+            reason = "not recorded as fully converted; convert it instead"
+        elif any(file_path.name.startswith("clean_units_imec") for file_path in changed_input_file_paths):
+            reason = "spike sorting changed; convert it instead"
+        if reason is not None:
+            session_updates.append(
+                SessionUpdate(
+                    subject_id=subject_id,
+                    session_id=session_id,
+                    nwbfile_path=nwbfile_path,
+                    action="skip",
+                    reason=reason,
+                )
+            )
+            continue
+
+        reference_nwbfile_path = nwbfile_path.with_name(f".{nwbfile_path.stem}.reference.nwb")
+        try:
+            _write_reference_nwbfile(
+                nwbfile_path=reference_nwbfile_path,
+                preprocessed_data_directory=session_paths["preprocessed_data_directory"],
+                write_profile=write_profile,
+                dataset_write_profiles=dataset_write_profiles,
+            )
+            changed_paths = _update_nwbfile(
+                nwbfile_path=nwbfile_path,
+                reference_nwbfile_path=reference_nwbfile_path,
+                dry_run=dry_run,
+                before_update=lambda: conversion_ledger.remove_entry(nwbfile_path=nwbfile_path),
+            )
+        finally:
+            reference_nwbfile_path.unlink(missing_ok=True)
+
+        if changed_paths is None:
+            action, reason = "skip", "written with another version of the NWB schema; convert it instead"
+        elif not any(changed_paths):
+            action, reason = "skip", "already up to date"
+        else:
+            action, reason = "update", "would be updated" if dry_run else "updated"
+
+        # The file then matches its inputs, even those which changed without changing it (such as a key file touched)
+        if changed_paths is not None and not dry_run and (any(changed_paths) or any(changed_input_file_paths)):
+            # Only the time of full conversions is used to estimate that of later ones
+            conversion_ledger.record_completion(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+        session_updates.append(
+            SessionUpdate(
+                subject_id=subject_id,
+                session_id=session_id,
+                nwbfile_path=nwbfile_path,
+                action=action,
+                reason=reason,
+                changed_paths=changed_paths or [],
+            )
+        )
+
+    return session_updates
+
+
+def _write_reference_nwbfile(
+    *,
+    nwbfile_path: pathlib.Path,
+    preprocessed_data_directory: pathlib.Path,
+    write_profile: str | WriteProfile = "balanced",
+    dataset_write_profiles: dict[DatasetCategory, str | WriteProfile] | None = None,
+) -> None:
+    """Write the metadata and interval tables of a processed session, as a full conversion would, without units."""
+    metadata = neuroconv.utils.DeepDict()
+    enhance_metadata(metadata=metadata, preprocessed_data_directory=preprocessed_data_directory)
+
+    odor_interface = OdorIntervalsInterface(preprocessed_data_directory=preprocessed_data_directory)
+    nwbfile = odor_interface.create_nwbfile(metadata=metadata)
+
+    backend_configuration = neuroconv.tools.nwb_helpers.get_default_backend_configuration(
+        nwbfile=nwbfile, backend="hdf5"
+    )
+    apply_write_profiles(
+        backend_configuration=backend_configuration,
+        write_profile=write_profile,
+        dataset_write_profiles=dataset_write_profiles,
+    )
+    nwbfile_path.unlink(missing_ok=True)
+    _write_nwbfile(nwbfile=nwbfile, nwbfile_path=nwbfile_path, backend_configuration=backend_configuration)
+
+
+def _update_nwbfile(
+    *,
+    nwbfile_path: pathlib.Path,
+    reference_nwbfile_path: pathlib.Path,
+    dry_run: bool = False,
+    before_update: typing.Callable[[], None] | None = None,
+) -> list[str] | None:
+    """
+    Replace the datasets of the root, and the members of '/general' and '/intervals', of an NWB file which differ
+    from those of the reference file, and update the descriptions of its units table.
+
+    The `before_update` is called before the first change, if any; a file hard linked elsewhere (such as from an
+    output cache) is first replaced by a copy of its own, so that only this file is changed. Returns the paths changed
+    (with '@description' for the descriptions), or None if the files were written with different versions of the NWB
+    schema.
+    """
+    with (
+        h5py.File(name=nwbfile_path, mode="r") as file,
+        h5py.File(name=reference_nwbfile_path, mode="r") as reference_file,
+    ):
+        if file.attrs.get("nwb_version") != reference_file.attrs.get("nwb_version"):
+            return None
+
+        changed_paths = []
+        for group_path, ignored_names in (
+            ("/", _IGNORED_ROOT_NAMES),
+            ("/general", _IGNORED_GENERAL_NAMES),
+            ("/intervals", ()),
+        ):
+            group, reference_group = file.get(group_path, dict()), reference_file.get(group_path, dict())
+            names = sorted((set(group.keys()) | set(reference_group.keys())) - set(ignored_names))
+            # Only the datasets of the root are compared; its groups hold the units, or are compared on their own
+            if group_path == "/":
+                names = [
+                    name
+                    for name in names
+                    if isinstance(group.get(name), h5py.Dataset) or isinstance(reference_group.get(name), h5py.Dataset)
+                ]
+            changed_paths += [
+                f"{group_path.rstrip('/')}/{name}"
+                for name in names
+                if name not in group
+                or name not in reference_group
+                or not _are_equal(first=group[name], second=reference_group[name])
+            ]
+
+        units_descriptions = {"/units": SpikeSortedInterface.units_description} | {
+            f"/units/{unit_property['name']}": unit_property["description"]
+            for unit_property in SpikeSortedInterface.unit_properties
+        }
+        changed_description_paths = [
+            path
+            for path, description in units_descriptions.items()
+            if path in file and _normalize_value(file=file, value=file[path].attrs.get("description")) != description
+        ]
+
+    if dry_run or (not any(changed_paths) and not any(changed_description_paths)):
+        return changed_paths + [f"{path}@description" for path in changed_description_paths]
+
+    if before_update is not None:
+        before_update()
+    _unlink_hard_links(file_path=nwbfile_path)
+
+    with (
+        h5py.File(name=nwbfile_path, mode="r+") as file,
+        h5py.File(name=reference_nwbfile_path, mode="r") as reference_file,
+    ):
+        for path in changed_paths:
+            if path in file:
+                del file[path]
+            if path in reference_file:
+                parent_path, name = path.rsplit("/", maxsplit=1)
+                # References between the objects copied (such as from an index to its column) are mapped to the copies
+                reference_file.copy(
+                    source=reference_file[path],
+                    dest=file.require_group(parent_path or "/"),
+                    name=name,
+                    expand_refs=True,
+                )
+        for path in changed_description_paths:
+            file[path].attrs["description"] = units_descriptions[path]
+
+        _append_file_create_date(file=file)
+
+    return changed_paths + [f"{path}@description" for path in changed_description_paths]
+
+
+def _unlink_hard_links(file_path: pathlib.Path) -> None:
+    """Replace a file by a copy of its own if it is hard linked elsewhere (such as from an output cache)."""
+    if file_path.stat().st_nlink == 1:
+        return
+
+    temporary_file_path = get_partial_nwbfile_path(nwbfile_path=file_path)
+    shutil.copyfile(src=file_path, dst=temporary_file_path)
+    temporary_file_path.replace(file_path)
+
+
+def _append_file_create_date(file: h5py.File) -> None:
+    """Record the modification of the file, as the NWB schema asks, among its dates of creation and modification."""
+    file_create_date = file["file_create_date"]
+    attributes = dict(file_create_date.attrs)
+    dates = list(file_create_date[()]) + [datetime.datetime.now().astimezone().isoformat().encode()]
+
+    del file["file_create_date"]
+    file.create_dataset(name="file_create_date", data=dates, dtype=h5py.string_dtype(), maxshape=(None,))
+    file["file_create_date"].attrs.update(attributes)
+
+
+def _are_equal(first: h5py.Group | h5py.Dataset, second: h5py.Group | h5py.Dataset) -> bool:
+    """Determine if two groups or datasets, possibly of different files, hold the same content and attributes."""
+    if isinstance(first, h5py.Dataset) != isinstance(second, h5py.Dataset):
+        return False
+
+    attribute_names = (set(first.attrs.keys()) | set(second.attrs.keys())) - set(_IGNORED_ATTRIBUTE_NAMES)
+    if not all(
+        name in first.attrs
+        and name in second.attrs
+        and _are_values_equal(
+            first=_normalize_value(file=first.file, value=first.attrs[name]),
+            second=_normalize_value(file=second.file, value=second.attrs[name]),
+        )
+        for name in attribute_names
+    ):
+        return False
+
+    if isinstance(first, h5py.Dataset):
+        return first.shape == second.shape and _are_values_equal(
+            first=_normalize_value(file=first.file, value=first[()]),
+            second=_normalize_value(file=second.file, value=second[()]),
+        )
+
+    if set(first.keys()) != set(second.keys()):
+        return False
+    return all(_are_equal(first=first[name], second=second[name]) for name in first.keys())
+
+
+def _normalize_value(file: h5py.File, value: typing.Any) -> typing.Any:
+    """
+    Express a value read from a file in a form comparable across files: strings are decoded, and references are
+    replaced by the paths of the objects they point to.
+    """
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, h5py.Reference):
+        return file[value].name if value else None
+    if isinstance(value, numpy.void):
+        return tuple(_normalize_value(file=file, value=field) for field in value)
+    if isinstance(value, numpy.ndarray) and value.dtype.kind in "OSUV":
+        return [_normalize_value(file=file, value=element) for element in value.tolist()]
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(file=file, value=element) for element in value]
+    return value
+
+
+def _are_values_equal(first: typing.Any, second: typing.Any) -> bool:
+    if isinstance(first, numpy.ndarray) or isinstance(second, numpy.ndarray):
+        first, second = numpy.asarray(first), numpy.asarray(second)
+        return (
+            first.dtype == second.dtype
+            and first.shape == second.shape
+            and numpy.array_equal(first, second, equal_nan=first.dtype.kind in "fc")
+        )
+
+    return bool(first == second)
@@ -1,10 +1,11 @@
+import hdmf.common
 import neuroconv
 import numpy
 import pydantic
 import pynwb
 import re
 
-from ...utils import read_experiment_keys_file
+from ...utils import read_experiment_keys_file, read_timestamps_file
 
 
 class OdorIntervalsInterface(neuroconv.BaseDataInterface):
@@ -46,32 +47,6 @@ class OdorIntervalsInterface(neuroconv.BaseDataInterface):
         # Odor sequences (trials)
         odor_ids = self._get_odor_ids()
 
-        odor_sequences = pynwb.epoch.TimeIntervals(
-            name="trials",
-            description="The on/off timing of presented odors IDs.",
-        )
-        odor_sequences.add_column(name="odorant_id", description="The odorant ID that was presented during this trial.")
-        odor_sequences.add_column(
-            name="odorant",
-            description=(
-                "The chemical description of the odorant. "
-                "According to one human (co-experimenter Kyoko Leaman) each substance smells like...\n"
-                "Cinnamaldehyde: cinnamon\n"
-                "Ethyl butyrate: pineapple, or similar to 2-Heptanone\n"
-                "1-octanol: waxy\n"
-                "Isobutyric acid: sour butter\n"
-                "Benzaldehyde: bitter, like almond\n"
-                "alpha-pinene: pine\n"
-                "Isovaleric acid: stink or cheesy\n"
-                "2-Heptanone: banana, or similar to Ethyl butyrate\n"
-                "Propyl acetate: plum\n"
-                "4-Methylvaleric acid: stinky"
-            ),
-        )
-        odor_sequences.add_column(
-            name="concentration", description="The concentration (in percent per volume) of the odorant."
-        )
-
         odorant_id_to_chemical = dict()
         odorant_id_to_concentration = dict()
         for odor_id in odor_ids:
@@ -100,31 +75,65 @@ class OdorIntervalsInterface(neuroconv.BaseDataInterface):
             odorant_id_to_concentration[odor_id] = concentration
             odorant_id_to_chemical[odor_id] = chemical
 
-        all_trials = []
-        for odor_id in odor_ids:
+        # Each file is loaded in bulk, then all trials are sorted and added column-wise rather than one row at a time
+        start_times_per_odor = []
+        stop_times_per_odor = []
+        odor_indices_per_odor = []
+        for odor_index, odor_id in enumerate(odor_ids):
             channel_key = f"odor{odor_id}_channel" if odor_id != "neutral" else "neutral_odor_channel"
             channel_name = self.experiment_keys[channel_key]
 
             on_channel_file_path = self.preprocessed_data_directory / f"{channel_name}_ON.txt"
             off_channel_file_path = self.preprocessed_data_directory / f"{channel_name}_OFF.txt"
 
-            with on_channel_file_path.open("r") as on_file_stream, off_channel_file_path.open("r") as off_file_stream:
-                all_trials.extend(
-                    [
-                        {"start_time": float(on_time), "stop_time": float(off_time), "odorant_id": odor_id}
-                        for on_time, off_time in zip(on_file_stream, off_file_stream)
-                    ]
-                )
-
-        all_trials.sort(key=lambda row: row["start_time"])
-        for row in all_trials:
-            odor_sequences.add_row(
-                start_time=row["start_time"],
-                stop_time=row["stop_time"],
-                odorant_id=row["odorant_id"],
-                odorant=odorant_id_to_chemical[row["odorant_id"]],
-                concentration=odorant_id_to_concentration[row["odorant_id"]],
-            )
+            on_times = read_timestamps_file(file_path=on_channel_file_path)
+            off_times = read_timestamps_file(file_path=off_channel_file_path)
+
+            # ON and OFF times are paired in order; any unpaired times at the end of the longer file are dropped
+            number_of_trials = min(on_times.size, off_times.size)
+            start_times_per_odor.append(on_times[:number_of_trials])
+            stop_times_per_odor.append(off_times[:number_of_trials])
+            odor_indices_per_odor.append(numpy.full(shape=number_of_trials, fill_value=odor_index))
+
+        # A stable sort keeps trials with identical start times in the order of the odor IDs
+        start_times = numpy.concatenate(start_times_per_odor)
+        trial_order = numpy.argsort(start_times, kind="stable")
+        odor_indices = numpy.concatenate(odor_indices_per_odor)[trial_order]
+
+        odor_sequences = _create_time_intervals(
+            name="trials",
+            description="The on/off timing of presented odors IDs.",
+            start_times=start_times[trial_order],
+            stop_times=numpy.concatenate(stop_times_per_odor)[trial_order],
+        )
+        odor_sequences.add_column(
+            name="odorant_id",
+            description="The odorant ID that was presented during this trial.",
+            data=_take(values=odor_ids, indices=odor_indices),
+        )
+        odor_sequences.add_column(
+            name="odorant",
+            description=(
+                "The chemical description of the odorant. "
+                "According to one human (co-experimenter Kyoko Leaman) each substance smells like...\n"
+                "Cinnamaldehyde: cinnamon\n"
+                "Ethyl butyrate: pineapple, or similar to 2-Heptanone\n"
+                "1-octanol: waxy\n"
+                "Isobutyric acid: sour butter\n"
+                "Benzaldehyde: bitter, like almond\n"
+                "alpha-pinene: pine\n"
+                "Isovaleric acid: stink or cheesy\n"
+                "2-Heptanone: banana, or similar to Ethyl butyrate\n"
+                "Propyl acetate: plum\n"
+                "4-Methylvaleric acid: stinky"
+            ),
+            data=_take(values=[odorant_id_to_chemical[odor_id] for odor_id in odor_ids], indices=odor_indices),
+        )
+        odor_sequences.add_column(
+            name="concentration",
+            description="The concentration (in percent per volume) of the odorant.",
+            data=_take(values=[odorant_id_to_concentration[odor_id] for odor_id in odor_ids], indices=odor_indices),
+        )
         nwbfile.trials = odor_sequences
 
         # Blocks (epochs)
@@ -201,3 +210,23 @@ class OdorIntervalsInterface(neuroconv.BaseDataInterface):
             if (result := re.match(pattern=pattern, string=key)) is not None
         ]
         return matches
+
+
+def _create_time_intervals(
+    *, name: str, description: str, start_times: numpy.ndarray, stop_times: numpy.ndarray
+) -> pynwb.epoch.TimeIntervals:
+    """Create a table of time intervals from whole columns of start and stop times, rather than row by row."""
+    column_descriptions = {column["name"]: column["description"] for column in pynwb.epoch.TimeIntervals.__columns__}
+    columns = [
+        hdmf.common.VectorData(name="start_time", description=column_descriptions["start_time"], data=start_times),
+        hdmf.common.VectorData(name="stop_time", description=column_descriptions["stop_time"], data=stop_times),
+    ]
+    ids = hdmf.common.ElementIdentifiers(name="id", data=numpy.arange(start_times.size))
+
+    time_intervals = pynwb.epoch.TimeIntervals(name=name, description=description, id=ids, columns=columns)
+    return time_intervals
+
+
+def _take(values: list, indices: numpy.ndarray) -> list:
+    """Look up the value for each index, keeping the Python types of the values (such as mixed strings and floats)."""
+    return numpy.array(values, dtype=object)[indices].tolist()
@@ -1,14 +1,34 @@
+import collections.abc
+import concurrent.futures
+import functools
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
 import warnings
-from typing import Dict, Union
 import typing
 import pathlib
-import numpy as np
+
+import h5py
 import pydantic
-from spikeinterface import BaseSorting
 import pymatreader
 import spikeinterface
 import numpy
 
+from ...utils import get_file_fingerprint, is_file_unchanged, read_mat_variable_headers
+
+# Only these variables are read from the .mat files; any others (such as raw waveform snippets) are never loaded
+_UNIT_VARIABLE_NAMES = ("unit_ids", "depths", "shank_ids", "channel_ids", "mean_waveforms")
+
+# Increased whenever the layout of the cached units changes, so that older caches are rebuilt rather than misread
+_UNITS_CACHE_FORMAT_VERSION = 1
+_UNITS_CACHE_ARRAY_NAMES = ("unit_ids", "depths", "shank_ids", "channel_ids", "waveform_means", "frames", "offsets")
+
+# The units of the sessions least recently read are removed once the cache holds more than this
+_MAXIMUM_UNITS_CACHE_SIZE_GB = 20.0
+
 
 class VanDerMeerSortingExtractor(spikeinterface.BaseSorting):
     extractor_name = "VanDerMeerSorting"
@@ -17,29 +37,212 @@ class VanDerMeerSortingExtractor(spikeinterface.BaseSorting):
     installation_mesg = ""
     name = "vandermeersorting"
 
-    def __init__(self, preprocessed_data_directory: pydantic.DirectoryPath):
-        clean_spike_sorted_file_paths: list[pathlib.Path] = list(
-            preprocessed_data_directory.glob(pattern="clean_units_imec*.mat")
-        )
-        spike_sorted_arrays: dict[pathlib.Path, dict[str, typing.Any]] = {
-            file_path: pymatreader.read_mat(filename=file_path) for file_path in clean_spike_sorted_file_paths
+    def __init__(
+        self,
+        preprocessed_data_directory: pydantic.DirectoryPath,
+        lazy: bool = False,
+        number_of_jobs: int | None = None,
+        file_paths: list[pydantic.FilePath] | None = None,
+        cache_directory: pathlib.Path | None = None,
+    ):
+        """
+        Extractor for the spike sorted units of all probes, stored in the `clean_units_imec*.mat` files.
+
+        Parameters
+        ----------
+        preprocessed_data_directory : directory path
+            The directory containing the `clean_units_imec*.mat` files.
+        lazy : bool, default: False
+            Whether to bound the memory used for sessions with many units.
+            The spike train of each unit is then only read from its file when requested,
+            and the mean waveforms are stored in single (float32) rather than double precision.
+        number_of_jobs : int, optional
+            The number of probes whose files are read and packed concurrently, each in its own thread.
+            The default is all probes at once, or one at a time when `lazy` (to hold only one probe's data at a time).
+            The result is identical regardless of the number of jobs.
+        file_paths : list of file paths, optional
+            The `clean_units_imec*.mat` files, if already known (such as from a `SourceIndex`).
+            By default, they are found by listing the `preprocessed_data_directory`.
+        cache_directory : directory path, optional
+            A directory in which to keep a copy of the units once read, as flat .npy arrays, keyed on the files.
+            Later extractors of the same, unchanged, files (and as `lazy`) then memory-map the copy instead of parsing
+            the files. The copies of the sessions least recently read are removed once they take more than 20 GB.
+        """
+        sampling_frequency = 30000.0  # Hard-coded to match SpikeGLX probe
+        waveform_dtype = "float32" if lazy else "float64"
+
+        # Ordered by probe number, so that the order of the units never depends on the order of the directory listing
+        if file_paths is None:
+            file_paths = list(preprocessed_data_directory.glob(pattern="clean_units_imec*.mat"))
+        clean_spike_sorted_file_paths: list[pathlib.Path] = sorted(file_paths, key=_get_probe_sort_key)
+        if number_of_jobs is None:
+            number_of_jobs = 1 if lazy else max(len(clean_spike_sorted_file_paths), 1)
+
+        units = None
+        if cache_directory is not None:
+            units_cache_directory = _get_units_cache_directory(
+                cache_directory=cache_directory, file_paths=clean_spike_sorted_file_paths
+            )
+            units = _load_units_cache(
+                units_cache_directory=units_cache_directory,
+                file_paths=clean_spike_sorted_file_paths,
+                sampling_frequency=sampling_frequency,
+                waveform_dtype=waveform_dtype,
+            )
+        if units is None:
+            units = _read_units(
+                file_paths=clean_spike_sorted_file_paths,
+                lazy=lazy,
+                number_of_jobs=number_of_jobs,
+                sampling_frequency=sampling_frequency,
+                waveform_dtype=waveform_dtype,
+            )
+            if cache_directory is not None:
+                _save_units_cache(
+                    units_cache_directory=units_cache_directory,
+                    units=units,
+                    file_paths=clean_spike_sorted_file_paths,
+                    sampling_frequency=sampling_frequency,
+                )
+                _evict_units_caches(
+                    cache_directory=cache_directory,
+                    maximum_size_gb=_MAXIMUM_UNITS_CACHE_SIZE_GB,
+                    kept_units_cache_directory=units_cache_directory,
+                )
+        unit_ids, depths, shank_ids, channel_ids, waveform_means, spike_frames_by_unit_id = units
+
+        spikeinterface.BaseSorting.__init__(self, sampling_frequency=sampling_frequency, unit_ids=unit_ids)
+
+        sorting_segment = VanDerMeerSortingSegment(spike_frames_by_unit_id=spike_frames_by_unit_id)
+        self.add_sorting_segment(sorting_segment)
+        self._kwargs = {
+            "preprocessed_data_directory": str(preprocessed_data_directory),
+            "lazy": lazy,
+            "number_of_jobs": number_of_jobs,
+            "file_paths": [str(file_path) for file_path in clean_spike_sorted_file_paths],
+            "cache_directory": str(cache_directory) if cache_directory is not None else None,
         }
 
-        number_of_units_per_probe = [
-            data_per_probe["unit_ids"].shape[0] for data_per_probe in spike_sorted_arrays.values()
-        ]
-        total_number_of_units = sum(number_of_units_per_probe)
+        self.set_property(key="relative_depth", values=depths)
+        self.set_property(key="shank_id", values=shank_ids)
 
-        number_of_units_cumulative = numpy.cumsum([0] + number_of_units_per_probe)
-        number_of_waveform_frames = next(iter(spike_sorted_arrays.values()))["mean_waveforms"][0].shape[1]
-        max_number_of_waveform_channels = max(
-            [
-                mean_waveform.shape[0]
-                for data_per_probe in spike_sorted_arrays.values()
-                for mean_waveform in data_per_probe["mean_waveforms"]
-            ]
+        warnings.filterwarnings(
+            action="ignore", message="Column 'waveform_mean' is predefined*", category=UserWarning, module="neuroconv"
+        )
+        warnings.filterwarnings(action="ignore", message="Shape of data does not match*", module="hdmf")
+        self.set_property(key="waveform_mean", values=waveform_means)
+
+        if any(channel_ids):
+            self.set_property(key="channel_id", values=channel_ids)
+
+    def get_unit_spike_train(
+        self,
+        unit_id: str,
+        segment_index: int | None = None,
+        start_frame: int | None = None,
+        end_frame: int | None = None,
+        return_times: bool = False,
+        use_cache: bool = False,
+    ) -> numpy.ndarray:
+        """
+        Get the spike train (in frames, or in seconds if `return_times`) of a single unit.
+
+        Unlike other SpikeInterface sorting outputs, `use_cache` defaults to False: the spike train of each unit is
+        already held as sorted frames, so building the cache (a spike vector of all units, sorted by time and then
+        re-sorted by unit) on the first call would only cost time and memory.
+        """
+        return super().get_unit_spike_train(
+            unit_id=unit_id,
+            segment_index=segment_index,
+            start_frame=start_frame,
+            end_frame=end_frame,
+            return_times=return_times,
+            use_cache=use_cache,
         )
 
+    def get_all_unit_spike_trains(
+        self, start_frame: int | None = None, end_frame: int | None = None
+    ) -> dict[str, numpy.ndarray]:
+        """Get the spike trains (in frames) of all units at once, as a dictionary from unit ID to a read-only array."""
+        return self.segments[0].get_all_unit_spike_trains(start_frame=start_frame, end_frame=end_frame)
+
+    def _compute_and_cache_spike_vector(self) -> None:
+        """
+        When the spike trains are packed, the spike vector is built from the packed frames in a single pass.
+
+        This fills the private cache of the spike vector of `BaseSorting`, so it defers to SpikeInterface itself for any
+        version which does not hold that cache (and its dtype) as expected.
+        """
+        spike_frames_by_unit_id = self.segments[0]._spike_frames_by_unit_id
+        minimum_spike_dtype = getattr(spikeinterface.core.base, "minimum_spike_dtype", None)
+        if (
+            not isinstance(spike_frames_by_unit_id, _PackedSpikeTrains)
+            or minimum_spike_dtype is None
+            or not hasattr(self, "_cached_spike_vector")
+            or not hasattr(self, "_cached_spike_vector_segment_slices")
+        ):
+            super()._compute_and_cache_spike_vector()
+            return
+
+        unit_indices = numpy.repeat(
+            numpy.arange(len(spike_frames_by_unit_id), dtype="int64"), numpy.diff(spike_frames_by_unit_id.offsets)
+        )
+        # A stable sort by time keeps simultaneous spikes in the order of the units, as SpikeInterface itself does
+        order = numpy.argsort(spike_frames_by_unit_id.frames, kind="stable")
+
+        spikes = numpy.zeros(shape=order.size, dtype=minimum_spike_dtype)
+        spikes["sample_index"] = spike_frames_by_unit_id.frames[order]
+        spikes["unit_index"] = unit_indices[order]
+
+        self._cached_spike_vector = spikes
+        self._cached_spike_vector_segment_slices = numpy.array([[0, spikes.size]], dtype="int64")
+
+
+class _Units(typing.NamedTuple):
+    """The spike sorted units of all probes of a session, as held by the extractor."""
+
+    unit_ids: numpy.ndarray
+    depths: numpy.ndarray
+    shank_ids: numpy.ndarray
+    channel_ids: numpy.ndarray
+    waveform_means: numpy.ndarray  # Of shape (units, frames, channels), padded with NaN
+    spike_frames_by_unit_id: typing.Mapping[str, numpy.ndarray]
+
+
+def _read_units(
+    file_paths: list[pathlib.Path],
+    lazy: bool,
+    number_of_jobs: int,
+    sampling_frequency: float,
+    waveform_dtype: str,
+) -> _Units:
+    """Read the units of all probes from their `clean_units_imec*.mat` files, in the order of the files."""
+    # Reading is mostly spent waiting on (often network) storage, so threads suffice and avoid copying the data
+    # between processes; `map` returns the probes in the order of the files, whichever finishes reading first
+    with concurrent.futures.ThreadPoolExecutor(max_workers=number_of_jobs) as executor:
+        # Only the headers of the files are read at first, to size the arrays of all units before reading any data
+        headers_per_probe = list(
+            executor.map(
+                functools.partial(read_mat_variable_headers, cell_variable_names=("mean_waveforms",)),
+                file_paths,
+            )
+        )
+
+        number_of_units_per_probe = [probe_headers["unit_ids"].length for probe_headers in headers_per_probe]
+        total_number_of_units = sum(number_of_units_per_probe)
+        number_of_units_cumulative = numpy.cumsum([0] + number_of_units_per_probe)
+        probe_slices = [
+            slice(number_of_units_cumulative[probe_index], number_of_units_cumulative[probe_index + 1])
+            for probe_index in range(len(headers_per_probe))
+        ]
+
+        # The mean waveforms of each unit are stored as (channels, frames)
+        waveform_shapes = [
+            shape for probe_headers in headers_per_probe for shape in probe_headers["mean_waveforms"].cell_shapes
+        ]
+        number_of_waveform_frames = waveform_shapes[0][1] if total_number_of_units > 0 else 0
+        max_number_of_waveform_channels = max((shape[0] for shape in waveform_shapes), default=0)
+
         unit_ids = numpy.empty(shape=total_number_of_units, dtype="U9")
         depths = numpy.empty(shape=total_number_of_units, dtype="float64")
         shank_ids = numpy.empty(shape=total_number_of_units, dtype="uint8")
@@ -47,63 +250,385 @@ class VanDerMeerSortingExtractor(spikeinterface.BaseSorting):
         waveform_means = numpy.full(
             shape=(total_number_of_units, number_of_waveform_frames, max_number_of_waveform_channels),
             fill_value=numpy.nan,
+            dtype=waveform_dtype,
         )
-        spike_times_by_unit_id: dict[str, np.ndarray] = dict()
-        for probe_index, data_per_probe in enumerate(spike_sorted_arrays.values()):
-            start_index = number_of_units_cumulative[probe_index]
-            stop_index = number_of_units_cumulative[probe_index + 1]
-
-            unit_ids[start_index:stop_index] = data_per_probe["unit_ids"]
-            depths[start_index:stop_index] = data_per_probe["depths"]
-            shank_ids[start_index:stop_index] = data_per_probe["shank_ids"].astype("uint8")
-            channel_ids_per_probe = data_per_probe.get("channel_ids", None)
-            if channel_ids_per_probe is not None:
-                channel_ids[start_index:stop_index] = channel_ids_per_probe
-
-            for unit_id, spike_train in zip(data_per_probe["unit_ids"], data_per_probe["spike_train"]):
-                spike_times_by_unit_id[unit_id] = spike_train
-
-            for unit_index_per_probe, waveforms in enumerate(data_per_probe["mean_waveforms"]):
-                unit_index = start_index + unit_index_per_probe
-                num_channels, num_frames = waveforms.shape
-                waveform_means[unit_index, :num_frames, :num_channels] = waveforms.T
 
-        sampling_frequency = 30000.0  # Hard-coded to match SpikeGLX probe
-        BaseSorting.__init__(self, sampling_frequency=sampling_frequency, unit_ids=unit_ids)
-        sorting_segment = VanDerMeerSortingSegment(
-            sampling_frequency=sampling_frequency, spike_times_by_unit_id=spike_times_by_unit_id
+        # Each probe packs its mean waveforms into its own, non-overlapping, range of units as they are read
+        units_per_probe: list[_ProbeUnits] = list(
+            executor.map(
+                functools.partial(_read_probe_units, lazy=lazy, sampling_frequency=sampling_frequency),
+                file_paths,
+                [waveform_means[probe_slice] for probe_slice in probe_slices],
+            )
         )
-        self.add_sorting_segment(sorting_segment)
 
-        self.set_property(key="relative_depth", values=depths)
-        self.set_property(key="shank_id", values=shank_ids)
+    for probe_slice, probe_units in zip(probe_slices, units_per_probe):
+        unit_ids[probe_slice] = probe_units.unit_ids
+        depths[probe_slice] = probe_units.depths
+        shank_ids[probe_slice] = probe_units.shank_ids
+        channel_ids[probe_slice] = probe_units.channel_ids
 
-        warnings.filterwarnings(
-            action="ignore", message="Column 'waveform_mean' is predefined*", category=UserWarning, module="neuroconv"
+    if lazy:
+        unit_locations = {
+            unit_id: (probe_units.file_path, unit_index_per_probe)
+            for probe_units in units_per_probe
+            for unit_index_per_probe, unit_id in enumerate(probe_units.unit_ids)
+        }
+        spike_frames_by_unit_id = _LazySpikeTrains(unit_locations=unit_locations, sampling_frequency=sampling_frequency)
+    else:
+        spike_frames_by_unit_id = _PackedSpikeTrains.from_spike_frames(
+            unit_ids=unit_ids,
+            spike_frames_per_unit=[
+                spike_frames for probe_units in units_per_probe for spike_frames in probe_units.spike_frames
+            ],
         )
-        warnings.filterwarnings(action="ignore", message="Shape of data does not match*", module="hdmf")
-        self.set_property(key="waveform_mean", values=waveform_means)
 
-        if any(channel_ids):
-            self.set_property(key="channel_id", values=channel_ids)
+    units = _Units(
+        unit_ids=unit_ids,
+        depths=depths,
+        shank_ids=shank_ids,
+        channel_ids=channel_ids,
+        waveform_means=waveform_means,
+        spike_frames_by_unit_id=spike_frames_by_unit_id,
+    )
+    return units
+
+
+class _ProbeUnits(typing.NamedTuple):
+    """The units of a single probe, as read from its `clean_units_imec*.mat` file."""
+
+    file_path: pathlib.Path
+    unit_ids: numpy.ndarray
+    depths: numpy.ndarray
+    shank_ids: numpy.ndarray
+    channel_ids: numpy.ndarray
+    spike_frames: list[numpy.ndarray]  # Empty when spike trains are read lazily
+
+
+def _read_probe_units(
+    file_path: pathlib.Path, waveform_means: numpy.ndarray, lazy: bool, sampling_frequency: float
+) -> _ProbeUnits:
+    """Read the units of a single probe, copying the mean waveform of each unit into its (NaN padded) row."""
+    variable_names = list(_UNIT_VARIABLE_NAMES) if lazy else [*_UNIT_VARIABLE_NAMES, "spike_train"]
+    data_per_probe = pymatreader.read_mat(filename=file_path, variable_names=variable_names)
+
+    unit_ids = numpy.atleast_1d(data_per_probe["unit_ids"])
+    number_of_units = unit_ids.shape[0]
+    channel_ids = data_per_probe.get("channel_ids", None)
+
+    mean_waveforms = data_per_probe.pop("mean_waveforms")
+    if len(mean_waveforms) != number_of_units or waveform_means.shape[0] != number_of_units:
+        message = (
+            f"The variables of `{file_path.name}` hold different numbers of units - "
+            "run `vandermeerlab2bids validate` for details."
+        )
+        raise ValueError(message)
+    # Transposed to (frames, channels) to match the layout of the 'waveform_mean' column
+    for unit_index, waveforms in enumerate(mean_waveforms):
+        waveforms = numpy.asarray(waveforms).T
+        num_frames, num_channels = waveforms.shape
+        waveform_means[unit_index, :num_frames, :num_channels] = waveforms
+    del mean_waveforms
+
+    probe_units = _ProbeUnits(
+        file_path=file_path,
+        unit_ids=unit_ids,
+        depths=numpy.asarray(data_per_probe["depths"], dtype="float64").reshape(number_of_units),
+        shank_ids=numpy.asarray(data_per_probe["shank_ids"]).astype("uint8").reshape(number_of_units),
+        channel_ids=(
+            numpy.asarray(channel_ids) if channel_ids is not None else numpy.full(shape=number_of_units, fill_value="")
+        ),
+        spike_frames=[
+            _convert_spike_times_to_frames(spike_times=spike_train, sampling_frequency=sampling_frequency)
+            for spike_train in data_per_probe.get("spike_train", [])
+        ],
+    )
+    return probe_units
+
+
+def _get_probe_sort_key(file_path: pathlib.Path) -> tuple[int, str]:
+    match = re.search(pattern=r"imec(\d+)", string=file_path.name)
+    return (int(match.group(1)) if match is not None else -1, file_path.name)
+
+
+def _get_units_cache_directory(cache_directory: pathlib.Path, file_paths: list[pathlib.Path]) -> pathlib.Path:
+    cache_key = hashlib.sha1("\n".join(str(file_path.absolute()) for file_path in file_paths).encode()).hexdigest()
+    return pathlib.Path(cache_directory) / cache_key
+
+
+def _load_units_cache(
+    units_cache_directory: pathlib.Path,
+    file_paths: list[pathlib.Path],
+    sampling_frequency: float,
+    waveform_dtype: str,
+) -> _Units | None:
+    """
+    Load the units cached from the same, unchanged, files with mean waveforms of the same dtype; or None if there are
+    none.
+
+    The spike frames and mean waveforms are memory-mapped rather than read, so only the pages used are ever loaded.
+    """
+    manifest_file_path = units_cache_directory / "manifest.json"
+    if not manifest_file_path.exists():
+        return None
+
+    manifest = json.loads(manifest_file_path.read_text())
+    fingerprints = manifest["input_fingerprints"]
+    if (
+        manifest["format_version"] != _UNITS_CACHE_FORMAT_VERSION
+        or manifest["sampling_frequency"] != sampling_frequency
+        or manifest.get("waveform_dtype") != waveform_dtype
+    ):
+        return None
+    if list(fingerprints) != [str(file_path.absolute()) for file_path in file_paths]:
+        return None
+    if not all(
+        is_file_unchanged(file_path=file_path, fingerprint=fingerprints[str(file_path.absolute())])
+        for file_path in file_paths
+    ):
+        return None
+
+    # Marks the units as recently read, so that they are the last to be evicted
+    os.utime(manifest_file_path)
+
+    arrays = {
+        name: numpy.load(file=units_cache_directory / f"{name}.npy", mmap_mode="r") for name in _UNITS_CACHE_ARRAY_NAMES
+    }
+    unit_ids = numpy.array(arrays["unit_ids"])
+
+    units = _Units(
+        unit_ids=unit_ids,
+        depths=numpy.array(arrays["depths"]),
+        shank_ids=numpy.array(arrays["shank_ids"]),
+        channel_ids=numpy.array(arrays["channel_ids"]),
+        waveform_means=arrays["waveform_means"],
+        spike_frames_by_unit_id=_PackedSpikeTrains(
+            unit_ids=unit_ids, frames=arrays["frames"], offsets=numpy.array(arrays["offsets"])
+        ),
+    )
+    return units
+
+
+def _save_units_cache(
+    units_cache_directory: pathlib.Path, units: _Units, file_paths: list[pathlib.Path], sampling_frequency: float
+) -> None:
+    """
+    Save the units as one .npy file per array, with the spike frames of all units in a single flat array.
+
+    The files are written to a temporary directory which then replaces any previous cache at once. Spike trains read
+    lazily are copied one unit at a time into a file sized from the headers of the `clean_units_imec*.mat` files.
+    """
+    temporary_directory = units_cache_directory.with_name(f"{units_cache_directory.name}.partial-{os.getpid()}")
+    shutil.rmtree(temporary_directory, ignore_errors=True)
+    temporary_directory.mkdir(parents=True)
+
+    for name in ("unit_ids", "depths", "shank_ids", "channel_ids", "waveform_means"):
+        numpy.save(file=temporary_directory / f"{name}.npy", arr=getattr(units, name))
+
+    spike_frames_by_unit_id = units.spike_frames_by_unit_id
+    if isinstance(spike_frames_by_unit_id, _PackedSpikeTrains):
+        numpy.save(file=temporary_directory / "frames.npy", arr=spike_frames_by_unit_id.frames)
+        numpy.save(file=temporary_directory / "offsets.npy", arr=spike_frames_by_unit_id.offsets)
+    else:
+        number_of_spikes_per_unit = [
+            math.prod(shape)
+            for file_path in file_paths
+            for shape in read_mat_variable_headers(file_path=file_path, cell_variable_names=("spike_train",))[
+                "spike_train"
+            ].cell_shapes
+        ]
+        offsets = numpy.zeros(shape=len(number_of_spikes_per_unit) + 1, dtype="int64")
+        numpy.cumsum(number_of_spikes_per_unit, out=offsets[1:])
+
+        frames = numpy.lib.format.open_memmap(
+            filename=temporary_directory / "frames.npy", mode="w+", dtype="int64", shape=(int(offsets[-1]),)
+        )
+        for unit_index, unit_id in enumerate(units.unit_ids):
+            frames[offsets[unit_index] : offsets[unit_index + 1]] = spike_frames_by_unit_id[unit_id]
+        frames.flush()
+        del frames
+        numpy.save(file=temporary_directory / "offsets.npy", arr=offsets)
+
+    manifest = {
+        "format_version": _UNITS_CACHE_FORMAT_VERSION,
+        "sampling_frequency": sampling_frequency,
+        "waveform_dtype": str(units.waveform_means.dtype),
+        "input_fingerprints": {
+            str(file_path.absolute()): get_file_fingerprint(file_path=file_path) for file_path in file_paths
+        },
+    }
+    (temporary_directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    shutil.rmtree(units_cache_directory, ignore_errors=True)
+    try:
+        temporary_directory.rename(units_cache_directory)
+    except OSError:  # Another conversion of the same session has just saved the same units
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+
+
+def _evict_units_caches(
+    cache_directory: pathlib.Path, maximum_size_gb: float, kept_units_cache_directory: pathlib.Path | None = None
+) -> list[pathlib.Path]:
+    """
+    Remove the cached units of the sessions least recently read until those left take no more than `maximum_size_gb`.
+
+    The units at the `kept_units_cache_directory` (such as those just saved) are never removed.
+    Returns the directories removed.
+    """
+    manifest_times_and_sizes = dict()
+    for manifest_file_path in pathlib.Path(cache_directory).glob(pattern="*/manifest.json"):
+        units_cache_directory = manifest_file_path.parent
+        try:
+            manifest_time = manifest_file_path.stat().st_mtime
+            size = sum(file_path.stat().st_size for file_path in units_cache_directory.iterdir())
+        except FileNotFoundError:  # Being replaced, or evicted, by another process
+            continue
+        manifest_times_and_sizes[units_cache_directory] = (manifest_time, size)
+
+    total_size = sum(size for _, size in manifest_times_and_sizes.values())
+    evicted_units_cache_directories = []
+    for units_cache_directory, (_, size) in sorted(
+        manifest_times_and_sizes.items(), key=lambda directory_and_time_and_size: directory_and_time_and_size[1][0]
+    ):
+        if total_size <= maximum_size_gb * 1e9:
+            break
+        if units_cache_directory == kept_units_cache_directory:
+            continue
+
+        shutil.rmtree(units_cache_directory, ignore_errors=True)
+        total_size -= size
+        evicted_units_cache_directories.append(units_cache_directory)
+
+    return evicted_units_cache_directories
 
 
 class VanDerMeerSortingSegment(spikeinterface.BaseSortingSegment):
-    def __init__(self, sampling_frequency: float, spike_times_by_unit_id: Dict[int, np.ndarray]):
+    def __init__(self, spike_frames_by_unit_id: typing.Mapping[str, numpy.ndarray]):
         super().__init__()
-        self._sampling_frequency: float = sampling_frequency
-        self._spike_times_by_unit_id: dict[int, np.ndarray] = spike_times_by_unit_id
+        self._spike_frames_by_unit_id: typing.Mapping[str, numpy.ndarray] = spike_frames_by_unit_id
 
     def get_unit_spike_train(
         self,
-        unit_id: int,
-        start_frame: Union[int, None] = None,
-        end_frame: Union[int, None] = None,
-    ) -> np.ndarray:
-        times = np.array(self._spike_times_by_unit_id[unit_id])
-        frames = (times * self._sampling_frequency).astype(int)
-        if start_frame is not None:
-            frames = frames[frames >= start_frame]
-        if end_frame is not None:
-            frames = frames[frames < end_frame]
-        return frames
+        unit_id: str,
+        start_frame: int | None = None,
+        end_frame: int | None = None,
+    ) -> numpy.ndarray:
+        frames = self._spike_frames_by_unit_id[unit_id]
+
+        # The frames of each unit are sorted, so the range is found by binary search and returned without a copy
+        start_index = numpy.searchsorted(frames, start_frame, side="left") if start_frame is not None else None
+        end_index = numpy.searchsorted(frames, end_frame, side="left") if end_frame is not None else None
+        return frames[start_index:end_index]
+
+    def get_all_unit_spike_trains(
+        self, start_frame: int | None = None, end_frame: int | None = None
+    ) -> dict[str, numpy.ndarray]:
+        return {
+            unit_id: self.get_unit_spike_train(unit_id=unit_id, start_frame=start_frame, end_frame=end_frame)
+            for unit_id in self._spike_frames_by_unit_id
+        }
+
+
+class _PackedSpikeTrains(collections.abc.Mapping):
+    """
+    Read-only mapping from unit ID to spike frames, where the frames of all units are held in a single flat array.
+
+    The frames of the unit at index `i` are `frames[offsets[i]:offsets[i + 1]]`; each mapped value is a view of them.
+    """
+
+    def __init__(self, unit_ids: numpy.ndarray, frames: numpy.ndarray, offsets: numpy.ndarray):
+        self.unit_ids = unit_ids
+        self.frames = frames
+        self.offsets = offsets
+        self.frames.flags.writeable = False  # Views of the frames are handed out, so they must never be modified
+
+        self._unit_id_to_index = {unit_id: unit_index for unit_index, unit_id in enumerate(unit_ids)}
+
+    @classmethod
+    def from_spike_frames(
+        cls, unit_ids: numpy.ndarray, spike_frames_per_unit: list[numpy.ndarray]
+    ) -> "_PackedSpikeTrains":
+        offsets = numpy.zeros(shape=len(spike_frames_per_unit) + 1, dtype="int64")
+        numpy.cumsum([frames.size for frames in spike_frames_per_unit], out=offsets[1:])
+        frames = numpy.concatenate(spike_frames_per_unit) if len(spike_frames_per_unit) > 0 else numpy.empty(0, "int64")
+
+        return cls(unit_ids=unit_ids, frames=frames, offsets=offsets)
+
+    def __getitem__(self, unit_id: str) -> numpy.ndarray:
+        unit_index = self._unit_id_to_index[unit_id]
+        return self.frames[self.offsets[unit_index] : self.offsets[unit_index + 1]]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.unit_ids)
+
+    def __len__(self) -> int:
+        return len(self.unit_ids)
+
+
+class _LazySpikeTrains(collections.abc.Mapping):
+    """
+    Read-only mapping from unit ID to spike frames, which reads each spike train only when requested.
+
+    MATLAB v7.3 files are HDF5 files, from which a single cell of the 'spike_train' cell array can be read directly,
+    through a single handle kept open until a unit from another file is requested. Older formats can only be read one
+    variable at a time, so the spike trains of the most recently requested file are kept until then instead; units are
+    usually requested in order, one probe at a time.
+    """
+
+    def __init__(self, unit_locations: dict[str, tuple[pathlib.Path, int]], sampling_frequency: float):
+        self._unit_locations = unit_locations
+        self._sampling_frequency = sampling_frequency
+        self._cached_file_path: pathlib.Path | None = None
+        self._cached_file: h5py.File | None = None
+        self._cached_spike_trains: list | None = None
+
+    def __getitem__(self, unit_id: str) -> numpy.ndarray:
+        file_path, unit_index = self._unit_locations[unit_id]
+
+        if file_path != self._cached_file_path:
+            # Release the previous file's handle or spike trains before reading the next
+            self._release_file()
+            if h5py.is_hdf5(file_path):
+                self._cached_file = h5py.File(name=file_path, mode="r")
+            else:
+                self._cached_spike_trains = pymatreader.read_mat(filename=file_path, variable_names=["spike_train"])[
+                    "spike_train"
+                ]
+            self._cached_file_path = file_path
+
+        if self._cached_file is not None:
+            references = self._cached_file["spike_train"]
+            dataset = self._cached_file[references[numpy.unravel_index(indices=unit_index, shape=references.shape)]]
+            # An empty cell is stored as the dimensions of the empty array instead (such as [0, 0])
+            if dataset.attrs.get("MATLAB_empty", 0):
+                return numpy.empty(shape=0, dtype="int64")
+            return _convert_spike_times_to_frames(
+                spike_times=numpy.squeeze(dataset[()]), sampling_frequency=self._sampling_frequency
+            )
+
+        return _convert_spike_times_to_frames(
+            spike_times=self._cached_spike_trains[unit_index], sampling_frequency=self._sampling_frequency
+        )
+
+    def __del__(self) -> None:
+        self._release_file()
+
+    def _release_file(self) -> None:
+        if self._cached_file is not None:
+            self._cached_file.close()
+        self._cached_file = None
+        self._cached_spike_trains = None
+        self._cached_file_path = None
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._unit_locations)
+
+    def __len__(self) -> int:
+        return len(self._unit_locations)
+
+
+def _convert_spike_times_to_frames(spike_times: numpy.ndarray | float, sampling_frequency: float) -> numpy.ndarray:
+    """Convert spike times (in seconds) to sorted frames, truncating any fraction of a frame."""
+    spike_frames = (numpy.atleast_1d(numpy.asarray(spike_times, dtype="float64")) * sampling_frequency).astype("int64")
+    spike_frames.sort(kind="stable")
+    return spike_frames
@@ -1,4 +1,6 @@
-import neuroconv
+import pathlib
+
+import neuroconv.datainterfaces
 import pydantic
 from ._spike_sorting_extractor import VanDerMeerSortingExtractor
 
@@ -8,21 +10,53 @@ class SpikeSortedInterface(
 ):
     """Interface for handling spike sorted in the Manish 2025 OdorSequence dataset."""
 
+    units_description = "Units identified by spike sorting of the electrophysiology data."
+    unit_properties = (
+        {
+            "name": "relative_depth",
+            "description": "The depth (in microns) of the unit relative to the insertion point.",
+        },
+        {"name": "shank_id", "description": "The shank the unit was detected on."},
+        {"name": "channel_id", "description": "The identifier of the closest channel to the unit."},
+    )
+
     @pydantic.validate_call
-    def __init__(self, preprocessed_data_directory: pydantic.DirectoryPath) -> None:
-        super().__init__(preprocessed_data_directory=preprocessed_data_directory)
+    def __init__(
+        self,
+        preprocessed_data_directory: pydantic.DirectoryPath,
+        lazy: bool = False,
+        number_of_jobs: pydantic.PositiveInt | None = None,
+        file_paths: list[pydantic.FilePath] | None = None,
+        cache_directory: pathlib.Path | None = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        preprocessed_data_directory : directory path
+            The directory containing the `clean_units_imec*.mat` files.
+        lazy : bool, default: False
+            Whether to read the spike train of each unit only when it is written, and to store the mean waveforms in
+            single precision, bounding the memory used by sessions with many units.
+        number_of_jobs : int, optional
+            The number of probes to read concurrently. Defaults to all probes at once, or one at a time when `lazy`.
+        file_paths : list of file paths, optional
+            The `clean_units_imec*.mat` files, if already known; by default, they are found in the directory.
+        cache_directory : directory path, optional
+            A directory in which to keep a memory-mapped copy of the units, so that later conversions of the same
+            (unchanged) files do not parse them again.
+        """
+        super().__init__(
+            preprocessed_data_directory=preprocessed_data_directory,
+            lazy=lazy,
+            number_of_jobs=number_of_jobs,
+            file_paths=file_paths,
+            cache_directory=cache_directory,
+        )
 
     def get_metadata(self) -> dict:
         metadata = super().get_metadata()
 
-        metadata["Ecephys"]["UnitProperties"] = [
-            {
-                "name": "relative_depth",
-                "description": "The depth (in microns) of the unit relative to the insertion point.",
-            },
-            {"name": "shank_id", "description": "The shank the unit was detected on."},
-            {"name": "channel_id", "description": "The identifier of the closest channel to the unit."},
-        ]
+        metadata["Ecephys"]["UnitProperties"] = [dict(unit_property) for unit_property in self.unit_properties]
 
         return metadata
 
@@ -31,6 +65,4 @@ class SpikeSortedInterface(
         return VanDerMeerSortingExtractor
 
     def add_to_nwbfile(self, *args, **kwargs) -> None:
-        super().add_to_nwbfile(
-            *args, **kwargs, units_description="Units identified by spike sorting of the electrophysiology data."
-        )
+        super().add_to_nwbfile(*args, **kwargs, units_description=self.units_description)
@@ -1,7 +1,94 @@
+import importlib
+import typing
+
 from ._experiment_keys import read_experiment_keys_file
-from ._enhance_metadata import enhance_metadata
+from ._conversion_ledger import ConversionLedger
+from ._memory import (
+    get_automatic_memory_limit_gb,
+    get_available_memory,
+    get_buffer_gb_limit,
+    get_memory_usage,
+    get_peak_memory_usage,
+    reset_peak_memory_usage,
+)
+from ._instrumentation import ProfileMode, SessionInstrumentation, StageMeasurement, summarize_stage_measurements
+from ._file_fingerprints import get_file_fingerprint, hash_file, hash_file_sample, is_file_unchanged
+from ._mat_headers import MatVariableHeader, read_mat_variable_headers
+from ._nwbfile_paths import get_partial_nwbfile_path
+from ._output_cache import DEFAULT_OUTPUT_CACHE_SIZE_GB, OutputCache, get_output_cache_key
+from ._records import get_home_directory, get_records_directory
+from ._source_index import SourceIndex
+from ._timestamps import read_timestamps_file
+from ._write_profiles import (
+    WRITE_PROFILES,
+    Backend,
+    DatasetCategory,
+    WriteProfile,
+    apply_write_profiles,
+    get_dataset_category,
+    get_iterator_options,
+    get_write_profile,
+)
+
+if typing.TYPE_CHECKING:
+    from ._concurrent_writes import ConcurrentNWBHDF5IO
+    from ._enhance_metadata import enhance_metadata
+
+# These import NeuroConv, PyNWB, and HDMF (which take seconds to import), so are only imported once first used
+_LAZY_IMPORTS = {
+    "ConcurrentNWBHDF5IO": "._concurrent_writes",
+    "enhance_metadata": "._enhance_metadata",
+}
 
 __all__ = [
+    "Backend",
+    "ConcurrentNWBHDF5IO",
+    "ConversionLedger",
+    "DEFAULT_OUTPUT_CACHE_SIZE_GB",
+    "DatasetCategory",
+    "MatVariableHeader",
+    "OutputCache",
+    "ProfileMode",
+    "SessionInstrumentation",
+    "SourceIndex",
+    "StageMeasurement",
+    "WRITE_PROFILES",
+    "WriteProfile",
+    "apply_write_profiles",
     "enhance_metadata",
+    "get_automatic_memory_limit_gb",
+    "get_available_memory",
+    "get_buffer_gb_limit",
+    "get_dataset_category",
+    "get_file_fingerprint",
+    "get_home_directory",
+    "get_iterator_options",
+    "get_memory_usage",
+    "get_output_cache_key",
+    "get_partial_nwbfile_path",
+    "get_peak_memory_usage",
+    "get_records_directory",
+    "get_write_profile",
+    "hash_file",
+    "hash_file_sample",
+    "is_file_unchanged",
     "read_experiment_keys_file",
+    "read_mat_variable_headers",
+    "read_timestamps_file",
+    "reset_peak_memory_usage",
+    "summarize_stage_measurements",
 ]
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _LAZY_IMPORTS:
+        message = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(message)
+
+    value = getattr(importlib.import_module(name=_LAZY_IMPORTS[name], package=__name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
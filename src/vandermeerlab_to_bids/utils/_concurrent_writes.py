@@ -0,0 +1,222 @@
+"""Writing of NWB files whose data chunk iterators are read and compressed concurrently, and written by one thread."""
+
+import collections
+import concurrent.futures
+import itertools
+import math
+import typing
+import zlib
+
+import h5py
+import numpy
+import pynwb
+from hdmf.backends.hdf5.h5_utils import HDF5IODataChunkIteratorQueue
+from hdmf.data_utils import AbstractDataChunkIterator, DataChunk
+
+# The HDF5 identifiers of the filters which can be applied here, rather than by the HDF5 library when writing
+_SUPPORTED_FILTER_IDS = frozenset((h5py.h5z.FILTER_SHUFFLE, h5py.h5z.FILTER_DEFLATE))
+
+
+class ConcurrentNWBHDF5IO(pynwb.NWBHDF5IO):
+    """
+    An NWB HDF5 IO which reads and compresses all its data chunk iterators (such as those of the SpikeGLX streams)
+    concurrently, instead of one after the other.
+
+    Each iterator is read in its own thread while the chunks of the data already read are compressed by a pool of
+    `number_of_compression_workers` threads; a single thread writes the compressed chunks to the file. Only datasets
+    compressed with gzip (with or without shuffling) are compressed this way; the chunks of any other dataset are
+    written, and compressed, by the HDF5 library as usual.
+
+    The iterators are only exhausted concurrently when they are queued, so the file must be written with
+    `io.write(nwbfile, exhaust_dci=False)`.
+    """
+
+    def __init__(self, *args, number_of_compression_workers: int = 1, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # HDF5IO exhausts the data chunk iterators left in this private queue once all other objects are written
+        self._HDF5IO__dci_queue = _ConcurrentDataChunkIteratorQueue(
+            number_of_compression_workers=number_of_compression_workers
+        )
+
+
+class _ConcurrentDataChunkIteratorQueue(HDF5IODataChunkIteratorQueue):
+    """A queue of data chunk iterators whose buffers are read, compressed, and written in a pipeline."""
+
+    def __init__(self, number_of_compression_workers: int = 1):
+        super().__init__()
+        self.number_of_compression_workers = number_of_compression_workers
+
+    def exhaust_queue(self) -> None:
+        """Read from every queued iterator concurrently, writing each compressed chunk as soon as it is ready."""
+        if len(self) == 0:
+            return
+
+        streams = list(self)
+        self.clear()
+        chunk_encoders = {id(dataset): _get_chunk_encoder(dataset=dataset) for dataset, _ in streams}
+
+        with (
+            concurrent.futures.ThreadPoolExecutor(max_workers=len(streams)) as reader_executor,
+            concurrent.futures.ThreadPoolExecutor(max_workers=self.number_of_compression_workers) as encoder_executor,
+        ):
+            future_to_stream = {
+                reader_executor.submit(_read_next_data_chunk, iterator): (dataset, iterator)
+                for dataset, iterator in streams
+            }
+            # The writes are kept in the order of submission, which is also the order of the data in each stream
+            pending_writes: collections.deque = collections.deque()
+            number_of_pending_buffers = 0
+
+            while any(future_to_stream):
+                done, _ = concurrent.futures.wait(
+                    fs=future_to_stream, timeout=None, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    dataset, iterator = future_to_stream.pop(future)
+                    data_chunk = future.result()
+                    if data_chunk is None:
+                        continue
+
+                    dataset.id.extend(data_chunk.get_min_bounds())
+                    pending_writes.extend(
+                        _submit_data_chunk(
+                            dataset=dataset,
+                            data_chunk=data_chunk,
+                            chunk_encoder=chunk_encoders[id(dataset)],
+                            executor=encoder_executor,
+                        )
+                    )
+                    number_of_pending_buffers += 1
+
+                    # Hold at most about one buffer per stream awaiting compression, on top of those being read
+                    while len(pending_writes) > 0 and (
+                        pending_writes[0][2].done() or number_of_pending_buffers > len(streams)
+                    ):
+                        number_of_pending_buffers -= _write_pending(pending_write=pending_writes.popleft())
+
+                    future_to_stream[reader_executor.submit(_read_next_data_chunk, iterator)] = (dataset, iterator)
+
+            while len(pending_writes) > 0:
+                _write_pending(pending_write=pending_writes.popleft())
+
+
+def _read_next_data_chunk(iterator: AbstractDataChunkIterator) -> DataChunk | None:
+    return next(iterator, None)
+
+
+def _get_chunk_encoder(dataset: h5py.Dataset) -> typing.Callable[[numpy.ndarray], bytes] | None:
+    """Get a function which applies the filters of the dataset to a chunk, or None if they cannot be applied here."""
+    if dataset.chunks is None or dataset.dtype.kind not in "iufb":
+        return None
+
+    creation_property_list = dataset.id.get_create_plist()
+    filter_ids = [creation_property_list.get_filter(index)[0] for index in range(creation_property_list.get_nfilters())]
+    if not set(filter_ids) <= _SUPPORTED_FILTER_IDS:
+        return None
+
+    dtype = dataset.dtype
+    item_size = dtype.itemsize
+    shuffle = h5py.h5z.FILTER_SHUFFLE in filter_ids
+    compression_level = dataset.compression_opts if h5py.h5z.FILTER_DEFLATE in filter_ids else None
+
+    # The filters are applied in the order in which they were set, and h5py always sets shuffling before compression
+    def encode_chunk(chunk: numpy.ndarray) -> bytes:
+        encoded_chunk = numpy.ascontiguousarray(chunk, dtype=dtype)
+        if shuffle and item_size > 1:
+            encoded_chunk = encoded_chunk.view("uint8").reshape(-1, item_size).T.copy()
+        encoded_chunk = encoded_chunk.tobytes()
+        if compression_level is not None:
+            encoded_chunk = zlib.compress(encoded_chunk, compression_level)
+        return encoded_chunk
+
+    return encode_chunk
+
+
+def _submit_data_chunk(
+    *,
+    dataset: h5py.Dataset,
+    data_chunk: DataChunk,
+    chunk_encoder: typing.Callable[[numpy.ndarray], bytes] | None,
+    executor: concurrent.futures.Executor,
+) -> list[tuple[h5py.Dataset, typing.Any, concurrent.futures.Future, bool]]:
+    """
+    Split the buffer of a data chunk into the chunks of the dataset, and submit each for compression.
+
+    Each pending write holds the dataset, where to write (the offset of a chunk, or the selection of the buffer),
+    the future result, and whether it is the last write of the buffer.
+    """
+    selection = _get_selection_bounds(data_chunk=data_chunk, dataset=dataset)
+    chunk_shape = dataset.chunks
+    if chunk_encoder is None or selection is None or not _is_aligned(selection, chunk_shape, dataset.shape):
+        future = concurrent.futures.Future()
+        future.set_result(data_chunk.data)
+        return [(dataset, data_chunk.selection, future, True)]
+
+    data = numpy.asarray(data_chunk.data)
+    starts = [start for start, _ in selection]
+    chunk_offsets = list(
+        itertools.product(
+            *(range(start, stop, chunk_length) for (start, stop), chunk_length in zip(selection, chunk_shape))
+        )
+    )
+
+    pending_writes = []
+    for index, chunk_offset in enumerate(chunk_offsets):
+        chunk = data[
+            tuple(
+                slice(offset - start, offset - start + chunk_length)
+                for offset, start, chunk_length in zip(chunk_offset, starts, chunk_shape)
+            )
+        ]
+        future = executor.submit(_encode_full_chunk, chunk, chunk_shape, chunk_encoder)
+        pending_writes.append((dataset, chunk_offset, future, index == len(chunk_offsets) - 1))
+    return pending_writes
+
+
+def _encode_full_chunk(
+    chunk: numpy.ndarray, chunk_shape: tuple[int, ...], chunk_encoder: typing.Callable[[numpy.ndarray], bytes]
+) -> bytes:
+    # HDF5 stores the chunks at the edges of a dataset at full size, filled past the end of the data
+    if chunk.shape != chunk_shape:
+        chunk = numpy.pad(chunk, pad_width=[(0, full - partial) for partial, full in zip(chunk.shape, chunk_shape)])
+    return chunk_encoder(chunk)
+
+
+def _write_pending(pending_write: tuple[h5py.Dataset, typing.Any, concurrent.futures.Future, bool]) -> bool:
+    """Write a chunk, or a whole buffer, once ready; returns whether it was the last write of its buffer."""
+    dataset, location, future, is_last_of_buffer = pending_write
+    result = future.result()
+    if isinstance(result, bytes):
+        dataset.id.write_direct_chunk(offsets=location, data=result, filter_mask=0)
+    else:
+        dataset[location] = result
+    return is_last_of_buffer
+
+
+def _get_selection_bounds(data_chunk: DataChunk, dataset: h5py.Dataset) -> list[tuple[int, int]] | None:
+    """The start and stop of the selection along each axis, or None if it is not a plain block of the dataset."""
+    selection = data_chunk.selection
+    if not isinstance(selection, tuple) or len(selection) != dataset.ndim:
+        return None
+    if not all(isinstance(axis_selection, slice) and axis_selection.step in (None, 1) for axis_selection in selection):
+        return None
+
+    bounds = [
+        (axis_selection.start or 0, axis_length if axis_selection.stop is None else axis_selection.stop)
+        for axis_selection, axis_length in zip(selection, dataset.shape)
+    ]
+    if tuple(stop - start for start, stop in bounds) != numpy.shape(data_chunk.data):
+        return None
+    return bounds
+
+
+def _is_aligned(selection: list[tuple[int, int]], chunk_shape: tuple[int, ...], shape: tuple[int, ...]) -> bool:
+    """Whether a block starts on a chunk boundary and ends on one, or at the end of the dataset, along every axis."""
+    return (
+        all(
+            start % chunk_length == 0 and (stop % chunk_length == 0 or stop == axis_length)
+            for (start, stop), chunk_length, axis_length in zip(selection, chunk_shape, shape)
+        )
+        and math.prod(shape) > 0
+    )
@@ -0,0 +1,136 @@
+"""Ledger of completed session conversions, allowing interrupted batches to resume where they left off."""
+
+import datetime
+import hashlib
+import json
+import pathlib
+
+from ._file_fingerprints import get_file_fingerprint, is_file_unchanged
+from ._records import get_records_directory
+
+
+class ConversionLedger:
+    """
+    Ledger of completed session conversions.
+
+    Each entry records the fingerprints of the source files an NWB file was written from, so that a rerun can tell
+    apart sessions that are truly complete from those interrupted mid-write or whose inputs have since changed.
+
+    Entries are stored as one small JSON file per output file under the records directory, so that concurrent
+    worker processes never write to the same file.
+    """
+
+    def __init__(self) -> None:
+        self.ledger_directory = get_records_directory() / "conversion_ledger"
+        self.ledger_directory.mkdir(exist_ok=True)
+
+    def is_complete(self, *, nwbfile_path: pathlib.Path, input_file_paths: list[pathlib.Path]) -> bool:
+        """Determine if the NWB file was fully written from source files which have not changed since."""
+        if not nwbfile_path.exists():
+            return False
+
+        changed_input_file_paths = self.get_changed_input_file_paths(
+            nwbfile_path=nwbfile_path, input_file_paths=input_file_paths
+        )
+        return changed_input_file_paths is not None and not any(changed_input_file_paths)
+
+    def get_changed_input_file_paths(
+        self, *, nwbfile_path: pathlib.Path, input_file_paths: list[pathlib.Path]
+    ) -> list[pathlib.Path] | None:
+        """
+        Get the source files added, changed, or removed since the NWB file was recorded as written from them, or None
+        if it never was.
+        """
+        entry_file_path = self._get_entry_file_path(nwbfile_path=nwbfile_path)
+        if not entry_file_path.exists():
+            return None
+
+        entry = json.loads(entry_file_path.read_text())
+        fingerprints = entry["input_fingerprints"]
+        changed_input_file_paths = [
+            file_path
+            for file_path in input_file_paths
+            if str(file_path.absolute()) not in fingerprints
+            or not is_file_unchanged(file_path=file_path, fingerprint=fingerprints[str(file_path.absolute())])
+        ]
+        input_file_names = {str(file_path.absolute()) for file_path in input_file_paths}
+        removed_input_file_paths = [
+            pathlib.Path(file_path) for file_path in fingerprints if file_path not in input_file_names
+        ]
+        return changed_input_file_paths + removed_input_file_paths
+
+    def record_completion(
+        self, *, nwbfile_path: pathlib.Path, input_file_paths: list[pathlib.Path], seconds: float | None = None
+    ) -> None:
+        """
+        Record that the NWB file was fully written from the current state of the source files.
+
+        The `seconds` the conversion took, if given, are kept alongside the size of its source data to estimate how
+        long later conversions will take (see `get_throughput`).
+
+        Raw SpikeGLX binaries, and NWB files read as inputs (such as the stream files linked to by a session file),
+        are identified by size and modification time only, since hashing them would take about as long as the
+        conversion itself.
+
+        The source files are recorded by their absolute paths, so that however the data directory is given (such as
+        relative to another working directory), the same files match.
+        """
+        input_fingerprints = {
+            str(file_path.absolute()): get_file_fingerprint(
+                file_path=file_path, hash_content=file_path.suffix not in (".bin", ".nwb")
+            )
+            for file_path in input_file_paths
+        }
+        entry = {
+            "nwbfile_path": str(nwbfile_path.absolute()),
+            "completed": datetime.datetime.now().isoformat(),
+            "seconds": seconds,
+            # NWB files read as inputs were converted already, so are not counted as source data
+            "input_bytes": sum(
+                fingerprint["size"]
+                for file_path, fingerprint in input_fingerprints.items()
+                if not file_path.endswith(".nwb")
+            ),
+            "input_fingerprints": input_fingerprints,
+        }
+
+        entry_file_path = self._get_entry_file_path(nwbfile_path=nwbfile_path)
+        temporary_entry_file_path = entry_file_path.with_suffix(".partial")
+        temporary_entry_file_path.write_text(json.dumps(entry, indent=2))
+        temporary_entry_file_path.replace(entry_file_path)
+
+    def remove_entry(self, *, nwbfile_path: pathlib.Path) -> None:
+        """Forget that the NWB file was written, such as before modifying it in place, so that it is rewritten next."""
+        self._get_entry_file_path(nwbfile_path=nwbfile_path).unlink(missing_ok=True)
+
+    def get_input_file_paths(self, *, nwbfile_path: pathlib.Path) -> list[pathlib.Path]:
+        """Get the source files the NWB file was last recorded as written from, or an empty list if it never was."""
+        entry_file_path = self._get_entry_file_path(nwbfile_path=nwbfile_path)
+        if not entry_file_path.exists():
+            return []
+
+        entry = json.loads(entry_file_path.read_text())
+        return [pathlib.Path(file_path) for file_path in entry["input_fingerprints"]]
+
+    def get_throughput(self, *, nwb_directory: pathlib.Path) -> float | None:
+        """
+        Get the throughput of the timed conversions recorded for NWB files under a directory, in bytes of source data
+        per second, or None if there are none.
+        """
+        nwb_directory = nwb_directory.absolute()
+        input_bytes, seconds = 0, 0.0
+        for entry_file_path in self.ledger_directory.glob(pattern="*.json"):
+            entry = json.loads(entry_file_path.read_text())
+            if entry.get("seconds") is None or not pathlib.Path(entry["nwbfile_path"]).is_relative_to(nwb_directory):
+                continue
+
+            input_bytes += entry["input_bytes"]
+            seconds += entry["seconds"]
+
+        if seconds == 0:
+            return None
+        return input_bytes / seconds
+
+    def _get_entry_file_path(self, nwbfile_path: pathlib.Path) -> pathlib.Path:
+        entry_key = hashlib.sha1(str(nwbfile_path.absolute()).encode()).hexdigest()
+        return self.ledger_directory / f"{entry_key}.json"
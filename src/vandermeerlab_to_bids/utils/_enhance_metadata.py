@@ -85,8 +85,9 @@ def enhance_metadata(
         location = f"{experiment_keys[f"probe{index}_hemisphere"].lower()} {experiment_keys[f"probe{index}_location"]}"
         probe_to_location[probe] = location
 
-    for group in metadata["Ecephys"]["ElectrodeGroup"]:
-        probe = group["device"][-5:].lower()
+    # NeuroConv keys the electrode groups by name, such as 'NeuropixelsImec0'
+    for group_name, group in metadata["Ecephys"].get("ElectrodeGroups", dict()).items():
+        probe = group_name[-5:].lower()
         group["location"] = probe_to_location[probe]
 
     if spikeglx_converter is not None:
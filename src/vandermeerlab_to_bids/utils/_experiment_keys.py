@@ -1,9 +1,37 @@
 """Reader for the custom 'ExpKey' structured text metadata file used by the van der Meer Lab."""
 
+import copy
+import functools
 import pathlib
 import pydantic
 import re
 import json
+import typing
+
+# A single scan splits the content into tokens, skipping whitespace and comments along the way
+# The most frequent tokens come first, and possessive quantifiers avoid backtracking within a token
+# Any character which does not start a valid token is kept as its own token so the parser can report it
+_TOKEN_PATTERN = re.compile(
+    pattern=r"""
+    [ \t\r]*+(?:%[^\n]*+)?+
+    (
+    [\n=;,{}\[\]]
+    | '[^'\n]*+(?:''[^'\n]*+)*+'
+    | ExpKeys\.[\w.]++
+    | "[^"\n]*+(?:""[^"\n]*+)*+"
+    | [+-]?[ \t]*+(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?
+    | -?[A-Za-z_]\w*+
+    | .
+    | $
+    )
+    """,
+    flags=re.VERBOSE,
+)
+_NUMBER_PATTERN = re.compile(pattern=r"[+-]?[ \t]*(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_INTEGER_PATTERN = re.compile(pattern=r"[+-]?\d+")
+_NAMED_VALUES = {"true": True, "false": False, "NaN": float("nan"), "Inf": float("inf"), "-Inf": float("-inf")}
+_BRACKET_PAIRS = {"{": "}", "[": "]"}
+_STATEMENT_SEPARATORS = ("\n", ";")
 
 
 @pydantic.validate_call
@@ -11,10 +39,10 @@ def read_experiment_keys_file(file_path: str | pathlib.Path) -> dict[str, str]:
     """
     Reads the experiment keys (.m) file and returns a dictionary of keys and values.
 
-    Works by coercing the structured text into a JSON string, which is then converted into dictionary using
-    built-in JSON parsing.
+    The file is tokenized and parsed in a single pass. Results are cached on the path, modification time, and size
+    of the file, so the several readers of the same file during a conversion only parse it once.
 
-    Improved from https://github.com/vandermeerlab/mvdmlab_npx_to_nwb/blob/15c85df2803293f8de331caf34980d9f239727bc/src/manimoh_utils/parse_expkeys.py#L4
+    Improved from https://github.com/vandermeerlab/mvdmlab_npx_to_nwb/blob/15c85df/src/manimoh_utils/parse_expkeys.py#L4
 
     Parameters
     ----------
@@ -26,8 +54,133 @@ def read_experiment_keys_file(file_path: str | pathlib.Path) -> dict[str, str]:
     dict[str, str]
         The metadata dictionary.
     """
+    file_path = pathlib.Path(file_path).absolute()
+    stat = file_path.stat()
+
+    experiment_keys = _read_experiment_keys_file_cached(
+        file_path=file_path, modification_time=stat.st_mtime_ns, size=stat.st_size
+    )
+
+    # Callers are free to modify the dictionary they receive, so never hand out the cached one
+    return copy.deepcopy(experiment_keys)
+
+
+@functools.lru_cache(maxsize=256)
+def _read_experiment_keys_file_cached(file_path: pathlib.Path, modification_time: int, size: int) -> dict[str, str]:
+    """The modification time and size are not used directly, but invalidate the cache entry when the file changes."""
     content = file_path.read_text()
+    return parse_experiment_keys(content=content, source=file_path.name)
+
+
+def parse_experiment_keys(content: str, source: str = "<string>") -> dict[str, typing.Any]:
+    """
+    Parse the content of an experiment keys file.
+
+    Each statement assigns a value to a key, as in `ExpKeys.<key> = <value>;`, where the value is a quoted string,
+    a number (a leading '+' is allowed), `true`/`false`/`NaN`/`Inf`, or a `{}` cell array or `[]` array of values.
+    Text following a '%' outside of a string is a comment.
+
+    Parameters
+    ----------
+    content : str
+        The text of the experiment keys file.
+    source : str, optional
+        The name of the file, used only in error messages.
+
+    Returns
+    -------
+    dict[str, typing.Any]
+        The metadata dictionary.
+    """
+    tokens = _TOKEN_PATTERN.findall(content)
+
+    experiment_keys = dict()
+    position = 0
+    number_of_tokens = len(tokens)
+    while position < number_of_tokens:
+        token = tokens[position]
+        if token in _STATEMENT_SEPARATORS or token == "":
+            position += 1
+            continue
+        if not token.startswith("ExpKeys."):
+            _raise_unexpected_token(tokens=tokens, position=position, source=source)
+
+        key = token.removeprefix("ExpKeys.")
+        if position + 1 >= number_of_tokens or tokens[position + 1] != "=":
+            line_number = _get_line_number(tokens=tokens, position=position)
+            message = f"Expected '=' after key '{key}' on line {line_number} of experiment keys file `{source}`."
+            raise ValueError(message)
+
+        value, position = _parse_value(tokens=tokens, position=position + 2, source=source)
+        experiment_keys[key] = value
+
+        if position < number_of_tokens and tokens[position] not in _STATEMENT_SEPARATORS and tokens[position] != "":
+            _raise_unexpected_token(tokens=tokens, position=position, source=source)
 
+    return experiment_keys
+
+
+def _parse_value(tokens: list[str], position: int, source: str) -> tuple[typing.Any, int]:
+    """Parse a single value starting at the given token, returning it along with the position of the next token."""
+    token = tokens[position] if position < len(tokens) else ""
+    if token == "":
+        message = f"Unexpected end of experiment keys file `{source}` while reading a value."
+        raise ValueError(message)
+
+    first_character = token[0]
+    if first_character in "'\"":
+        return token[1:-1].replace(first_character * 2, first_character), position + 1
+    if token in _NAMED_VALUES:
+        return _NAMED_VALUES[token], position + 1
+    if _NUMBER_PATTERN.fullmatch(token):
+        number_text = token.replace(" ", "").replace("\t", "")
+        value = int(number_text) if _INTEGER_PATTERN.fullmatch(number_text) else float(number_text)
+        return value, position + 1
+    if token in _BRACKET_PAIRS:
+        return _parse_array(tokens=tokens, position=position, source=source)
+
+    _raise_unexpected_token(tokens=tokens, position=position, source=source)
+
+
+def _parse_array(tokens: list[str], position: int, source: str) -> tuple[list[typing.Any], int]:
+    """Parse a cell array or array, whose elements may be separated by commas, spaces, or line breaks."""
+    opening_position = position
+    closing_bracket = _BRACKET_PAIRS[tokens[position]]
+
+    values = []
+    position += 1
+    while position < len(tokens) and tokens[position] != "":
+        token = tokens[position]
+        if token == closing_bracket:
+            return values, position + 1
+        if token in (",", ";", "\n"):
+            position += 1
+            continue
+
+        value, position = _parse_value(tokens=tokens, position=position, source=source)
+        values.append(value)
+
+    line_number = _get_line_number(tokens=tokens, position=opening_position)
+    message = f"Unclosed '{tokens[opening_position]}' from line {line_number} of experiment keys file `{source}`."
+    raise ValueError(message)
+
+
+def _get_line_number(tokens: list[str], position: int) -> int:
+    """Line numbers are only needed for error messages, so they are recovered from the tokens on demand."""
+    return tokens[:position].count("\n") + 1
+
+
+def _raise_unexpected_token(tokens: list[str], position: int, source: str) -> typing.NoReturn:
+    line_number = _get_line_number(tokens=tokens, position=position)
+    message = f"Unexpected '{tokens[position].strip()}' on line {line_number} of experiment keys file `{source}`."
+    raise ValueError(message)
+
+
+def _parse_experiment_keys_with_regex(content: str) -> dict[str, str]:
+    """
+    The original reader, which coerces the structured text into a JSON string through a sequence of regular
+    expression substitutions. Kept only as a reference for benchmarks.
+    """
     # Remove comments
     comment_stripped_content = re.sub(
         pattern=r'("([^"\\]|\\.)*")|(%.*$)', repl=_comment_replacer, string=content, flags=re.MULTILINE
@@ -59,7 +212,8 @@ def read_experiment_keys_file(file_path: str | pathlib.Path) -> dict[str, str]:
     )
 
     # Wrap all in JSON object (dictionary)
-    json_content = f"{{{quote_fixed_content.replace("\n", ", ").replace("{", "[").replace("}", "]").replace("\'", '\"').replace("^", "'")}}}"
+    json_body = quote_fixed_content.replace("\n", ", ").replace("{", "[").replace("}", "]")
+    json_content = f"{{{json_body.replace("'", '"').replace("^", "'")}}}"
 
     # Delete trailing commas
     json_content_no_trailing = re.sub(pattern=r",\s*}", repl="}", string=json_content)
@@ -0,0 +1,72 @@
+"""Cheap identification of source files, used to detect when the inputs of a conversion have changed."""
+
+import hashlib
+import pathlib
+
+_HASH_BLOCK_SIZE = 2**20  # 1 MiB
+
+
+def get_file_fingerprint(file_path: pathlib.Path, hash_content: bool = True) -> dict[str, int | str | None]:
+    """
+    Summarize a file by its size, modification time, and (optionally) a SHA-256 hash of its content.
+
+    Hashing is skipped for files too large to be read in full on every run, such as raw SpikeGLX binaries.
+    """
+    stat = file_path.stat()
+    fingerprint = {
+        "size": stat.st_size,
+        "modification_time": stat.st_mtime_ns,
+        "sha256": hash_file(file_path=file_path) if hash_content else None,
+    }
+    return fingerprint
+
+
+def is_file_unchanged(file_path: pathlib.Path, fingerprint: dict[str, int | str | None]) -> bool:
+    """
+    Determine if a file still matches a previously recorded fingerprint.
+
+    The content is only hashed when the size matches but the modification time does not (e.g., after a copy or a
+    `datalad get`), so unchanged files are confirmed from a single `stat` call.
+    """
+    if not file_path.exists():
+        return False
+
+    stat = file_path.stat()
+    if stat.st_size != fingerprint["size"]:
+        return False
+    if stat.st_mtime_ns == fingerprint["modification_time"]:
+        return True
+    if fingerprint["sha256"] is None:
+        return False
+
+    return hash_file(file_path=file_path) == fingerprint["sha256"]
+
+
+def hash_file(file_path: pathlib.Path) -> str:
+    """Compute the SHA-256 hash of the content of a file, reading it in blocks."""
+    file_hash = hashlib.sha256()
+    with file_path.open(mode="rb") as file_stream:
+        while block := file_stream.read(_HASH_BLOCK_SIZE):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def hash_file_sample(file_path: pathlib.Path, number_of_blocks: int = 16) -> str:
+    """
+    Compute the SHA-256 hash of the size of a file and of a sample of its content: `number_of_blocks` blocks spread
+    evenly from its start to its end.
+
+    Suits files too large to be read in full on every run, such as raw SpikeGLX binaries, whose content is otherwise
+    identified by the `fileSHA1` and `fileSizeBytes` SpikeGLX records in their .meta files.
+    """
+    size = file_path.stat().st_size
+    file_hash = hashlib.sha256(str(size).encode())
+    last_offset = max(size - _HASH_BLOCK_SIZE, 0)
+    offsets = sorted(
+        {last_offset * block_index // max(number_of_blocks - 1, 1) for block_index in range(number_of_blocks)}
+    )
+    with file_path.open(mode="rb") as file_stream:
+        for offset in offsets:
+            file_stream.seek(offset)
+            file_hash.update(file_stream.read(_HASH_BLOCK_SIZE))
+    return file_hash.hexdigest()
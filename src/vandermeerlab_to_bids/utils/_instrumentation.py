@@ -0,0 +1,218 @@
+"""Instrumentation of the stages of each session conversion: wall time, peak memory, and bytes read and written."""
+
+import contextlib
+import cProfile
+import pathlib
+import time
+import tracemalloc
+import typing
+
+import psutil
+import pydantic
+
+from ._memory import get_peak_memory_usage, reset_peak_memory_usage
+
+ProfileMode = typing.Literal["cprofile", "tracemalloc"]
+
+
+class StageMeasurement(pydantic.BaseModel):
+    """The resources used by one stage of the conversion of a session, or by all of it (the 'session' stage)."""
+
+    session: str
+    stage: str
+    seconds: float
+    peak_memory_bytes: int
+    read_bytes: int | None  # None where the platform does not report the I/O of a process (such as on macOS)
+    written_bytes: int | None
+    completed: bool = True  # False only for the 'session' stage of a conversion which failed
+
+
+class SessionInstrumentation:
+    """
+    Measures each stage of the conversion of a single session, appending each measurement as a line of JSON to a log.
+
+    Only the converting process is measured, not the processes it starts (such as those of a per-stream layout).
+    The peak memory of a stage is the peak resident set size reached during that stage where the platform allows the
+    peak to be reset (Linux), and otherwise the peak reached by the process so far. The bytes read and written count
+    all I/O of the process, including that served from (or left in) the page cache, where the platform reports it.
+
+    With a `profile`, the whole session is also profiled, and the cProfile statistics ('<session>.prof') or the
+    tracemalloc snapshot ('<session>.tracemalloc') dumped to the `profile_directory` once finished.
+
+    Used as a context manager, the session is finished on leaving the context, whether or not its conversion failed.
+    """
+
+    def __init__(
+        self,
+        *,
+        session: str,
+        log_file_path: pathlib.Path | None = None,
+        profile: ProfileMode | None = None,
+        profile_directory: pathlib.Path | None = None,
+    ):
+        if profile is not None and profile_directory is None:
+            message = "A `profile_directory` must be given to profile a session."
+            raise ValueError(message)
+
+        self.session = session
+        self.log_file_path = log_file_path
+        self.profile = profile
+        self.profile_directory = profile_directory
+        self.measurements: list[StageMeasurement] = []
+
+        self._profiler = None
+        match profile:
+            case "cprofile":
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            case "tracemalloc":
+                tracemalloc.start()
+
+        reset_peak_memory_usage()
+        self._session_peak_memory_bytes = 0
+        self._start_time = time.perf_counter()
+        self._start_io_bytes = _get_io_bytes()
+
+    @contextlib.contextmanager
+    def measure(self, stage: str) -> typing.Iterator[None]:
+        """Measure the stage run within this context; nothing is recorded if it fails."""
+        # The peak of the session so far would otherwise be lost with the reset
+        self._session_peak_memory_bytes = max(self._session_peak_memory_bytes, get_peak_memory_usage())
+        reset_peak_memory_usage()
+        start_time = time.perf_counter()
+        start_io_bytes = _get_io_bytes()
+
+        yield
+
+        self._record(
+            stage=stage,
+            seconds=time.perf_counter() - start_time,
+            peak_memory_bytes=get_peak_memory_usage(),
+            start_io_bytes=start_io_bytes,
+        )
+
+    def __enter__(self) -> "SessionInstrumentation":
+        return self
+
+    def __exit__(self, exception_type: type[BaseException] | None, *exception_information: typing.Any) -> None:
+        self.finish(completed=exception_type is None)
+
+    def finish(self, completed: bool = True) -> list[StageMeasurement]:
+        """
+        Record the measurement of the whole session, and dump its profile, if any.
+
+        Returns
+        -------
+        list of StageMeasurement
+            The measurement of each stage, followed by that of the whole session.
+        """
+        self._record(
+            stage="session",
+            seconds=time.perf_counter() - self._start_time,
+            peak_memory_bytes=max(self._session_peak_memory_bytes, get_peak_memory_usage()),
+            start_io_bytes=self._start_io_bytes,
+            completed=completed,
+        )
+
+        if self.profile is not None:
+            self.profile_directory.mkdir(parents=True, exist_ok=True)
+        match self.profile:
+            case "cprofile":
+                self._profiler.disable()
+                self._profiler.dump_stats(self.profile_directory / f"{self.session}.prof")
+            case "tracemalloc":
+                tracemalloc.take_snapshot().dump(str(self.profile_directory / f"{self.session}.tracemalloc"))
+                tracemalloc.stop()
+
+        return self.measurements
+
+    def _record(
+        self,
+        *,
+        stage: str,
+        seconds: float,
+        peak_memory_bytes: int,
+        start_io_bytes: tuple[int, int] | None,
+        completed: bool = True,
+    ) -> None:
+        io_bytes = _get_io_bytes()
+        read_bytes, written_bytes = None, None
+        if io_bytes is not None and start_io_bytes is not None:
+            read_bytes, written_bytes = io_bytes[0] - start_io_bytes[0], io_bytes[1] - start_io_bytes[1]
+
+        measurement = StageMeasurement(
+            session=self.session,
+            stage=stage,
+            seconds=seconds,
+            peak_memory_bytes=peak_memory_bytes,
+            read_bytes=read_bytes,
+            written_bytes=written_bytes,
+            completed=completed,
+        )
+        self.measurements.append(measurement)
+
+        # Each line is written in a single call, so the lines of concurrent sessions appended to one log do not mix
+        if self.log_file_path is not None:
+            with self.log_file_path.open(mode="a") as file_stream:
+                file_stream.write(measurement.model_dump_json() + "\n")
+
+
+def summarize_stage_measurements(measurements: list[StageMeasurement]) -> str:
+    """
+    Summarize the measurements of a batch of sessions as a table of the total and largest resources used by each stage.
+
+    The stages are listed in the order first measured, followed by the whole sessions; the share of each stage is
+    that of the total time of all sessions.
+    """
+    measurements_by_stage: dict[str, list[StageMeasurement]] = dict()
+    for measurement in measurements:
+        if measurement.stage != "session":
+            measurements_by_stage.setdefault(measurement.stage, []).append(measurement)
+    session_measurements = [measurement for measurement in measurements if measurement.stage == "session"]
+    measurements_by_stage["session"] = session_measurements
+    total_session_seconds = sum(measurement.seconds for measurement in session_measurements)
+
+    lines = [
+        f"{'stage':<24} {'count':>6} {'total s':>10} {'share':>6} {'max s':>9} {'peak MB':>9} "
+        f"{'read MB':>10} {'written MB':>11}"
+    ]
+    for stage, stage_measurements in measurements_by_stage.items():
+        total_seconds = sum(measurement.seconds for measurement in stage_measurements)
+        share = f"{total_seconds / total_session_seconds:.0%}" if total_session_seconds > 0 else ""
+        lines.append(
+            f"{stage:<24} {len(stage_measurements):>6} {total_seconds:>10.2f} {share:>6} "
+            f"{max((measurement.seconds for measurement in stage_measurements), default=0.0):>9.2f} "
+            f"{max((measurement.peak_memory_bytes for measurement in stage_measurements), default=0) / 1e6:>9.1f} "
+            f"{_sum_megabytes(values=[measurement.read_bytes for measurement in stage_measurements]):>10} "
+            f"{_sum_megabytes(values=[measurement.written_bytes for measurement in stage_measurements]):>11}"
+        )
+
+    failed_sessions = [measurement.session for measurement in session_measurements if not measurement.completed]
+    if any(failed_sessions):
+        lines.append(
+            f"({len(failed_sessions)} session(s) failed, and are only partly measured: "
+            f"{', '.join(failed_sessions)})"
+        )
+
+    return "\n".join(lines)
+
+
+def _sum_megabytes(values: list[int | None]) -> str:
+    known_values = [value for value in values if value is not None]
+    if len(known_values) == 0 and len(values) > 0:
+        return "n/a"
+    return f"{sum(known_values) / 1e6:.1f}"
+
+
+def _get_io_bytes() -> tuple[int, int] | None:
+    """Get the bytes read and written by this process so far, or None where the platform does not report them."""
+    process = psutil.Process()
+    if not hasattr(process, "io_counters"):
+        return None
+
+    io_counters = process.io_counters()
+    # On Linux, the characters read and written also count the I/O served by (or left in) the page cache
+    return (
+        getattr(io_counters, "read_chars", io_counters.read_bytes),
+        getattr(io_counters, "write_chars", io_counters.write_bytes),
+    )
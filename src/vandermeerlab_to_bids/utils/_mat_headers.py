@@ -0,0 +1,292 @@
+"""Reader for the shapes and types of the variables in MATLAB (.mat) files, which never reads the data itself."""
+
+import math
+import os
+import pathlib
+import struct
+import typing
+import zlib
+
+import h5py
+import numpy
+import pydantic
+
+# The codes of the data types and classes of MATLAB v5 files which are needed to walk their structure
+_MI_MATRIX = 14
+_MI_COMPRESSED = 15
+_V5_HEADER_SIZE = 128
+_V5_CLASSES = {
+    1: "cell",
+    2: "struct",
+    3: "object",
+    4: "char",
+    5: "sparse",
+    6: "double",
+    7: "single",
+    8: "int8",
+    9: "uint8",
+    10: "int16",
+    11: "uint16",
+    12: "int32",
+    13: "uint32",
+    14: "int64",
+    15: "uint64",
+}
+_NUMPY_DTYPES = {
+    "double": "float64",
+    "single": "float32",
+    "int8": "int8",
+    "uint8": "uint8",
+    "int16": "int16",
+    "uint16": "uint16",
+    "int32": "int32",
+    "uint32": "uint32",
+    "int64": "int64",
+    "uint64": "uint64",
+    "logical": "bool",
+}
+
+# Compressed variables are decompressed (and discarded) a block at a time when their structure must be walked
+_COMPRESSED_BLOCK_SIZE = 2**16
+_MAXIMUM_DECOMPRESSED_BLOCK_SIZE = 2**22
+
+
+class MatVariableHeader(typing.NamedTuple):
+    """The shape and type of a single variable in a MATLAB file."""
+
+    shape: tuple[int, ...]  # In MATLAB order, such as (channels, frames) for the mean waveforms of a unit
+    matlab_class: str  # Such as 'double', 'char', or 'cell'
+    dtype: str | None  # The NumPy dtype of the values of a numeric or logical array, otherwise None
+    cell_shapes: list[tuple[int, ...]] | None  # The shape of each cell (in column-major order), if requested
+
+    @property
+    def length(self) -> int:
+        """The number of strings held by a character array (one per row), or of elements (or cells) of any other."""
+        if self.matlab_class == "char":
+            return self.shape[0] if len(self.shape) > 0 else 0
+        return math.prod(self.shape)
+
+
+@pydantic.validate_call
+def read_mat_variable_headers(
+    file_path: pydantic.FilePath, cell_variable_names: tuple[str, ...] = ()
+) -> dict[str, MatVariableHeader]:
+    """
+    Read the shape and type of every variable in a MATLAB v5, v7, or v7.3 file, without reading their values.
+
+    For MATLAB v7.3 (HDF5) files, only the metadata of the datasets is read. For older files, only the headers of each
+    variable are read, skipping over (or, for compressed variables, decompressing only the start of) their data.
+
+    Parameters
+    ----------
+    file_path : file path
+        The path to the .mat file.
+    cell_variable_names : tuple of str, optional
+        The names of the cell arrays of which to also read the shape of each cell, such as the mean waveforms of each
+        unit. Compressed (v7) cell arrays must then be decompressed in full, though their values are still discarded.
+
+    Returns
+    -------
+    dict[str, MatVariableHeader]
+        The header of each variable, by name, in the order the variables are stored.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a MATLAB v5, v7, or v7.3 file, or is truncated.
+    """
+    if h5py.is_hdf5(file_path):
+        return _read_mat_73_variable_headers(file_path=file_path, cell_variable_names=cell_variable_names)
+
+    try:
+        return _read_mat_5_variable_headers(file_path=file_path, cell_variable_names=cell_variable_names)
+    except (EOFError, struct.error, zlib.error) as exception:
+        message = f"The MATLAB file `{file_path.name}` is malformed or truncated: {exception}"
+        raise ValueError(message) from exception
+
+
+def _read_mat_73_variable_headers(
+    file_path: pathlib.Path, cell_variable_names: tuple[str, ...]
+) -> dict[str, MatVariableHeader]:
+    variable_headers = dict()
+    with h5py.File(name=file_path, mode="r") as file:
+        for name, item in file.items():
+            if name.startswith("#"):  # Such as the '#refs#' group holding the contents of the cell arrays
+                continue
+
+            matlab_class = item.attrs.get("MATLAB_class", b"").decode()
+            if isinstance(item, h5py.Group):  # A scalar struct, whose fields are the members of the group
+                variable_headers[name] = MatVariableHeader(
+                    shape=(1, 1), matlab_class=matlab_class, dtype=None, cell_shapes=None
+                )
+                continue
+
+            shape = _get_mat_73_shape(dataset=item)
+            cell_shapes = None
+            if matlab_class == "cell" and name in cell_variable_names:
+                # Each cell is a reference to a dataset of its own, of which only the shape is read
+                references = item[()] if math.prod(shape) > 0 else []
+                cell_shapes = [
+                    _get_mat_73_shape(dataset=file[reference]) for reference in numpy.ravel(references, order="F")
+                ]
+            variable_headers[name] = MatVariableHeader(
+                shape=shape,
+                matlab_class=matlab_class,
+                dtype=_NUMPY_DTYPES.get(matlab_class, None),
+                cell_shapes=cell_shapes,
+            )
+    return variable_headers
+
+
+def _get_mat_73_shape(dataset: h5py.Dataset) -> tuple[int, ...]:
+    """MATLAB stores arrays in column-major order, so the shape of each dataset is the reverse of that of the array."""
+    if dataset.attrs.get("MATLAB_empty", 0):  # The dataset then holds the dimensions of the empty array instead
+        return tuple(int(dimension) for dimension in dataset[()].ravel())
+    return tuple(reversed(dataset.shape))
+
+
+def _read_mat_5_variable_headers(
+    file_path: pathlib.Path, cell_variable_names: tuple[str, ...]
+) -> dict[str, MatVariableHeader]:
+    variable_headers = dict()
+    with file_path.open(mode="rb") as file_stream:
+        header = file_stream.read(_V5_HEADER_SIZE)
+        byte_order = {b"IM": "<", b"MI": ">"}.get(header[126:128], None)
+        if len(header) < _V5_HEADER_SIZE or byte_order is None:
+            message = f"The file `{file_path.name}` is not a MATLAB v5, v7, or v7.3 file."
+            raise ValueError(message)
+
+        while len(tag := file_stream.read(8)) > 0:
+            data_type, number_of_bytes = struct.unpack(f"{byte_order}II", tag)
+            next_element_position = file_stream.tell() + number_of_bytes + (-number_of_bytes) % 8
+
+            reader = _FileReader(file_stream=file_stream)
+            if data_type == _MI_COMPRESSED:  # Each compressed variable is a single, unpadded, element
+                next_element_position = file_stream.tell() + number_of_bytes
+                reader = _DecompressingReader(file_stream=file_stream, compressed_size=number_of_bytes)
+                data_type, number_of_bytes, _ = _read_tag(reader=reader, byte_order=byte_order)
+
+            if data_type == _MI_MATRIX and number_of_bytes > 0:
+                matlab_class, shape, name, _ = _read_matrix_header(reader=reader, byte_order=byte_order)
+
+                cell_shapes = None
+                if matlab_class == "cell" and name in cell_variable_names:
+                    cell_shapes = []
+                    for _ in range(math.prod(shape)):
+                        _, cell_number_of_bytes, _ = _read_tag(reader=reader, byte_order=byte_order)
+                        if cell_number_of_bytes == 0:  # An empty matrix has no header at all
+                            cell_shapes.append((0, 0))
+                            continue
+                        _, cell_shape, _, number_of_bytes_read = _read_matrix_header(
+                            reader=reader, byte_order=byte_order
+                        )
+                        reader.skip(number_of_bytes=cell_number_of_bytes - number_of_bytes_read)
+                        cell_shapes.append(cell_shape)
+
+                # Variables without a name (such as the subsystem data of function handles) are not variables at all
+                if name != "":
+                    variable_headers[name] = MatVariableHeader(
+                        shape=shape,
+                        matlab_class=matlab_class,
+                        dtype=_NUMPY_DTYPES.get(matlab_class, None),
+                        cell_shapes=cell_shapes,
+                    )
+
+            file_stream.seek(next_element_position)
+
+    return variable_headers
+
+
+def _read_matrix_header(reader: "_FileReader | _DecompressingReader", byte_order: str) -> tuple:
+    """
+    Read the array flags, dimensions, and name which start every matrix element.
+
+    Returns the MATLAB class, the shape, the name, and the number of bytes read.
+    """
+    _, flags, number_of_bytes_read = _read_element_data(reader=reader, byte_order=byte_order)
+    (flags_and_class,) = struct.unpack_from(f"{byte_order}I", flags)
+    is_logical = (flags_and_class >> 9) & 1
+    matlab_class = "logical" if is_logical else _V5_CLASSES.get(flags_and_class & 0xFF, "unknown")
+
+    _, dimensions, number_of_dimension_bytes_read = _read_element_data(reader=reader, byte_order=byte_order)
+    shape = struct.unpack(f"{byte_order}{len(dimensions) // 4}i", dimensions)
+
+    _, name, number_of_name_bytes_read = _read_element_data(reader=reader, byte_order=byte_order)
+
+    number_of_bytes_read += number_of_dimension_bytes_read + number_of_name_bytes_read
+    return matlab_class, shape, name.decode(encoding="latin-1"), number_of_bytes_read
+
+
+def _read_tag(reader: "_FileReader | _DecompressingReader", byte_order: str) -> tuple[int, int, bytes | None]:
+    """Read the tag of an element, along with its data if small enough to be packed into the tag itself."""
+    tag = reader.read(number_of_bytes=8)
+    data_type, number_of_bytes = struct.unpack(f"{byte_order}II", tag)
+    if data_type >> 16 != 0:
+        number_of_bytes = data_type >> 16
+        return data_type & 0xFFFF, number_of_bytes, tag[4 : 4 + number_of_bytes]
+    return data_type, number_of_bytes, None
+
+
+def _read_element_data(reader: "_FileReader | _DecompressingReader", byte_order: str) -> tuple[int, bytes, int]:
+    """Read a (small) element in full, returning its data type, its data, and the number of bytes read."""
+    data_type, number_of_bytes, data = _read_tag(reader=reader, byte_order=byte_order)
+    if data is not None:
+        return data_type, data, 8
+
+    number_of_padded_bytes = number_of_bytes + (-number_of_bytes) % 8
+    data = reader.read(number_of_bytes=number_of_padded_bytes)[:number_of_bytes]
+    return data_type, data, 8 + number_of_padded_bytes
+
+
+class _FileReader:
+    """Reads the elements of an uncompressed variable directly from the file, seeking over any data not needed."""
+
+    def __init__(self, file_stream: typing.BinaryIO):
+        self._file_stream = file_stream
+
+    def read(self, number_of_bytes: int) -> bytes:
+        data = self._file_stream.read(number_of_bytes)
+        if len(data) < number_of_bytes:
+            message = "Unexpected end of file."
+            raise EOFError(message)
+        return data
+
+    def skip(self, number_of_bytes: int) -> None:
+        self._file_stream.seek(number_of_bytes, os.SEEK_CUR)
+
+
+class _DecompressingReader:
+    """Reads the elements of a compressed variable, decompressing only as much of it as is read or skipped."""
+
+    def __init__(self, file_stream: typing.BinaryIO, compressed_size: int):
+        self._file_stream = file_stream
+        self._remaining_compressed_size = compressed_size
+        self._decompressor = zlib.decompressobj()
+        self._buffer = b""
+
+    def read(self, number_of_bytes: int) -> bytes:
+        while len(self._buffer) < number_of_bytes:
+            self._buffer += self._decompress_block()
+        data, self._buffer = self._buffer[:number_of_bytes], self._buffer[number_of_bytes:]
+        return data
+
+    def skip(self, number_of_bytes: int) -> None:
+        while number_of_bytes > len(self._buffer):
+            number_of_bytes -= len(self._buffer)
+            self._buffer = self._decompress_block()
+        self._buffer = self._buffer[number_of_bytes:]
+
+    def _decompress_block(self) -> bytes:
+        """Decompress the next block, bounding its size so that no more than a block is ever held in memory."""
+        if self._decompressor.unconsumed_tail:
+            return self._decompressor.decompress(self._decompressor.unconsumed_tail, _MAXIMUM_DECOMPRESSED_BLOCK_SIZE)
+
+        if self._remaining_compressed_size == 0:
+            message = "Unexpected end of compressed variable."
+            raise EOFError(message)
+        compressed_block = self._file_stream.read(min(self._remaining_compressed_size, _COMPRESSED_BLOCK_SIZE))
+        if len(compressed_block) == 0:
+            message = "Unexpected end of file."
+            raise EOFError(message)
+        self._remaining_compressed_size -= len(compressed_block)
+        return self._decompressor.decompress(compressed_block, _MAXIMUM_DECOMPRESSED_BLOCK_SIZE)
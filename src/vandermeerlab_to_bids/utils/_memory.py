@@ -0,0 +1,81 @@
+"""Measurements of the memory used by the current process, and of the memory it may use."""
+
+import sys
+
+import psutil
+
+if sys.platform != "win32":
+    import resource
+
+
+def get_memory_usage() -> int:
+    """Get the current resident set size (RSS) of this process, in bytes."""
+    return psutil.Process().memory_info().rss
+
+
+def get_peak_memory_usage() -> int:
+    """Get the highest resident set size (RSS) reached by this process so far, in bytes."""
+    if sys.platform == "win32":
+        return psutil.Process().memory_info().peak_wset
+
+    peak_memory_usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Reported in kilobytes on Linux, but in bytes on macOS
+    return peak_memory_usage if sys.platform == "darwin" else peak_memory_usage * 1024
+
+
+def reset_peak_memory_usage() -> bool:
+    """
+    Reset the highest resident set size (RSS) of this process to its current size, where the platform allows it.
+
+    Only Linux allows the peak to be reset; elsewhere, `get_peak_memory_usage` keeps reporting the peak of the process
+    so far.
+
+    Returns
+    -------
+    bool
+        Whether the peak was reset.
+    """
+    if sys.platform != "linux":
+        return False
+
+    try:
+        with open("/proc/self/clear_refs", mode="w") as file_stream:
+            file_stream.write("5")
+    except OSError:
+        return False
+    return True
+
+
+# The memory held by the interpreter and the imported libraries, outside of any data buffer
+_PROCESS_OVERHEAD_GB = 0.5
+
+# Each buffer is held alongside the copy being compressed and the chunk cache of the file being written
+_MEMORY_PER_BUFFER = 2
+
+
+def get_available_memory() -> int:
+    """Get the memory which can be given to processes without swapping, in bytes."""
+    return psutil.virtual_memory().available
+
+
+def get_automatic_memory_limit_gb(number_of_processes: int = 1, fraction: float = 0.8) -> float:
+    """Share a `fraction` of the memory available right now between `number_of_processes` processes, in gigabytes."""
+    return fraction * get_available_memory() / 1e9 / number_of_processes
+
+
+def get_buffer_gb_limit(memory_limit_gb: float, number_of_processes: int = 1, number_of_buffers: int = 1) -> float:
+    """
+    Get the largest size of data buffer, in gigabytes, for which `number_of_processes` processes holding
+    `number_of_buffers` buffers between them stay within `memory_limit_gb` in total.
+    """
+    buffer_gb_limit = (memory_limit_gb - _PROCESS_OVERHEAD_GB * number_of_processes) / (
+        _MEMORY_PER_BUFFER * number_of_buffers
+    )
+    if buffer_gb_limit <= 0:
+        message = (
+            f"A memory limit of {memory_limit_gb:.2f} GB leaves no room for data buffers once the "
+            f"{_PROCESS_OVERHEAD_GB} GB needed by each of {number_of_processes} process(es) is taken."
+        )
+        raise ValueError(message)
+    return buffer_gb_limit
@@ -0,0 +1,14 @@
+"""Paths of the NWB files written by the van der Meer Lab to BIDS tools."""
+
+import pathlib
+
+
+def get_partial_nwbfile_path(nwbfile_path: pathlib.Path) -> pathlib.Path:
+    """
+    Get the hidden path to write an NWB file to before it is moved into place once complete.
+
+    The extension stays last (such as '.sub-M540_ses-2024-08-19_ecephys.partial.nwb', or '.partial.nwb.zarr' for
+    Zarr), since PyNWB warns of every file whose name does not end with it.
+    """
+    name, separator, extension = nwbfile_path.name.partition(".nwb")
+    return nwbfile_path.with_name(f".{name}.partial{separator}{extension}")
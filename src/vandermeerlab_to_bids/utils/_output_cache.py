@@ -0,0 +1,192 @@
+"""Content-addressed cache of converted NWB files, keyed by the content of their inputs and the conversion options."""
+
+import datetime
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import shutil
+import typing
+
+from ._file_fingerprints import hash_file, hash_file_sample
+from ._nwbfile_paths import get_partial_nwbfile_path
+
+# The distributions whose versions determine the content of the files written
+_DISTRIBUTION_NAMES = ("vandermeerlab_to_bids", "neuroconv", "pynwb", "hdmf", "hdmf_zarr")
+
+DEFAULT_OUTPUT_CACHE_SIZE_GB = 100.0
+
+
+def get_output_cache_key(*, input_file_paths: list[pathlib.Path], options: dict[str, typing.Any]) -> str:
+    """
+    Compute the key of the NWB file converted from the inputs with the options, by the installed versions.
+
+    The key hashes the name and content of each input file (though only a sample of the content of raw SpikeGLX
+    binaries), the versions of these tools, NeuroConv, PyNWB, and HDMF, and the `options` (as JSON). Where the inputs
+    live does not matter, so the same session converted from another copy of the archive shares its key.
+    """
+    key_hash = hashlib.sha256()
+    versions = {name: _get_distribution_version(name=name) for name in _DISTRIBUTION_NAMES}
+    key_hash.update(json.dumps({"versions": versions, "options": options}, sort_keys=True, default=str).encode())
+    for file_path in sorted(input_file_paths, key=lambda file_path: file_path.name):
+        content_hash = (
+            hash_file_sample(file_path=file_path) if file_path.suffix == ".bin" else hash_file(file_path=file_path)
+        )
+        key_hash.update(f"{file_path.name}:{content_hash}\n".encode())
+    return key_hash.hexdigest()
+
+
+class OutputCache:
+    """
+    Content-addressed cache of converted NWB files, bounded in size by evicting those least recently used.
+
+    Each file is kept as a hard link to the file first converted where the cache is on the same file system as the
+    output, so that it costs no extra space for as long as that file exists; and otherwise as a copy. Reusing a file
+    links (or copies) it into place in the same way, so a file reused must be rewritten rather than modified in place.
+
+    Each entry is stored as '<key>.nwb' (or '<key>.nwb.zarr', a directory) alongside a small '<key>.json' recording its
+    size and when it was last used.
+    """
+
+    def __init__(self, cache_directory: pathlib.Path, maximum_size_gb: float = DEFAULT_OUTPUT_CACHE_SIZE_GB) -> None:
+        self.cache_directory = pathlib.Path(cache_directory)
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        self.maximum_size_gb = maximum_size_gb
+
+        # Files are otherwise only evicted as others are stored, so a lower limit would wait for the next conversion
+        self.evict(maximum_size_gb=maximum_size_gb)
+
+    def retrieve(self, *, key: str, nwbfile_path: pathlib.Path) -> bool:
+        """
+        Link (or copy) the cached file of the key into place at the `nwbfile_path`, replacing any file there.
+
+        Returns whether the key was found; if not (or if its entry was evicted meanwhile), nothing is changed.
+        """
+        entry = self._read_entry(key=key)
+        if entry is None:
+            return False
+
+        cached_nwbfile_path = self.cache_directory / entry["name"]
+        # Renaming a hard link onto another link to the same file would leave both in place
+        if not (nwbfile_path.is_file() and nwbfile_path.samefile(cached_nwbfile_path)):
+            temporary_nwbfile_path = get_partial_nwbfile_path(nwbfile_path=nwbfile_path)
+            _remove_path(path=temporary_nwbfile_path)
+            nwbfile_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                _link_or_copy(source_path=cached_nwbfile_path, destination_path=temporary_nwbfile_path)
+            except FileNotFoundError:
+                _remove_path(path=temporary_nwbfile_path)
+                return False
+
+            # A directory (as written by Zarr) cannot be replaced by another in a single step
+            if nwbfile_path.is_dir():
+                _remove_path(path=nwbfile_path)
+            temporary_nwbfile_path.replace(nwbfile_path)
+
+        entry["last_used"] = datetime.datetime.now().isoformat()
+        self._write_entry(key=key, entry=entry)
+        return True
+
+    def store(self, *, key: str, nwbfile_path: pathlib.Path) -> None:
+        """Keep the NWB file converted under the key, then evict the least recently used files beyond the size limit."""
+        # Such as '.nwb', or '.nwb.zarr' for a directory written by Zarr
+        name = key + ("".join(nwbfile_path.suffixes[-2:]) if nwbfile_path.is_dir() else nwbfile_path.suffix)
+        cached_nwbfile_path = self.cache_directory / name
+        temporary_nwbfile_path = self.cache_directory / f"{name}.partial-{os.getpid()}"
+        _remove_path(path=temporary_nwbfile_path)
+        _link_or_copy(source_path=nwbfile_path, destination_path=temporary_nwbfile_path)
+        # Renaming a hard link onto another link to the same file would leave both in place
+        _remove_path(path=cached_nwbfile_path)
+        temporary_nwbfile_path.replace(cached_nwbfile_path)
+
+        now = datetime.datetime.now().isoformat()
+        entry = {"name": name, "size": _get_size(path=cached_nwbfile_path), "created": now, "last_used": now}
+        self._write_entry(key=key, entry=entry)
+
+        self.evict(maximum_size_gb=self.maximum_size_gb)
+
+    def evict(self, maximum_size_gb: float) -> list[str]:
+        """
+        Remove the least recently used files until those left take no more than `maximum_size_gb`.
+
+        The size of a file is counted in full even while it is also linked from an output tree.
+
+        Returns
+        -------
+        list of str
+            The keys of the files removed.
+        """
+        entries = dict()
+        for entry_file_path in self.cache_directory.glob(pattern="*.json"):
+            try:
+                entries[entry_file_path.stem] = json.loads(entry_file_path.read_text())
+            except (FileNotFoundError, json.JSONDecodeError):  # Being written, or removed, by another process
+                continue
+
+        total_size = sum(entry["size"] for entry in entries.values())
+        evicted_keys = []
+        for key, entry in sorted(entries.items(), key=lambda key_and_entry: key_and_entry[1]["last_used"]):
+            if total_size <= maximum_size_gb * 1e9:
+                break
+
+            (self.cache_directory / f"{key}.json").unlink(missing_ok=True)
+            _remove_path(path=self.cache_directory / entry["name"])
+            total_size -= entry["size"]
+            evicted_keys.append(key)
+
+        return evicted_keys
+
+    def _read_entry(self, key: str) -> dict[str, typing.Any] | None:
+        entry_file_path = self.cache_directory / f"{key}.json"
+        try:
+            entry = json.loads(entry_file_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # An entry whose file was removed, or only partly copied, is never reused
+        cached_nwbfile_path = self.cache_directory / entry["name"]
+        if not cached_nwbfile_path.exists() or _get_size(path=cached_nwbfile_path) != entry["size"]:
+            return None
+        return entry
+
+    def _write_entry(self, key: str, entry: dict[str, typing.Any]) -> None:
+        entry_file_path = self.cache_directory / f"{key}.json"
+        temporary_entry_file_path = entry_file_path.with_suffix(f".partial-{os.getpid()}")
+        temporary_entry_file_path.write_text(json.dumps(entry, indent=2))
+        temporary_entry_file_path.replace(entry_file_path)
+
+
+def _link_or_copy(source_path: pathlib.Path, destination_path: pathlib.Path) -> None:
+    """Hard link a file (or each file of a directory) where both are on the same file system, or else copy it."""
+    if source_path.is_dir():
+        shutil.copytree(src=source_path, dst=destination_path, copy_function=_link_or_copy_file)
+    else:
+        _link_or_copy_file(source_path, destination_path)
+
+
+def _link_or_copy_file(source_path: str | pathlib.Path, destination_path: str | pathlib.Path) -> None:
+    try:
+        os.link(src=source_path, dst=destination_path)
+    except OSError:  # Such as across file systems, or on those without hard links
+        shutil.copyfile(src=source_path, dst=destination_path)
+
+
+def _get_size(path: pathlib.Path) -> int:
+    if path.is_dir():
+        return sum(file_path.stat().st_size for file_path in path.rglob(pattern="*") if file_path.is_file())
+    return path.stat().st_size
+
+
+def _remove_path(path: pathlib.Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path=path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _get_distribution_version(name: str) -> str | None:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
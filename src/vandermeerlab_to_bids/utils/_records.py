@@ -0,0 +1,17 @@
+"""Locations of the local records kept by the van der Meer Lab to BIDS tools."""
+
+import pathlib
+
+
+def get_home_directory() -> pathlib.Path:
+    """Get (and create, if needed) the home directory of the van der Meer Lab to BIDS tools."""
+    home_directory = pathlib.Path.home() / ".vandermeerlab_to_bids"
+    home_directory.mkdir(exist_ok=True)
+    return home_directory
+
+
+def get_records_directory() -> pathlib.Path:
+    """Get (and create, if needed) the directory in which validation and conversion records are kept."""
+    records_directory = get_home_directory() / "records"
+    records_directory.mkdir(exist_ok=True)
+    return records_directory
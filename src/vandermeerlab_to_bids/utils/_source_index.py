@@ -0,0 +1,164 @@
+"""Index of the files under a source data directory, listed once and cached between runs."""
+
+import concurrent.futures
+import fnmatch
+import hashlib
+import json
+import os
+import pathlib
+import time
+
+from ._records import get_home_directory
+
+# Entries may still be added to a directory within the resolution of its modification time after it was listed, so
+# the listings of directories modified this recently are not trusted on the next run
+_RECENT_MODIFICATION_NS = 2 * 10**9
+
+
+class SourceIndex:
+    """
+    Index of the files of every session under a source data directory.
+
+    The listing of each directory is cached (in the home directory of the van der Meer Lab to BIDS tools) along with
+    its modification time, which changes whenever an entry is added to, removed from, or renamed within it. Each
+    query then only checks the modification times of the directories it covers, listing again only those which
+    changed, so that the source tree (often a DataLad dataset on network storage) is only walked in full once.
+
+    Hidden directories (such as `.git`) are never listed.
+    """
+
+    def __init__(self, *, data_directory: str | pathlib.Path, use_cache: bool = True, number_of_jobs: int = 8):
+        """
+        Parameters
+        ----------
+        data_directory : directory path
+            The directory containing all of the data from the experiment, with one directory per subject.
+        use_cache : bool, default: True
+            Whether to read and save the listings from and to the cache; otherwise, they last only as long as the index.
+        number_of_jobs : int, default: 8
+            The number of directories listed concurrently, each in its own thread, when walking a tree.
+        """
+        self.data_directory = pathlib.Path(data_directory).absolute()
+        self.use_cache = use_cache
+        self.number_of_jobs = number_of_jobs
+
+        cache_key = hashlib.sha1(str(self.data_directory).encode()).hexdigest()
+        self.cache_file_path = get_home_directory() / "source_index" / f"{cache_key}.json"
+
+        self._listings: dict[str, dict] = dict()
+        if self.use_cache and self.cache_file_path.exists():
+            self._listings = json.loads(self.cache_file_path.read_text())["listings"]
+        self._is_modified = False
+
+    def glob(self, *, directory: str | pathlib.Path, pattern: str, recursive: bool = False) -> list[pathlib.Path]:
+        """
+        Find the files in a directory whose names match a pattern, in sorted order.
+
+        Equivalent to `sorted(directory.glob(pattern))` (or `rglob`, if `recursive`) for patterns matching file names;
+        the paths found are likewise joined to the `directory` as given.
+        """
+        directory = pathlib.Path(directory)
+        root_relative_directory = self._get_relative_directory(directory=directory)
+        relative_directories = [root_relative_directory]
+        file_paths = []
+        while any(relative_directories):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.number_of_jobs) as executor:
+                listings = list(executor.map(self._get_listing, relative_directories))
+
+            next_relative_directories = []
+            for relative_directory, listing in zip(relative_directories, listings):
+                if listing is None:
+                    continue
+
+                subdirectory = pathlib.PurePosixPath(relative_directory).relative_to(root_relative_directory)
+                file_paths += [
+                    directory / subdirectory / file_name
+                    for file_name in listing["files"]
+                    if fnmatch.fnmatchcase(name=file_name, pat=pattern)
+                ]
+                if recursive:
+                    next_relative_directories += [
+                        (pathlib.PurePosixPath(relative_directory) / directory_name).as_posix()
+                        for directory_name in listing["directories"]
+                    ]
+            relative_directories = next_relative_directories
+
+        self._save()
+        return sorted(file_paths)
+
+    def get_subject_and_session_ids(self) -> list[tuple[str, str]]:
+        """Find all (subject, session) pairs with a 'preprocessed' directory under the source data directory."""
+        listing = self._get_listing(relative_directory=".")
+        if listing is None:
+            message = f"The data directory '{self.data_directory}' does not exist."
+            raise ValueError(message)
+
+        subject_and_session_ids = []
+        for subject_id in listing["directories"]:
+            preprocessed_listing = self._get_listing(relative_directory=f"{subject_id}/preprocessed")
+            if preprocessed_listing is None:
+                continue
+
+            subject_and_session_ids += [
+                (subject_id, session_directory_name.removeprefix(f"{subject_id}-"))
+                for session_directory_name in preprocessed_listing["directories"]
+            ]
+
+        self._save()
+        return sorted(subject_and_session_ids)
+
+    def _get_relative_directory(self, directory: str | pathlib.Path) -> str:
+        directory = pathlib.Path(directory).absolute()
+        if not directory.is_relative_to(self.data_directory):
+            message = f"The directory '{directory}' is not within the indexed directory '{self.data_directory}'."
+            raise ValueError(message)
+        return directory.relative_to(self.data_directory).as_posix()
+
+    def _get_listing(self, relative_directory: str) -> dict | None:
+        """Get the names of the files and directories in a directory, listing it again only if it has changed."""
+        directory = self.data_directory / relative_directory
+        try:
+            modification_time = os.stat(directory).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            if self._listings.pop(relative_directory, None) is not None:
+                self._is_modified = True
+            return None
+
+        listing = self._listings.get(relative_directory)
+        if listing is not None and listing["modification_time"] == modification_time:
+            return listing
+
+        file_names, directory_names = [], []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                # Files not yet retrieved from a DataLad dataset are broken links, but are files all the same
+                if entry.is_dir():
+                    if not entry.name.startswith("."):
+                        directory_names.append(entry.name)
+                else:
+                    file_names.append(entry.name)
+
+        is_recently_modified = time.time_ns() - modification_time < _RECENT_MODIFICATION_NS
+        listing = {
+            "modification_time": None if is_recently_modified else modification_time,
+            "files": sorted(file_names),
+            "directories": sorted(directory_names),
+        }
+        # A recently modified directory listed again unchanged leaves nothing new to save
+        if listing != self._listings.get(relative_directory):
+            self._is_modified = True
+        self._listings[relative_directory] = listing
+        return listing
+
+    def _save(self) -> None:
+        if not self.use_cache or not self._is_modified:
+            return
+
+        # Each process writes its own temporary file, so concurrent conversions at worst discard each other's listings
+        self.cache_file_path.parent.mkdir(exist_ok=True)
+        temporary_cache_file_path = self.cache_file_path.with_suffix(f".{os.getpid()}.partial")
+        temporary_cache_file_path.write_text(
+            json.dumps({"data_directory": str(self.data_directory), "listings": self._listings})
+        )
+        temporary_cache_file_path.replace(self.cache_file_path)
+        self._is_modified = False
@@ -0,0 +1,28 @@
+"""Reader for the plain text timestamp files (one time in seconds per line) exported by the van der Meer Lab."""
+
+import pathlib
+import warnings
+
+import numpy
+
+
+def read_timestamps_file(file_path: pathlib.Path) -> numpy.ndarray:
+    """
+    Read all timestamps from a text file in a single vectorized call.
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        The path to the file, such as `{channel}_ON.txt`, containing one time (in seconds) per line.
+
+    Returns
+    -------
+    numpy.ndarray
+        A one-dimensional float64 array of the timestamps, in the order they appear in the file.
+    """
+    with warnings.catch_warnings():
+        # An empty file is a valid record of a channel that was never triggered
+        warnings.filterwarnings(action="ignore", message=".*input contained no data.*", category=UserWarning)
+        timestamps = numpy.loadtxt(fname=file_path, dtype="float64", ndmin=1)
+
+    return timestamps
@@ -0,0 +1,159 @@
+"""Named profiles of how the datasets of an NWB file are compressed, chunked, and buffered when written."""
+
+import typing
+
+import numpy
+import pydantic
+
+if typing.TYPE_CHECKING:
+    from neuroconv.tools.nwb_helpers import BackendConfiguration
+
+Backend = typing.Literal["hdf5", "zarr"]
+DatasetCategory = typing.Literal["ap", "nidq", "units", "intervals"]
+
+
+class WriteProfile(pydantic.BaseModel):
+    """
+    How a group of datasets is compressed and chunked, and how much data is buffered to write them.
+
+    Any option left as None keeps the default of NeuroConv.
+    """
+
+    compressors: list[str] | None = pydantic.Field(
+        description="The filters to apply, as accepted by NeuroConv (such as ['shuffle', 'gzip']); None disables them."
+    )
+    compressor_options: list[dict[str, typing.Any] | None] | None = pydantic.Field(
+        default=None, description="The options of each of the `compressors`, such as {'level': 9} for 'gzip'."
+    )
+    chunk_mb: pydantic.PositiveFloat | None = pydantic.Field(
+        default=None, description="The approximate size of each chunk, in megabytes."
+    )
+    buffer_gb: pydantic.PositiveFloat | None = pydantic.Field(
+        default=None, description="The approximate amount of data read and written at a time, in gigabytes."
+    )
+
+
+WRITE_PROFILES: dict[Backend, dict[str, WriteProfile]] = {
+    "hdf5": {
+        # The LZF filter ships with h5py, so it is always available, and compresses several times faster than gzip
+        "fast": WriteProfile(compressors=["lzf"], chunk_mb=40.0, buffer_gb=2.0),
+        # The defaults of NeuroConv
+        "balanced": WriteProfile(compressors=["gzip"]),
+        "archive": WriteProfile(compressors=["shuffle", "gzip"], compressor_options=[None, {"level": 9}]),
+    },
+    "zarr": {
+        # Zarr has no LZF codec, but Blosc with LZ4 ships with numcodecs and is faster still
+        "fast": WriteProfile(
+            compressors=["blosc"],
+            compressor_options=[{"cname": "lz4", "clevel": 5, "shuffle": 1}],
+            chunk_mb=40.0,
+            buffer_gb=2.0,
+        ),
+        "balanced": WriteProfile(compressors=["gzip"]),
+        # The shuffle codec of Zarr has a fixed element size, whereas Blosc shuffles by the size of each dataset's type
+        "archive": WriteProfile(
+            compressors=["blosc"], compressor_options=[{"cname": "zstd", "clevel": 9, "shuffle": 2}]
+        ),
+    },
+}
+
+
+def get_write_profile(write_profile: str | WriteProfile, backend: Backend = "hdf5") -> WriteProfile:
+    """Look up a write profile of the backend by name, or pass through one that is already defined."""
+    if isinstance(write_profile, WriteProfile):
+        return write_profile
+
+    write_profiles = WRITE_PROFILES[backend]
+    if write_profile not in write_profiles:
+        message = f"Unknown write profile '{write_profile}' - must be one of {list(write_profiles)}."
+        raise ValueError(message)
+    return write_profiles[write_profile]
+
+
+def get_dataset_category(location_in_file: str) -> DatasetCategory | None:
+    """Get the category of dataset, for which a different write profile may be chosen, from its location in the file."""
+    if location_in_file.startswith("acquisition/ElectricalSeriesAP"):
+        return "ap"
+    if location_in_file.startswith("acquisition/") and "NIDQ" in location_in_file.upper():
+        return "nidq"
+    if location_in_file.startswith("units/"):
+        return "units"
+    if location_in_file.startswith("intervals/"):
+        return "intervals"
+    return None
+
+
+def apply_write_profiles(
+    *,
+    backend_configuration: "BackendConfiguration",
+    write_profile: str | WriteProfile = "balanced",
+    dataset_write_profiles: dict[DatasetCategory, str | WriteProfile] | None = None,
+) -> None:
+    """
+    Apply a write profile to every dataset of a backend configuration, in place.
+
+    Profiles given by name are those of the backend of the configuration.
+
+    Parameters
+    ----------
+    backend_configuration : BackendConfiguration
+        The configuration, such as from `neuroconv.tools.nwb_helpers.get_default_backend_configuration`.
+    write_profile : str or WriteProfile, default: "balanced"
+        The profile, or the name of one of the `WRITE_PROFILES` of the backend ("fast", "balanced", or "archive"),
+        for all datasets.
+    dataset_write_profiles : dict, optional
+        Profiles which override the `write_profile` for a category of datasets: the SpikeGLX AP ("ap") or
+        NIDQ ("nidq") streams, the units table ("units"), or the trials and epochs tables ("intervals").
+        Only the compression of the SpikeGLX streams is overridden this way; their chunks and buffers are those of
+        their data iterators, which are set from the `write_profile` by `get_iterator_options`.
+    """
+    # NeuroConv takes seconds to import, so is only imported once a backend configuration is to be written
+    from neuroconv.tools.hdmf import SliceableDataChunkIterator
+
+    backend = backend_configuration.backend
+    default_write_profile = get_write_profile(write_profile=write_profile, backend=backend)
+    write_profiles_by_category = {
+        category: get_write_profile(write_profile=dataset_write_profile, backend=backend)
+        for category, dataset_write_profile in (dataset_write_profiles or dict()).items()
+    }
+
+    for dataset_key, dataset_configuration in backend_configuration.dataset_configurations.items():
+        category = get_dataset_category(location_in_file=dataset_configuration.location_in_file)
+        profile = write_profiles_by_category.get(category, default_write_profile)
+
+        compressor_options = profile.compressor_options
+        if profile.compressors is not None and compressor_options is None:
+            compressor_options = [None] * len(profile.compressors)
+        updates = {"compressors": profile.compressors, "compressor_options": compressor_options}
+
+        # The chunks of the SpikeGLX streams are those of their data iterators, set through `get_iterator_options`
+        dtype = numpy.dtype(dataset_configuration.dtype)
+        full_shape = dataset_configuration.full_shape
+        if (
+            profile.chunk_mb is not None
+            and category not in ("ap", "nidq")
+            and dtype.kind != "O"
+            and all(dimension > 0 for dimension in full_shape)
+        ):
+            chunk_shape = SliceableDataChunkIterator.estimate_default_chunk_shape(
+                chunk_mb=profile.chunk_mb, maxshape=full_shape, dtype=dtype
+            )
+            updates["chunk_shape"] = chunk_shape
+            updates["buffer_shape"] = SliceableDataChunkIterator.estimate_default_buffer_shape(
+                buffer_gb=profile.buffer_gb or 0.5, chunk_shape=chunk_shape, maxshape=full_shape, dtype=dtype
+            )
+
+        # Each assignment to a dataset configuration is validated on its own, but these options only agree together
+        backend_configuration.dataset_configurations[dataset_key] = dataset_configuration.model_copy(update=updates)
+
+
+def get_iterator_options(write_profile: str | WriteProfile, backend: Backend = "hdf5") -> dict[str, float]:
+    """Get the options for the data iterators of the SpikeGLX streams (`chunk_mb` and `buffer_gb`) set by a profile."""
+    profile = get_write_profile(write_profile=write_profile, backend=backend)
+
+    iterator_options = dict()
+    if profile.chunk_mb is not None:
+        iterator_options["chunk_mb"] = profile.chunk_mb
+    if profile.buffer_gb is not None:
+        iterator_options["buffer_gb"] = profile.buffer_gb
+    return iterator_options
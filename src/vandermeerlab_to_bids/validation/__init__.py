@@ -1,5 +1,11 @@
+from ._base_validator import ValidationViolation
+from ._block_times import BlockTimesValidator
 from ._odor_times import OdorTimesValidator
+from ._spike_sorting import SpikeSortingValidator
 
 __all__ = [
+    "BlockTimesValidator",
     "OdorTimesValidator",
+    "SpikeSortingValidator",
+    "ValidationViolation",
 ]
@@ -1,6 +1,25 @@
+import concurrent.futures
+import csv
+import datetime
+import hashlib
+import json
+import multiprocessing
 import pathlib
+import typing
+
 import pydantic
 
+from ..utils import get_file_fingerprint, get_home_directory, get_records_directory, is_file_unchanged
+
+
+class ValidationViolation(pydantic.BaseModel):
+    """A single problem found by a validator in the source data of a session."""
+
+    session: str = pydantic.Field(description="The name of the session directory, such as 'M541-2024-08-31'.")
+    check: str = pydantic.Field(description="The check which failed, such as 'on_off_count'.")
+    item: str = pydantic.Field(description="What was checked, such as an odor key or the name of a file.")
+    message: str
+
 
 class BaseValidator:
     """
@@ -9,12 +28,166 @@ class BaseValidator:
     This class provides a common interface and basic functionality for all validators.
     """
 
+    # The name under which the reports and cached results of the validator are stored
+    report_name = "validation"
+
     @pydantic.validate_call
     def __init__(self, *, directory: str | pathlib.Path):
         self.directory = directory
 
-        self.home_directory = pathlib.Path.home() / ".vandermeerlab_to_bids"
-        self.home_directory.mkdir(exist_ok=True)
+        self.home_directory = get_home_directory()
+        self.records_directory = get_records_directory()
+        self.report_file_path: pathlib.Path | None = None
+
+    def _validate_sessions(
+        self,
+        *,
+        session_input_file_paths: dict[pathlib.Path, list[pathlib.Path]],
+        check_session: typing.Callable[..., list[ValidationViolation]],
+        check_options: dict[str, typing.Any],
+        number_of_jobs: int = 1,
+    ) -> list[ValidationViolation]:
+        """
+        Check each session, in its own worker process when `number_of_jobs` is greater than one.
+
+        The violations found in each session are cached along with the fingerprints of its input files and the
+        `check_options`, so that sessions whose files and options are unchanged since are not checked again.
+        `check_session` is called with the `input_file_paths` of one session and the `check_options`.
+
+        A session whose check raises an exception (or whose worker process dies) is reported by a single 'check_failed'
+        violation, rather than stopping the validation of the others, and is checked again next time.
+        """
+        cache_directory = self.records_directory / "validation_cache" / self.report_name
+        cache_directory.mkdir(parents=True, exist_ok=True)
+
+        violations_by_session: dict[pathlib.Path, list[ValidationViolation]] = dict()
+        sessions_to_check = []
+        for session_directory, input_file_paths in session_input_file_paths.items():
+            cached_violations = _read_cached_violations(
+                cache_file_path=_get_cache_file_path(
+                    cache_directory=cache_directory, session_directory=session_directory
+                ),
+                input_file_paths=input_file_paths,
+                check_options=check_options,
+            )
+            if cached_violations is None:
+                sessions_to_check.append(session_directory)
+            else:
+                violations_by_session[session_directory] = cached_violations
+
+        # A single session at a time is checked in this process; 'spawn' is the only start method on all platforms
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        if number_of_jobs > 1:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=number_of_jobs, mp_context=multiprocessing.get_context(method="spawn")
+            )
+        with executor:
+            future_to_session_directory = {
+                executor.submit(
+                    check_session, input_file_paths=session_input_file_paths[session_directory], **check_options
+                ): session_directory
+                for session_directory in sessions_to_check
+            }
+            for future in concurrent.futures.as_completed(future_to_session_directory):
+                session_directory = future_to_session_directory[future]
+                try:
+                    violations = future.result()
+                except Exception as exception:
+                    violations_by_session[session_directory] = [
+                        ValidationViolation(
+                            session=session_directory.name,
+                            check="check_failed",
+                            item=session_directory.name,
+                            message=f"The check failed with {type(exception).__name__}: {exception}",
+                        )
+                    ]
+                    continue
+
+                violations_by_session[session_directory] = violations
+                _write_cached_violations(
+                    cache_file_path=_get_cache_file_path(
+                        cache_directory=cache_directory, session_directory=session_directory
+                    ),
+                    input_file_paths=session_input_file_paths[session_directory],
+                    check_options=check_options,
+                    violations=violations,
+                )
+
+        return [
+            violation
+            for session_directory in sorted(violations_by_session)
+            for violation in violations_by_session[session_directory]
+        ]
+
+    def _write_report(self, *, violations: list[ValidationViolation], number_of_sessions: int) -> pathlib.Path:
+        """Write the violations to a JSON report in the records directory, with a CSV copy alongside."""
+        report_directory = self.records_directory / "validation_reports"
+        report_directory.mkdir(exist_ok=True)
+        created = datetime.datetime.now()
+        report_file_path = report_directory / f"{self.report_name}_{created:%Y%m%dT%H%M%S%f}.json"
+
+        report = {
+            "validator": type(self).__name__,
+            "directory": str(pathlib.Path(self.directory).absolute()),
+            "created": created.isoformat(),
+            "number_of_sessions": number_of_sessions,
+            "number_of_violations": len(violations),
+            "violations": [violation.model_dump() for violation in violations],
+        }
+        report_file_path.write_text(json.dumps(report, indent=2))
+
+        with report_file_path.with_suffix(".csv").open(mode="w", newline="") as file_stream:
+            writer = csv.DictWriter(file_stream, fieldnames=list(ValidationViolation.model_fields))
+            writer.writeheader()
+            writer.writerows(violation.model_dump() for violation in violations)
+
+        self.report_file_path = report_file_path
+        return report_file_path
+
+
+def _get_cache_file_path(cache_directory: pathlib.Path, session_directory: pathlib.Path) -> pathlib.Path:
+    cache_key = hashlib.sha1(str(session_directory.absolute()).encode()).hexdigest()
+    return cache_directory / f"{cache_key}.json"
+
+
+def _read_cached_violations(
+    *, cache_file_path: pathlib.Path, input_file_paths: list[pathlib.Path], check_options: dict[str, typing.Any]
+) -> list[ValidationViolation] | None:
+    """Get the violations cached for a session, or None if its input files or the options have changed since."""
+    if not cache_file_path.exists():
+        return None
+
+    entry = json.loads(cache_file_path.read_text())
+    fingerprints = entry["input_fingerprints"]
+    if entry["check_options"] != check_options:
+        return None
+    if set(fingerprints) != {str(file_path.absolute()) for file_path in input_file_paths}:
+        return None
+    if not all(
+        is_file_unchanged(file_path=file_path, fingerprint=fingerprints[str(file_path.absolute())])
+        for file_path in input_file_paths
+    ):
+        return None
+
+    return [ValidationViolation.model_validate(violation) for violation in entry["violations"]]
+
 
-        self.records_directory = self.home_directory / "records"
-        self.records_directory.mkdir(exist_ok=True)
+def _write_cached_violations(
+    *,
+    cache_file_path: pathlib.Path,
+    input_file_paths: list[pathlib.Path],
+    check_options: dict[str, typing.Any],
+    violations: list[ValidationViolation],
+) -> None:
+    entry = {
+        "check_options": check_options,
+        "input_fingerprints": {
+            str(file_path.absolute()): get_file_fingerprint(file_path=file_path)
+            for file_path in input_file_paths
+            if file_path.exists()
+        },
+        "violations": [violation.model_dump() for violation in violations],
+    }
+    temporary_cache_file_path = cache_file_path.with_suffix(".partial")
+    temporary_cache_file_path.write_text(json.dumps(entry, indent=2))
+    temporary_cache_file_path.replace(cache_file_path)
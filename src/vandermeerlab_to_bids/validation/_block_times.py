@@ -0,0 +1,180 @@
+import pathlib
+import re
+
+import pydantic
+
+from ._base_validator import BaseValidator, ValidationViolation
+from ..utils import SourceIndex, read_experiment_keys_file
+
+
+class BlockTimesValidator(BaseValidator):
+    """
+    Validator for the block times and notes in the experiment keys of the source data.
+
+    Checks the same consistency of the `block{N}start`, `block{N}end`, and `notes` keys that the
+    `OdorIntervalsInterface` relies on when writing the epochs, so that any problem is found before a conversion starts.
+    """
+
+    report_name = "block_times"
+
+    def __init__(self, directory: str | pathlib.Path):
+        super().__init__(directory=directory)
+
+        source_index = SourceIndex(data_directory=directory)
+        self.experiment_keys_file_paths = source_index.glob(directory=directory, pattern="*_keys.m", recursive=True)
+        self.session_input_file_paths = {
+            experiment_keys_file_path.parent: [experiment_keys_file_path]
+            for experiment_keys_file_path in self.experiment_keys_file_paths
+        }
+
+    @pydantic.validate_call
+    def validate(
+        self, number_of_jobs: pydantic.PositiveInt = 1, raise_on_violation: bool = True
+    ) -> list[ValidationViolation]:
+        """
+        Validate the block times and notes in the source data.
+
+        Raises
+        ------
+        ValueError
+            If any violation is found and `raise_on_violation`, once all sessions have been checked.
+        """
+        violations = self._validate_sessions(
+            session_input_file_paths=self.session_input_file_paths,
+            check_session=_check_block_times,
+            check_options=dict(),
+            number_of_jobs=number_of_jobs,
+        )
+        report_file_path = self._write_report(
+            violations=violations, number_of_sessions=len(self.session_input_file_paths)
+        )
+
+        if any(violations) and raise_on_violation:
+            message = (
+                f"Found {len(violations)} block time violation(s) in "
+                f"{len({violation.session for violation in violations})} of {len(self.session_input_file_paths)} "
+                f"session(s); see the report at {report_file_path}.\n"
+                + "\n".join(f"  {violation.session} {violation.item}: {violation.message}" for violation in violations)
+            )
+            raise ValueError(message)
+
+        return violations
+
+
+def _check_block_times(*, input_file_paths: list[pathlib.Path]) -> list[ValidationViolation]:
+    """Check that the notes describe each block, and that every block has a start and end time in order."""
+    experiment_keys_file_path = input_file_paths[0]
+    session = experiment_keys_file_path.parent.name
+
+    try:
+        experiment_keys = read_experiment_keys_file(file_path=experiment_keys_file_path)
+    except ValueError as exception:
+        return [
+            ValidationViolation(
+                session=session,
+                check="unreadable_file",
+                item=experiment_keys_file_path.name,
+                message=f"Could not read the experiment keys: {exception}",
+            )
+        ]
+
+    # As extracted by the `OdorIntervalsInterface`
+    block_ids = [
+        result.group(1)
+        for key in experiment_keys.keys()
+        if (result := re.match(pattern=r"block(\d+)_type", string=key)) is not None
+    ]
+
+    violations = []
+    experiment_notes = experiment_keys.get("notes", None)
+    if not isinstance(experiment_notes, str) or experiment_notes[:5] != "Block":
+        violations.append(
+            ValidationViolation(
+                session=session,
+                check="notes_format",
+                item="notes",
+                message=f"The notes do not start with 'Block': {experiment_notes!r}.",
+            )
+        )
+    else:
+        notes_block_split = experiment_notes.split(", ")
+        if len(notes_block_split) != len(block_ids):
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="block_count",
+                    item="notes",
+                    message=f"The notes describe {len(notes_block_split)} block(s), but the keys define "
+                    f"{len(block_ids)} block type(s).",
+                )
+            )
+        malformed_block_notes = [block_notes for block_notes in notes_block_split if ":" not in block_notes]
+        if any(malformed_block_notes):
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="notes_format",
+                    item="notes",
+                    message=f"The notes of each block must be of the form 'Block N: details', not "
+                    f"{', '.join(repr(block_notes) for block_notes in malformed_block_notes)}.",
+                )
+            )
+
+    block_intervals = []
+    for block_id in block_ids:
+        block_start_key = f"block{block_id}start"
+        block_end_key = f"block{block_id}end"
+
+        missing_keys = [key for key in (block_start_key, block_end_key) if key not in experiment_keys]
+        if any(missing_keys):
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="missing_key",
+                    item=f"block{block_id}",
+                    message=f"Missing the key(s) {', '.join(missing_keys)}.",
+                )
+            )
+            continue
+
+        start_time = experiment_keys[block_start_key]
+        stop_time = experiment_keys[block_end_key]
+        if not all(isinstance(time, (int, float)) and not isinstance(time, bool) for time in (start_time, stop_time)):
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="block_time_type",
+                    item=f"block{block_id}",
+                    message=f"The start and end of the block must be numbers, not {start_time!r} and {stop_time!r}.",
+                )
+            )
+            continue
+
+        if not start_time < stop_time:
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="block_order",
+                    item=f"block{block_id}",
+                    message=f"The block starts at {start_time}s, which is not before its end at {stop_time}s.",
+                )
+            )
+            continue
+        block_intervals.append((start_time, stop_time, block_id))
+
+    block_intervals.sort()
+    for (_, previous_stop_time, previous_block_id), (start_time, _, block_id) in zip(
+        block_intervals, block_intervals[1:]
+    ):
+        if start_time < previous_stop_time:
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="block_overlap",
+                    item=f"block{block_id}",
+                    message=f"The block starts at {start_time}s, before block {previous_block_id} ends at "
+                    f"{previous_stop_time}s.",
+                )
+            )
+
+    return violations
@@ -1,53 +1,156 @@
-from ._base_validator import BaseValidator
+import pathlib
+
 import numpy
-from ..utils import read_experiment_keys_file
+import pydantic
+
+from ._base_validator import BaseValidator, ValidationViolation
+from ..utils import SourceIndex, read_experiment_keys_file, read_timestamps_file
 
 
 class OdorTimesValidator(BaseValidator):
     """
     Validator for odor times in the source data.
 
-    Ensures the oddness of 'matching' does not need to be done post-hoc during conversion, as from
-    https://github.com/vandermeerlab/mvdmlab_npx_to_nwb/blob/15c85df2803293f8de331caf34980d9f239727bc/src/manimoh_nwb_converters/odorseq_convert_behavior.py#L45
+    Ensures the oddness of 'matching' does not need to be done post-hoc during conversion, as from line 45 of
+    `src/manimoh_nwb_converters/odorseq_convert_behavior.py` in https://github.com/vandermeerlab/mvdmlab_npx_to_nwb
+    (commit 15c85df2803293f8de331caf34980d9f239727bc).
     """
 
-    def __init__(self, directory: str):
+    report_name = "odor_times"
+
+    def __init__(self, directory: str | pathlib.Path):
         super().__init__(directory=directory)
 
-        self.experiment_keys_file_paths = list(directory.rglob("*_keys.m"))
+        source_index = SourceIndex(data_directory=directory)
+        self.experiment_keys_file_paths = source_index.glob(directory=directory, pattern="*_keys.m", recursive=True)
+
+        # The results of each session are cached against all of its timestamp files, whichever odors its keys name
+        self.session_input_file_paths = {
+            experiment_keys_file_path.parent: [experiment_keys_file_path]
+            + source_index.glob(directory=experiment_keys_file_path.parent, pattern="*_ON.txt")
+            + source_index.glob(directory=experiment_keys_file_path.parent, pattern="*_OFF.txt")
+            for experiment_keys_file_path in self.experiment_keys_file_paths
+        }
+
+    @pydantic.validate_call
+    def validate(
+        self,
+        expected_delay: float = 2.0,
+        tolerance: float = 0.25,
+        number_of_jobs: pydantic.PositiveInt = 1,
+        raise_on_violation: bool = True,
+    ) -> list[ValidationViolation]:
+        """
+        Validate the odor times in the source data.
+
+        Every session is checked, each in its own worker process when `number_of_jobs` is greater than one, and all
+        violations are collected into a report (JSON, with a CSV copy) in the records directory. Sessions whose files
+        are unchanged since they were last checked with the same options are not checked again.
+
+        Raises
+        ------
+        ValueError
+            If any violation is found and `raise_on_violation`, once all sessions have been checked.
+        """
+        violations = self._validate_sessions(
+            session_input_file_paths=self.session_input_file_paths,
+            check_session=_check_odor_times,
+            check_options={"expected_delay": expected_delay, "tolerance": tolerance},
+            number_of_jobs=number_of_jobs,
+        )
+        report_file_path = self._write_report(
+            violations=violations, number_of_sessions=len(self.session_input_file_paths)
+        )
+
+        if any(violations) and raise_on_violation:
+            message = (
+                f"Found {len(violations)} odor time violation(s) in "
+                f"{len({violation.session for violation in violations})} of {len(self.session_input_file_paths)} "
+                f"session(s); see the report at {report_file_path}.\n"
+                + "\n".join(f"  {violation.session} {violation.item}: {violation.message}" for violation in violations)
+            )
+            raise ValueError(message)
+
+        return violations
+
+
+def _check_odor_times(
+    *, input_file_paths: list[pathlib.Path], expected_delay: float, tolerance: float
+) -> list[ValidationViolation]:
+    """Check that every ON time of each odor of a session is followed by an OFF time after the expected delay."""
+    experiment_keys_file_path = input_file_paths[0]
+    session = experiment_keys_file_path.parent.name
 
-    def validate(self, expected_delay: float = 2.0, tolerance: float = 0.25) -> None:
-        """Validate the odor times in the source data."""
-        for experiment_key_file_path in self.experiment_keys_file_paths:
-            subject_id, year, month, day, _ = experiment_key_file_path.stem.split("_")
+    try:
+        experiment_keys = read_experiment_keys_file(file_path=experiment_keys_file_path)
+    except ValueError as exception:
+        return [
+            ValidationViolation(
+                session=session,
+                check="unreadable_file",
+                item=experiment_keys_file_path.name,
+                message=f"Could not read the experiment keys: {exception}",
+            )
+        ]
 
-            experiment_keys = read_experiment_keys_file(file_path=experiment_key_file_path)
+    odor_channels = {
+        key: channel for key, channel in experiment_keys.items() if key.startswith("odor") and key.endswith("_channel")
+    }
 
-            odor_channels = {
-                key: channel
-                for key, channel in experiment_keys.items()
-                if key.startswith("odor") and key.endswith("_channel")
-            }
+    violations = []
+    for key, channel in odor_channels.items():
+        on_file_path = experiment_keys_file_path.parent / f"{channel}_ON.txt"
+        off_file_path = experiment_keys_file_path.parent / f"{channel}_OFF.txt"
 
-            for key, channel in odor_channels.items():
-                on_file_path = experiment_key_file_path.parent / f"{channel}_ON.txt"
-                off_file_path = experiment_key_file_path.parent / f"{channel}_OFF.txt"
+        missing_file_paths = [file_path for file_path in (on_file_path, off_file_path) if not file_path.exists()]
+        if any(missing_file_paths):
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="missing_file",
+                    item=key,
+                    message=f"Missing {', '.join(file_path.name for file_path in missing_file_paths)}.",
+                )
+            )
+            continue
 
-                on_content = numpy.array(object=[float(value) for value in on_file_path.read_text().splitlines()])
-                off_content = numpy.array(object=[float(value) for value in off_file_path.read_text().splitlines()])
+        try:
+            on_content = read_timestamps_file(file_path=on_file_path)
+            off_content = read_timestamps_file(file_path=off_file_path)
+        except ValueError as exception:
+            violations.append(
+                ValidationViolation(
+                    session=session, check="unreadable_file", item=key, message=f"Could not read the times: {exception}"
+                )
+            )
+            continue
 
-                if on_content.size != off_content.size:
-                    message = ValueError(
-                        f"Mismatch in number of ON and OFF times for {key} in {experiment_key_file_path.stem}: "
-                        f"{on_content.size} ON times, {off_content.size} OFF times."
-                    )
-                    raise ValueError(message)
+        if on_content.size != off_content.size:
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="on_off_count",
+                    item=key,
+                    message=f"Mismatch in number of ON and OFF times: {on_content.size} ON times, "
+                    f"{off_content.size} OFF times.",
+                )
+            )
+            continue
 
-                difference = off_content - on_content
+        difference = off_content - on_content
+        is_unexpected = ~numpy.isclose(a=difference, b=expected_delay, atol=tolerance)
+        if numpy.any(is_unexpected):
+            unexpected_delays = difference[is_unexpected]
+            furthest_delay = unexpected_delays[numpy.argmax(numpy.abs(unexpected_delays - expected_delay))]
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="on_off_delay",
+                    item=key,
+                    message=f"{unexpected_delays.size} of {difference.size} ON and OFF times do not match the expected "
+                    f"delay of {expected_delay}s with a tolerance of {tolerance}s "
+                    f"(the furthest is {furthest_delay:.3f}s).",
+                )
+            )
 
-                if not numpy.allclose(a=difference, b=expected_delay, atol=tolerance):
-                    message = ValueError(
-                        f"ON and OFF times for {key} in {experiment_key_file_path.stem} do not match expected delay of "
-                        f"{expected_delay}s with a tolerance of {tolerance}s."
-                    )
-                    raise ValueError(message)
+    return violations
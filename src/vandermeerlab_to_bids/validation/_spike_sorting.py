@@ -0,0 +1,206 @@
+import pathlib
+
+import h5py
+import numpy
+import pydantic
+import pymatreader
+import scipy.io
+
+from ._base_validator import BaseValidator, ValidationViolation
+from ..utils import SourceIndex, read_mat_variable_headers
+
+# The variables read by the `VanDerMeerSortingExtractor`, each of which must hold one entry per unit
+_REQUIRED_VARIABLE_NAMES = ("unit_ids", "spike_train", "depths", "shank_ids", "mean_waveforms")
+_OPTIONAL_VARIABLE_NAMES = ("channel_ids",)
+
+# The errors raised when the data of a file cannot be read, despite its headers
+_READ_ERRORS = (OSError, ValueError, KeyError, NotImplementedError, scipy.io.matlab.MatReadError)
+
+
+class SpikeSortingValidator(BaseValidator):
+    """
+    Validator for the spike sorted units (`clean_units_imec*.mat` files) in the source data.
+
+    Catches the problems which would otherwise only surface while the units are written, deep into a conversion.
+    """
+
+    report_name = "spike_sorting"
+
+    def __init__(self, directory: str | pathlib.Path):
+        super().__init__(directory=directory)
+
+        source_index = SourceIndex(data_directory=directory)
+        self.spike_sorting_file_paths = source_index.glob(
+            directory=directory, pattern="clean_units_imec*.mat", recursive=True
+        )
+
+        self.session_input_file_paths = dict()
+        for spike_sorting_file_path in self.spike_sorting_file_paths:
+            self.session_input_file_paths.setdefault(spike_sorting_file_path.parent, []).append(spike_sorting_file_path)
+
+    @pydantic.validate_call
+    def validate(
+        self, number_of_jobs: pydantic.PositiveInt = 1, raise_on_violation: bool = True
+    ) -> list[ValidationViolation]:
+        """
+        Validate the spike sorted units in the source data.
+
+        The number of units held by each variable is checked from the headers of the files alone; the spike trains and
+        mean waveforms are then read one unit at a time (from MATLAB v7.3 files) to check that the spike times are
+        sorted and that the waveforms contain no NaN values.
+
+        Raises
+        ------
+        ValueError
+            If any violation is found and `raise_on_violation`, once all sessions have been checked.
+        """
+        violations = self._validate_sessions(
+            session_input_file_paths=self.session_input_file_paths,
+            check_session=_check_spike_sorting,
+            check_options=dict(),
+            number_of_jobs=number_of_jobs,
+        )
+        report_file_path = self._write_report(
+            violations=violations, number_of_sessions=len(self.session_input_file_paths)
+        )
+
+        if any(violations) and raise_on_violation:
+            message = (
+                f"Found {len(violations)} spike sorting violation(s) in "
+                f"{len({violation.session for violation in violations})} of {len(self.session_input_file_paths)} "
+                f"session(s); see the report at {report_file_path}.\n"
+                + "\n".join(f"  {violation.session} {violation.item}: {violation.message}" for violation in violations)
+            )
+            raise ValueError(message)
+
+        return violations
+
+
+def _check_spike_sorting(*, input_file_paths: list[pathlib.Path]) -> list[ValidationViolation]:
+    """Check that every variable of each spike sorting file of a session describes the same, well-formed, units."""
+    violations = []
+    for file_path in input_file_paths:
+        session = file_path.parent.name
+        item = file_path.name
+
+        try:
+            variable_headers = read_mat_variable_headers(file_path=file_path)
+        except _READ_ERRORS as exception:
+            violations.append(
+                ValidationViolation(
+                    session=session, check="unreadable_file", item=item, message=f"Could not read the file: {exception}"
+                )
+            )
+            continue
+
+        missing_variable_names = [name for name in _REQUIRED_VARIABLE_NAMES if name not in variable_headers]
+        if any(missing_variable_names):
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="missing_variable",
+                    item=item,
+                    message=f"Missing the variable(s) {', '.join(missing_variable_names)}.",
+                )
+            )
+            continue
+
+        number_of_units_per_variable = {
+            name: variable_header.length
+            for name, variable_header in variable_headers.items()
+            if name in _REQUIRED_VARIABLE_NAMES + _OPTIONAL_VARIABLE_NAMES
+        }
+        number_of_units = number_of_units_per_variable["unit_ids"]
+        if any(count != number_of_units for count in number_of_units_per_variable.values()):
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="unit_count",
+                    item=item,
+                    message="Mismatch in the number of units of each variable: "
+                    + ", ".join(f"{count} {name}" for name, count in number_of_units_per_variable.items())
+                    + ".",
+                )
+            )
+            continue
+
+        unsorted_unit_indices = []
+        nan_waveform_unit_indices = []
+        try:
+            for unit_index, (spike_times, waveforms) in enumerate(
+                zip(
+                    _iterate_cells(file_path=file_path, variable_name="spike_train", number_of_units=number_of_units),
+                    _iterate_cells(
+                        file_path=file_path, variable_name="mean_waveforms", number_of_units=number_of_units
+                    ),
+                )
+            ):
+                if numpy.any(numpy.diff(numpy.ravel(spike_times)) < 0):
+                    unsorted_unit_indices.append(unit_index)
+                if numpy.any(numpy.isnan(waveforms)):
+                    nan_waveform_unit_indices.append(unit_index)
+        except _READ_ERRORS as exception:
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="unreadable_file",
+                    item=item,
+                    message=f"Could not read the spike trains and mean waveforms: {exception}",
+                )
+            )
+            continue
+
+        if unsorted_unit_indices:
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="unsorted_spike_times",
+                    item=item,
+                    message=f"The spike times of {len(unsorted_unit_indices)} of {number_of_units} unit(s) are not "
+                    f"sorted (unit indices {_summarize_indices(indices=unsorted_unit_indices)}).",
+                )
+            )
+        if nan_waveform_unit_indices:
+            violations.append(
+                ValidationViolation(
+                    session=session,
+                    check="nan_waveforms",
+                    item=item,
+                    message=f"The mean waveforms of {len(nan_waveform_unit_indices)} of {number_of_units} unit(s) "
+                    f"contain NaN values (unit indices {_summarize_indices(indices=nan_waveform_unit_indices)}).",
+                )
+            )
+
+    return violations
+
+
+def _iterate_cells(file_path: pathlib.Path, variable_name: str, number_of_units: int):
+    """
+    Iterate over the cells of a cell array, as arrays.
+
+    From MATLAB v7.3 files, only a single cell is held in memory at a time; older formats can only be read one
+    variable at a time.
+    """
+    if h5py.is_hdf5(file_path):
+        with h5py.File(name=file_path, mode="r") as file:
+            references = file[variable_name]
+            for reference in numpy.ravel(references[()], order="F"):
+                dataset = file[reference]
+                # An empty cell is stored as its dimensions (such as [1, 0]), flagged as such
+                if dataset.attrs.get("MATLAB_empty", 0):
+                    yield numpy.empty(shape=0, dtype="float64")
+                    continue
+                yield numpy.asarray(dataset[()])
+        return
+
+    cells = pymatreader.read_mat(filename=file_path, variable_names=[variable_name])[variable_name]
+    # A cell array of a single unit is read as that unit's array alone
+    if number_of_units == 1 and not isinstance(cells, list):
+        cells = [cells]
+    for cell in cells:
+        yield numpy.asarray(cell, dtype="float64")
+
+
+def _summarize_indices(indices: list[int], maximum_number_shown: int = 10) -> str:
+    shown_indices = ", ".join(str(index) for index in indices[:maximum_number_shown])
+    return shown_indices if len(indices) <= maximum_number_shown else f"{shown_indices}, ..."
@@ -0,0 +1,12 @@
+import pathlib
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def home_directory(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    """Keep the records and caches written by each test (such as the conversion ledger) in a home of its own."""
+    home_directory = tmp_path_factory.mktemp("home")
+    monkeypatch.setenv("HOME", str(home_directory))
+    monkeypatch.setenv("USERPROFILE", str(home_directory))
+    return home_directory
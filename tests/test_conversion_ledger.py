@@ -0,0 +1,99 @@
+import os
+import pathlib
+
+import pytest
+
+from vandermeerlab_to_bids.utils import ConversionLedger
+
+
+@pytest.fixture
+def session_files(tmp_path: pathlib.Path) -> tuple[pathlib.Path, list[pathlib.Path]]:
+    """An NWB file and the source files it was written from."""
+    input_file_paths = [tmp_path / "M541_2024_08_31_keys.m", tmp_path / "Port0_ON.txt", tmp_path / "Port0_OFF.txt"]
+    for input_file_path in input_file_paths:
+        input_file_path.write_text(input_file_path.name)
+    nwbfile_path = tmp_path / "sub-M541_ses-2024-08-31_ecephys.nwb"
+    nwbfile_path.write_bytes(b"")
+    return nwbfile_path, input_file_paths
+
+
+def test_complete_once_recorded(session_files: tuple[pathlib.Path, list[pathlib.Path]]):
+    nwbfile_path, input_file_paths = session_files
+    conversion_ledger = ConversionLedger()
+    assert not conversion_ledger.is_complete(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+    assert (
+        conversion_ledger.get_changed_input_file_paths(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+        is None
+    )
+
+    conversion_ledger.record_completion(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+    assert conversion_ledger.is_complete(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+    assert conversion_ledger.get_input_file_paths(nwbfile_path=nwbfile_path) == [
+        input_file_path.absolute() for input_file_path in input_file_paths
+    ]
+
+
+def test_incomplete_once_the_file_is_removed(session_files: tuple[pathlib.Path, list[pathlib.Path]]):
+    nwbfile_path, input_file_paths = session_files
+    conversion_ledger = ConversionLedger()
+    conversion_ledger.record_completion(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+    nwbfile_path.unlink()
+    assert not conversion_ledger.is_complete(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+
+def test_incomplete_once_the_entry_is_removed(session_files: tuple[pathlib.Path, list[pathlib.Path]]):
+    nwbfile_path, input_file_paths = session_files
+    conversion_ledger = ConversionLedger()
+    conversion_ledger.record_completion(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+    conversion_ledger.remove_entry(nwbfile_path=nwbfile_path)
+    assert not conversion_ledger.is_complete(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+
+def test_changed_input_files(session_files: tuple[pathlib.Path, list[pathlib.Path]]):
+    nwbfile_path, input_file_paths = session_files
+    conversion_ledger = ConversionLedger()
+    conversion_ledger.record_completion(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+    changed_file_path, removed_file_path = input_file_paths[1], input_file_paths[2]
+    changed_file_path.write_text("0.5\n1.5\n")
+    stat = changed_file_path.stat()
+    os.utime(changed_file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    added_file_path = nwbfile_path.parent / "Port1_ON.txt"
+    added_file_path.write_text("2.5\n")
+
+    current_input_file_paths = [input_file_paths[0], changed_file_path, added_file_path]
+    changed_input_file_paths = conversion_ledger.get_changed_input_file_paths(
+        nwbfile_path=nwbfile_path, input_file_paths=current_input_file_paths
+    )
+    assert sorted(changed_input_file_paths) == sorted(
+        [changed_file_path, added_file_path, removed_file_path.absolute()]
+    )
+    assert not conversion_ledger.is_complete(nwbfile_path=nwbfile_path, input_file_paths=current_input_file_paths)
+
+
+def test_touched_input_file_with_the_same_content(session_files: tuple[pathlib.Path, list[pathlib.Path]]):
+    nwbfile_path, input_file_paths = session_files
+    conversion_ledger = ConversionLedger()
+    conversion_ledger.record_completion(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+    # The content of the source files is hashed, so a file only touched has not changed
+    stat = input_file_paths[0].stat()
+    os.utime(input_file_paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert conversion_ledger.is_complete(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+
+def test_paths_spelled_differently(
+    session_files: tuple[pathlib.Path, list[pathlib.Path]], monkeypatch: pytest.MonkeyPatch
+):
+    nwbfile_path, input_file_paths = session_files
+    conversion_ledger = ConversionLedger()
+    conversion_ledger.record_completion(nwbfile_path=nwbfile_path, input_file_paths=input_file_paths)
+
+    # Such as a batch resumed (or updated) with the data directory given relative to the working directory
+    monkeypatch.chdir(nwbfile_path.parent)
+    relative_input_file_paths = [pathlib.Path(input_file_path.name) for input_file_path in input_file_paths]
+    assert conversion_ledger.is_complete(
+        nwbfile_path=pathlib.Path(nwbfile_path.name), input_file_paths=relative_input_file_paths
+    )
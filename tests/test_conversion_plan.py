@@ -0,0 +1,57 @@
+import pathlib
+import random
+
+import pytest
+
+from vandermeerlab_to_bids.manish_2025 import SessionConversionPlan, shard_session_plans
+
+
+def _get_session_plans(number_of_sessions: int) -> list[SessionConversionPlan]:
+    random_number_generator = random.Random(0)
+    return [
+        SessionConversionPlan(
+            subject_id=f"M{540 + session_index % 3}",
+            session_id=f"2024-08-{session_index + 1:02d}",
+            nwbfile_path=pathlib.Path(f"session_{session_index}.nwb"),
+            action="convert",
+            reason="not yet converted",
+            input_bytes=random_number_generator.randint(1, 10**9),
+        )
+        for session_index in range(number_of_sessions)
+    ]
+
+
+def _get_session_keys(session_plans: list[SessionConversionPlan]) -> list[tuple[str, str]]:
+    return [(session_plan.subject_id, session_plan.session_id) for session_plan in session_plans]
+
+
+@pytest.mark.parametrize("task_count", [1, 3, 8, 40])
+def test_shards_are_disjoint_and_complete(task_count: int):
+    session_plans = _get_session_plans(number_of_sessions=25)
+    shards = shard_session_plans(session_plans=session_plans, task_count=task_count)
+
+    assert len(shards) == task_count
+    sharded_keys = [key for shard in shards for key in _get_session_keys(session_plans=shard)]
+    assert sorted(sharded_keys) == sorted(_get_session_keys(session_plans=session_plans))
+    assert len(set(sharded_keys)) == len(sharded_keys)
+
+
+def test_shards_do_not_depend_on_the_order_of_the_sessions():
+    session_plans = _get_session_plans(number_of_sessions=25)
+    shuffled_session_plans = list(session_plans)
+    random.Random(1).shuffle(shuffled_session_plans)
+
+    shards = shard_session_plans(session_plans=session_plans, task_count=4)
+    shuffled_shards = shard_session_plans(session_plans=shuffled_session_plans, task_count=4)
+    assert [_get_session_keys(session_plans=shard) for shard in shards] == [
+        _get_session_keys(session_plans=shard) for shard in shuffled_shards
+    ]
+
+
+def test_shards_are_balanced_by_input_bytes():
+    session_plans = _get_session_plans(number_of_sessions=25)
+    shards = shard_session_plans(session_plans=session_plans, task_count=4)
+
+    input_bytes_per_shard = [sum(session_plan.input_bytes for session_plan in shard) for shard in shards]
+    largest_session_bytes = max(session_plan.input_bytes for session_plan in session_plans)
+    assert max(input_bytes_per_shard) - min(input_bytes_per_shard) <= largest_session_bytes
@@ -0,0 +1,79 @@
+import math
+import os
+import pathlib
+
+import pytest
+
+from vandermeerlab_to_bids.benchmarks._synthetic import SYNTHETIC_SESSION_ID, write_synthetic_odor_session
+from vandermeerlab_to_bids.utils import read_experiment_keys_file
+from vandermeerlab_to_bids.utils._experiment_keys import _parse_experiment_keys_with_regex, parse_experiment_keys
+
+EXPERIMENT_KEYS = """ExpKeys.version = +1;
+ExpKeys.subject = 'M541'; % the subject
+ExpKeys.species = 'mouse';
+
+ExpKeys.sessiontype = {'OdorSequence', 'recording'};
+ExpKeys.probe1_ID = 'imec0';
+ExpKeys.odorA = "10% Cinnamaldehyde";
+ExpKeys.odorA_channel = 'Port0';
+ExpKeys.odorB = "2-Heptanone banana";
+% A comment on a line of its own
+ExpKeys.block1_type = 'UE';
+ExpKeys.block1start = +10;
+ExpKeys.block1end = 100.5;
+ExpKeys.notes = "Block 1: A B C's, Block 2: A B";
+ExpKeys.empty ="";
+"""
+
+
+def test_parser_matches_regex_pipeline():
+    assert parse_experiment_keys(content=EXPERIMENT_KEYS) == _parse_experiment_keys_with_regex(content=EXPERIMENT_KEYS)
+
+
+def test_parser_matches_regex_pipeline_on_synthetic_session(tmp_path: pathlib.Path):
+    preprocessed_data_directory = tmp_path / SYNTHETIC_SESSION_ID
+    write_synthetic_odor_session(preprocessed_data_directory=preprocessed_data_directory, number_of_trials=10)
+    (experiment_keys_file_path,) = preprocessed_data_directory.glob(pattern="*_keys.m")
+
+    content = experiment_keys_file_path.read_text()
+    assert parse_experiment_keys(content=content) == _parse_experiment_keys_with_regex(content=content)
+
+
+def test_parser_values():
+    experiment_keys = parse_experiment_keys(content=EXPERIMENT_KEYS)
+
+    assert experiment_keys["version"] == 1
+    assert experiment_keys["subject"] == "M541"
+    assert experiment_keys["sessiontype"] == ["OdorSequence", "recording"]
+    assert experiment_keys["odorA"] == "10% Cinnamaldehyde"
+    assert experiment_keys["block1start"] == 10
+    assert math.isclose(experiment_keys["block1end"], 100.5)
+    assert experiment_keys["notes"] == "Block 1: A B C's, Block 2: A B"
+    assert experiment_keys["empty"] == ""
+
+
+def test_parser_rejects_malformed_content():
+    with pytest.raises(ValueError):
+        parse_experiment_keys(content="ExpKeys.subject = ((;\n")
+
+
+def test_reader_reparses_changed_file(tmp_path: pathlib.Path):
+    experiment_keys_file_path = tmp_path / "M541_2024_08_31_keys.m"
+    experiment_keys_file_path.write_text("ExpKeys.subject = 'M541';\n")
+    assert read_experiment_keys_file(file_path=experiment_keys_file_path) == {"subject": "M541"}
+
+    # Changed in size and modification time, either of which invalidates the cached result
+    experiment_keys_file_path.write_text("ExpKeys.subject = 'M1234';\n")
+    stat = experiment_keys_file_path.stat()
+    os.utime(experiment_keys_file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert read_experiment_keys_file(file_path=experiment_keys_file_path) == {"subject": "M1234"}
+
+
+def test_reader_returns_copies(tmp_path: pathlib.Path):
+    experiment_keys_file_path = tmp_path / "M541_2024_08_31_keys.m"
+    experiment_keys_file_path.write_text("ExpKeys.sessiontype = {'OdorSequence', 'recording'};\n")
+
+    read_experiment_keys_file(file_path=experiment_keys_file_path)["sessiontype"].append("modified")
+    assert read_experiment_keys_file(file_path=experiment_keys_file_path) == {
+        "sessiontype": ["OdorSequence", "recording"]
+    }
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+# The command line interface (and the package) must not import the conversion libraries until a command runs
+HEAVY_MODULE_NAMES = ("neuroconv", "pynwb", "hdmf", "spikeinterface", "pymatreader", "pandas", "h5py")
+
+IMPORT_TIME_BUDGET_SECONDS = 0.5
+
+
+def test_cli_does_not_import_heavy_modules():
+    code = "import sys, vandermeerlab_to_bids, vandermeerlab_to_bids._command_line_interface._cli; print(*sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    imported_module_names = set(result.stdout.split())
+    imported_heavy_module_names = sorted(name for name in HEAVY_MODULE_NAMES if name in imported_module_names)
+    assert not imported_heavy_module_names, f"The CLI imports {imported_heavy_module_names} on startup."
+
+
+def test_cli_import_time():
+    code = "import vandermeerlab_to_bids._command_line_interface._cli"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+
+    # The cumulative time (in microseconds) of the last line of `-X importtime` is that of the module imported
+    cumulative_seconds = int(result.stderr.strip().splitlines()[-1].split("|")[1]) / 1e6
+    assert cumulative_seconds < IMPORT_TIME_BUDGET_SECONDS, f"The CLI took {cumulative_seconds:.3f} s to import."
+
+
+def test_cli_help():
+    code = (
+        "import sys; from click.testing import CliRunner; "
+        "from vandermeerlab_to_bids._command_line_interface._cli import _vandermeerlab_to_bids_cli; "
+        "result = CliRunner().invoke(_vandermeerlab_to_bids_cli, ['convert', 'nwb', '--help']); "
+        "print(*sys.modules); sys.exit(result.exit_code)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+    imported_module_names = set(result.stdout.split())
+    assert not any(name in imported_module_names for name in HEAVY_MODULE_NAMES)
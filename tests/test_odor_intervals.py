@@ -0,0 +1,35 @@
+import pathlib
+
+import numpy
+import pynwb.testing.mock.file
+
+from vandermeerlab_to_bids.benchmarks._odor_intervals import _are_tables_equal, _create_trials_row_by_row
+from vandermeerlab_to_bids.benchmarks._synthetic import SYNTHETIC_SESSION_ID, write_synthetic_odor_session
+from vandermeerlab_to_bids.manish_2025.interfaces import OdorIntervalsInterface
+
+
+def test_trials_match_row_by_row(tmp_path: pathlib.Path):
+    preprocessed_data_directory = tmp_path / SYNTHETIC_SESSION_ID
+    write_synthetic_odor_session(preprocessed_data_directory=preprocessed_data_directory, number_of_trials=500)
+    interface = OdorIntervalsInterface(preprocessed_data_directory=preprocessed_data_directory)
+
+    nwbfile = pynwb.testing.mock.file.mock_NWBFile()
+    interface.add_to_nwbfile(nwbfile=nwbfile)
+    trials = nwbfile.trials.to_dataframe()
+
+    row_by_row_trials = _create_trials_row_by_row(interface=interface).to_dataframe()
+    assert len(trials) == 500
+    assert _are_tables_equal(first_table=trials, second_table=row_by_row_trials)
+
+
+def test_trials_are_sorted_by_start_time(tmp_path: pathlib.Path):
+    preprocessed_data_directory = tmp_path / SYNTHETIC_SESSION_ID
+    write_synthetic_odor_session(preprocessed_data_directory=preprocessed_data_directory, number_of_trials=100)
+    interface = OdorIntervalsInterface(preprocessed_data_directory=preprocessed_data_directory)
+
+    nwbfile = pynwb.testing.mock.file.mock_NWBFile()
+    interface.add_to_nwbfile(nwbfile=nwbfile)
+
+    start_times = nwbfile.trials["start_time"][:]
+    assert numpy.all(numpy.diff(start_times) >= 0)
+    assert numpy.all(nwbfile.trials["stop_time"][:] > start_times)
@@ -0,0 +1,101 @@
+import json
+import pathlib
+import shutil
+
+import pytest
+
+from vandermeerlab_to_bids.utils import OutputCache, get_output_cache_key, get_partial_nwbfile_path
+
+OPTIONS = {"raw_or_processed": "processed", "testing": False, "write_profile": "balanced"}
+
+
+@pytest.fixture
+def input_file_paths(tmp_path: pathlib.Path) -> list[pathlib.Path]:
+    source_directory = tmp_path / "sourcedata"
+    source_directory.mkdir()
+    input_file_paths = [source_directory / "M541_2024_08_31_keys.m", source_directory / "clean_units_imec0.mat"]
+    for input_file_path in input_file_paths:
+        input_file_path.write_text(input_file_path.name)
+    return input_file_paths
+
+
+def test_key_does_not_depend_on_where_the_inputs_are(tmp_path: pathlib.Path, input_file_paths: list[pathlib.Path]):
+    copied_directory = tmp_path / "copy"
+    shutil.copytree(src=input_file_paths[0].parent, dst=copied_directory)
+    copied_input_file_paths = [copied_directory / input_file_path.name for input_file_path in input_file_paths]
+
+    key = get_output_cache_key(input_file_paths=input_file_paths, options=OPTIONS)
+    assert get_output_cache_key(input_file_paths=copied_input_file_paths[::-1], options=OPTIONS) == key
+
+
+def test_key_depends_on_content_and_options(input_file_paths: list[pathlib.Path]):
+    key = get_output_cache_key(input_file_paths=input_file_paths, options=OPTIONS)
+    assert get_output_cache_key(input_file_paths=input_file_paths, options={**OPTIONS, "testing": True}) != key
+
+    input_file_paths[1].write_text("changed")
+    assert get_output_cache_key(input_file_paths=input_file_paths, options=OPTIONS) != key
+
+
+def test_store_and_retrieve(tmp_path: pathlib.Path):
+    output_cache = OutputCache(cache_directory=tmp_path / "cache")
+    nwbfile_path = tmp_path / "release1" / "sub-M541_ses-2024-08-31_ecephys.nwb"
+    nwbfile_path.parent.mkdir()
+    nwbfile_path.write_bytes(b"converted")
+
+    assert not output_cache.retrieve(key="a" * 64, nwbfile_path=nwbfile_path)
+    output_cache.store(key="a" * 64, nwbfile_path=nwbfile_path)
+
+    released_nwbfile_path = tmp_path / "release2" / nwbfile_path.name
+    assert output_cache.retrieve(key="a" * 64, nwbfile_path=released_nwbfile_path)
+    assert released_nwbfile_path.read_bytes() == b"converted"
+    assert not get_partial_nwbfile_path(nwbfile_path=released_nwbfile_path).exists()
+
+    # Retrieving a file onto another link to it leaves it in place
+    assert output_cache.retrieve(key="a" * 64, nwbfile_path=released_nwbfile_path)
+    assert released_nwbfile_path.read_bytes() == b"converted"
+
+
+def test_store_and_retrieve_directory(tmp_path: pathlib.Path):
+    output_cache = OutputCache(cache_directory=tmp_path / "cache")
+    nwbfile_path = tmp_path / "release1" / "sub-M541_ses-2024-08-31_ecephys.nwb.zarr"
+    (nwbfile_path / "acquisition").mkdir(parents=True)
+    (nwbfile_path / "acquisition" / "0.0").write_bytes(b"chunk")
+
+    output_cache.store(key="b" * 64, nwbfile_path=nwbfile_path)
+    assert (tmp_path / "cache" / f"{'b' * 64}.nwb.zarr").is_dir()
+
+    released_nwbfile_path = tmp_path / "release2" / nwbfile_path.name
+    assert output_cache.retrieve(key="b" * 64, nwbfile_path=released_nwbfile_path)
+    assert (released_nwbfile_path / "acquisition" / "0.0").read_bytes() == b"chunk"
+
+
+def test_entry_of_removed_file_is_not_reused(tmp_path: pathlib.Path):
+    output_cache = OutputCache(cache_directory=tmp_path / "cache")
+    nwbfile_path = tmp_path / "sub-M541_ses-2024-08-31_ecephys.nwb"
+    nwbfile_path.write_bytes(b"converted")
+    output_cache.store(key="c" * 64, nwbfile_path=nwbfile_path)
+
+    (tmp_path / "cache" / f"{'c' * 64}.nwb").unlink()
+    assert not output_cache.retrieve(key="c" * 64, nwbfile_path=tmp_path / "other.nwb")
+
+
+def test_least_recently_used_files_are_evicted(tmp_path: pathlib.Path):
+    output_cache = OutputCache(cache_directory=tmp_path / "cache", maximum_size_gb=25e-9)
+    for key in ("d" * 64, "e" * 64):
+        nwbfile_path = tmp_path / f"{key[0]}.nwb"
+        nwbfile_path.write_bytes(b"0123456789")
+        output_cache.store(key=key, nwbfile_path=nwbfile_path)
+
+    # Using the first file makes the second the least recently used once a third is stored
+    entry_file_path = tmp_path / "cache" / f"{'d' * 64}.json"
+    entry = json.loads(entry_file_path.read_text())
+    assert output_cache.retrieve(key="d" * 64, nwbfile_path=tmp_path / "d_reused.nwb")
+    assert json.loads(entry_file_path.read_text())["last_used"] >= entry["last_used"]
+
+    nwbfile_path = tmp_path / "f.nwb"
+    nwbfile_path.write_bytes(b"0123456789")
+    output_cache.store(key="f" * 64, nwbfile_path=nwbfile_path)
+
+    assert output_cache.retrieve(key="d" * 64, nwbfile_path=tmp_path / "d_reused.nwb")
+    assert not output_cache.retrieve(key="e" * 64, nwbfile_path=tmp_path / "e_reused.nwb")
+    assert output_cache.retrieve(key="f" * 64, nwbfile_path=tmp_path / "f_reused.nwb")